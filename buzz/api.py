@@ -1,34 +1,37 @@
 import frappe
 from frappe import _
+from frappe.query_builder.functions import Count
 from frappe.translate import get_all_translations
-from frappe.utils import days_diff, format_date, format_time, today
-
+from frappe.utils import format_date, format_time, today
+from werkzeug.wrappers import Response
+
+from buzz.booking_data import get_booking_data, get_event_ticket_availability
+from buzz.check_in_engine import (
+	check_in,
+	check_out,
+	get_check_in_details,
+	mark_checked_in,
+	prepare_check_in_index,
+	refresh_ticket_in_index,
+	search_ticket_index,
+)
+from buzz.check_in_stats import get_check_in_stats
+from buzz.check_in_tokens import get_ticket_from_check_in_token, get_verification_data
+from buzz.event_policy import get_event_policy
+from buzz.events.doctype.event_check_in.event_check_in import record_check_ins
+from buzz.idempotency import run_idempotent
+from buzz.occupancy import get_occupancy
 from buzz.payments import get_payment_link_for_booking
+from buzz.session_attendance import check_in_to_session, get_attendance_by_session
+from buzz.ticketing.doctype.event_ticket.event_ticket import get_ticket_from_token, render_qr_code
+from buzz.utils import paginate_by_keyset
+from buzz.waiting_room import get_waiting_room_status, is_waiting_room_enabled, validate_admission_token
 
 
 def is_ticket_transfer_allowed(event_id: str | int) -> bool:
 	"""Check if ticket transfer is allowed based on event start date and settings."""
 	try:
-		# Get event details
-		event = frappe.get_cached_doc("Buzz Event", event_id)
-
-		# Get event management settings
-		settings = frappe.get_single("Buzz Settings")
-
-		# Default to 7 days if no setting is found
-		transfer_cutoff_days = settings.get("allow_transfer_ticket_before_event_start_days", 7)
-
-		# Calculate days difference between today and event start date
-		event_start_date = event.start_date
-		if not event_start_date:
-			return False
-
-		# Get days remaining until event starts
-		days_until_event = days_diff(event_start_date, today())
-
-		# Transfer is allowed if there are more days remaining than the cutoff
-		return days_until_event >= transfer_cutoff_days
-
+		return get_event_policy(event_id)["can_transfer_ticket"]
 	except Exception as e:
 		frappe.log_error(f"Error checking ticket transfer eligibility: {e!s}")
 		return False
@@ -37,31 +40,18 @@ def is_ticket_transfer_allowed(event_id: str | int) -> bool:
 def is_add_on_change_allowed(event_id: str | int) -> bool:
 	"""Check if add-on changes are allowed based on event start date and settings."""
 	try:
-		# Get event details
-		event = frappe.get_cached_doc("Buzz Event", event_id)
-
-		# Get event management settings
-		settings = frappe.get_cached_doc("Buzz Settings")
-
-		# Default to 7 days if no setting is found
-		add_on_change_cutoff_days = settings.get("allow_add_ons_change_before_event_start_days", 7)
-
-		# Calculate days difference between today and event start date
-		event_start_date = event.start_date
-		if not event_start_date:
-			return False
-
-		# Get days remaining until event starts
-		days_until_event = days_diff(event_start_date, today())
-
-		# Add-on changes are allowed if there are more days remaining than the cutoff
-		return days_until_event >= add_on_change_cutoff_days
-
+		return get_event_policy(event_id)["can_change_add_ons"]
 	except Exception as e:
 		frappe.log_error(f"Error checking add-on change eligibility: {e!s}")
 		return False
 
 
+@frappe.whitelist()
+def get_event_change_policy(event_id: str | int) -> dict:
+	"""Whether ticket transfers, add-on changes and cancellation requests are still allowed for an event."""
+	return get_event_policy(event_id)
+
+
 @frappe.whitelist()
 def can_transfer_ticket(event_id: str | int) -> dict:
 	"""API endpoint to check if ticket transfer is allowed for an event."""
@@ -77,28 +67,7 @@ def can_change_add_ons(event_id: str | int) -> dict:
 def is_cancellation_request_allowed(event_id: str | int) -> bool:
 	"""Check if cancellation request is allowed based on event start date and settings."""
 	try:
-		# Get event details
-		event = frappe.get_cached_doc("Buzz Event", event_id)
-
-		# Get event management settings
-		settings = frappe.get_cached_doc("Buzz Settings")
-
-		# Default to 7 days if no setting is found
-		cancellation_cutoff_days = settings.get(
-			"allow_ticket_cancellation_request_before_event_start_days", 7
-		)
-
-		# Calculate days difference between today and event start date
-		event_start_date = event.start_date
-		if not event_start_date:
-			return False
-
-		# Get days remaining until event starts
-		days_until_event = days_diff(event_start_date, today())
-
-		# Cancellation request is allowed if there are more days remaining than the cutoff
-		return days_until_event >= cancellation_cutoff_days
-
+		return get_event_policy(event_id)["can_request_cancellation"]
 	except Exception as e:
 		frappe.log_error(f"Error checking cancellation request eligibility: {e!s}")
 		return False
@@ -112,54 +81,48 @@ def can_request_cancellation(event_id: str | int) -> dict:
 
 @frappe.whitelist()
 def get_event_booking_data(event_route: str) -> dict:
-	data = frappe._dict()
-	event_doc = frappe.get_cached_doc("Buzz Event", {"route": event_route})
+	"""Everything the booking page needs, served from cache with live ticket availability on top."""
+	return get_booking_data(event_route)
 
-	# Ticket Types
-	available_ticket_types = []
-	published_ticket_types = frappe.db.get_all(
-		"Event Ticket Type", filters={"is_published": True, "event": event_doc.name}, pluck="name"
-	)
-	for ticket_type in published_ticket_types:
-		tt = frappe.get_cached_doc("Event Ticket Type", ticket_type)
-		if tt.are_tickets_available(1):
-			available_ticket_types.append(tt)
-	data.available_ticket_types = available_ticket_types
 
-	# Ticket Add-ons
-	add_ons = frappe.db.get_all(
-		"Ticket Add-on", filters={"event": event_doc.name, "enabled": 1}, fields=["*"], order_by="title"
-	)
+@frappe.whitelist()
+def get_ticket_availability(event: str) -> dict:
+	"""Remaining tickets (-1 if unlimited) for each published ticket type of an event."""
+	return get_event_ticket_availability(event)
 
-	for add_on in add_ons:
-		if add_on.user_selects_option:
-			add_on.options = add_on.options.split("\n")
 
-	data.available_add_ons = add_ons
+@frappe.whitelist()
+def join_waiting_room(event: str) -> dict:
+	"""Take (or look up) the current user's place in the event's booking queue."""
+	if frappe.session.user == "Guest":
+		frappe.throw(_("Please login to book tickets."), frappe.PermissionError)
 
-	# GST Settings
-	event_settings = frappe.get_cached_doc("Buzz Settings")
-	data.gst_settings = {
-		"apply_gst_on_bookings": event_settings.apply_gst_on_bookings,
-		"gst_percentage": event_settings.gst_percentage or 18,
-	}
+	if not is_waiting_room_enabled(event):
+		return {"event": event, "people_ahead": 0, "admission_token": None}
 
-	data.event_details = event_doc
+	return get_waiting_room_status(event, frappe.session.user)
 
-	# Custom Fields
-	custom_fields = frappe.db.get_all(
-		"Buzz Custom Field",
-		filters={"event": event_doc.name, "enabled": 1},
-		fields=["*"],
-		order_by="order",
-	)
-	data.custom_fields = custom_fields
 
-	return data
+@frappe.whitelist()
+def process_booking(
+	attendees: list[dict],
+	event: str,
+	booking_custom_fields: dict | None = None,
+	admission_token: str | None = None,
+	idempotency_key: str | None = None,
+) -> dict:
+	"""Repeats of a call with the same `idempotency_key` return the first call's booking and payment link."""
+	if is_waiting_room_enabled(event):
+		validate_admission_token(event, admission_token)
+
+	return run_idempotent(
+		"process_booking",
+		idempotency_key,
+		lambda: create_booking(attendees, event, booking_custom_fields),
+	)
 
 
-@frappe.whitelist()
-def process_booking(attendees: list[dict], event: str, booking_custom_fields: dict | None = None) -> dict:
+def create_booking(attendees: list[dict], event: str, booking_custom_fields: dict | None = None) -> dict:
 	booking = frappe.new_doc("Event Booking")
 	booking.event = event
 	booking.user = frappe.session.user
@@ -215,9 +178,10 @@ def process_booking(attendees: list[dict], event: str, booking_custom_fields: di
 		return {"booking_name": booking.name}
 
 	return {
+		"booking_name": booking.name,
 		"payment_link": get_payment_link_for_booking(
 			booking.name, redirect_to=f"/dashboard/bookings/{booking.name}?success=true"
-		)
+		),
 	}
 
 
@@ -351,9 +315,14 @@ def get_booking_details(booking_id: str) -> dict:
 		],
 	)
 
-	add_ons = frappe.db.get_all(
+	add_ons_by_ticket = {}
+	for add_on in frappe.db.get_all(
 		"Ticket Add-on Value",
-		filters={"parent": ("in", [ticket.name for ticket in tickets])},
+		filters={
+			"parenttype": "Event Ticket",
+			"parentfield": "add_ons",
+			"parent": ("in", [ticket.name for ticket in tickets]),
+		},
 		fields=[
 			"parent",
 			"name",
@@ -362,27 +331,23 @@ def get_booking_details(booking_id: str) -> dict:
 			"add_on.title as add_on_title",
 			"add_on.user_selects_option as user_selects_option",
 		],
-	)
+	):
+		add_ons_by_ticket.setdefault(add_on.parent, []).append(add_on)
 
 	# Get available options for add-ons
-	event_add_ons = frappe.db.get_all(
-		"Ticket Add-on",
-		filters={"event": booking_doc.event, "user_selects_option": True},
-		fields=["name", "title", "user_selects_option", "options"],
-	)
-
-	add_on_options_map = {}
-	for event_add_on in event_add_ons:
-		if event_add_on.user_selects_option:
-			add_on_options_map[event_add_on.name] = (
-				event_add_on.options.split("\n") if event_add_on.options else []
-			)
+	add_on_options_map = {
+		event_add_on.name: event_add_on.options.split("\n") if event_add_on.options else []
+		for event_add_on in frappe.db.get_all(
+			"Ticket Add-on",
+			filters={"event": booking_doc.event, "user_selects_option": True},
+			fields=["name", "options"],
+		)
+	}
 
 	for ticket in tickets:
-		ticket.add_ons = []
-		for add_on in add_ons:
-			if add_on.parent == ticket.name:
-				add_on_data = {
+		ticket.add_ons = sorted(
+			(
+				{
 					"id": add_on.name,
 					"name": add_on.add_on,
 					"title": add_on.add_on_title,
@@ -390,17 +355,14 @@ def get_booking_details(booking_id: str) -> dict:
 					"user_selects_option": add_on.user_selects_option,
 					"options": add_on_options_map.get(add_on.add_on, []),
 				}
-				ticket.add_ons.append(add_on_data)
-		ticket.add_ons = sorted(ticket.add_ons, key=lambda x: x["title"])
+				for add_on in add_ons_by_ticket.get(ticket.name, [])
+			),
+			key=lambda x: x["title"],
+		)
 
 	details.tickets = tickets
 	details.event = frappe.get_cached_doc("Buzz Event", booking_doc.event)
-	details.can_transfer_ticket = can_transfer_ticket(details.event.name)
-	details.can_change_add_ons = can_change_add_ons(details.event.name)
-	details.can_request_cancellation = can_request_cancellation(details.event.name)
-
-	# Payment
-	frappe.db.get_all("Event Payment", filters={})
+	details.policy = get_event_policy(details.event.name)
 
 	# Check for existing cancellation request
 	existing_cancellation = frappe.db.get_value(
@@ -460,37 +422,54 @@ def change_add_on_preference(add_on_id: str, new_value: str):
 		"value",
 		new_value,
 	)
+	refresh_ticket_in_index(ticket.name, ticket.event)
 
 
 @frappe.whitelist()
 def get_sponsorship_details(enquiry_id: str) -> dict:
 	"""Get detailed information about a sponsorship enquiry including event and sponsor details."""
-	# Get the sponsorship enquiry
-	enquiry = frappe.get_doc("Sponsorship Enquiry", enquiry_id)
+	# Get the sponsorship enquiry, with its tier and event joined in
+	enquiries = frappe.db.get_all(
+		"Sponsorship Enquiry",
+		filters={"name": enquiry_id},
+		fields=[
+			"name",
+			"company_name",
+			"company_logo",
+			"event",
+			"tier",
+			"tier.title as tier_title",
+			"status",
+			"creation",
+			"owner",
+			"event.title as event_title",
+			"event.short_description as event_short_description",
+			"event.about as event_about",
+			"event.start_date as event_start_date",
+			"event.end_date as event_end_date",
+			"event.venue as event_venue",
+			"event.route as event_route",
+		],
+		limit=1,
+	)
+	if not enquiries:
+		frappe.throw(
+			frappe._("Sponsorship Enquiry {0} not found").format(enquiry_id), frappe.DoesNotExistError
+		)
+	enquiry = enquiries[0]
 
 	# Check if user has permission to view this enquiry
 	if enquiry.owner != frappe.session.user and not frappe.has_permission(
-		"Sponsorship Enquiry", "read", enquiry
+		"Sponsorship Enquiry", "read", enquiry.name
 	):
 		frappe.throw(frappe._("Not permitted to view this sponsorship enquiry"))
 
-	# Get tier title if tier exists
-	tier_title = ""
-	if enquiry.tier:
-		tier_title = frappe.db.get_value("Sponsorship Tier", enquiry.tier, "title") or enquiry.tier
-
 	# Get event details
 	event_details = {}
 	if enquiry.event:
-		event = frappe.get_cached_doc("Buzz Event", enquiry.event)
 		event_details = {
-			"title": event.title,
-			"short_description": getattr(event, "short_description", ""),
-			"about": getattr(event, "about", ""),
-			"start_date": event.start_date,
-			"end_date": getattr(event, "end_date", ""),
-			"venue": getattr(event, "venue", ""),
-			"route": getattr(event, "route", ""),
+			field: enquiry[f"event_{field}"]
+			for field in ("title", "short_description", "about", "start_date", "end_date", "venue", "route")
 		}
 
 	# Check if there's a corresponding Event Sponsor
@@ -498,16 +477,21 @@ def get_sponsorship_details(enquiry_id: str) -> dict:
 	sponsors = frappe.db.get_all(
 		"Event Sponsor",
 		filters={"enquiry": enquiry_id},
-		fields=["name", "company_name", "company_logo", "creation", "event", "tier"],
+		fields=[
+			"name",
+			"company_name",
+			"company_logo",
+			"creation",
+			"event",
+			"tier",
+			"tier.title as tier_title",
+		],
 		limit=1,
 	)
 
 	if sponsors:
 		sponsor_details = sponsors[0]
-		# Get sponsor tier title too
-		if sponsor_details.get("tier"):
-			sponsor_tier_title = frappe.db.get_value("Sponsorship Tier", sponsor_details["tier"], "title")
-			sponsor_details["tier_title"] = sponsor_tier_title or sponsor_details["tier"]
+		sponsor_details["tier_title"] = sponsor_details.tier_title or sponsor_details.tier
 
 	return {
 		"enquiry": {
@@ -516,7 +500,7 @@ def get_sponsorship_details(enquiry_id: str) -> dict:
 			"company_logo": enquiry.company_logo,
 			"event": enquiry.event,
 			"tier": enquiry.tier,
-			"tier_title": tier_title,
+			"tier_title": (enquiry.tier_title or enquiry.tier) if enquiry.tier else "",
 			"status": enquiry.status,
 			"creation": enquiry.creation,
 			"owner": enquiry.owner,
@@ -530,40 +514,37 @@ def get_sponsorship_details(enquiry_id: str) -> dict:
 @frappe.whitelist()
 def get_user_sponsorship_inquiries() -> list:
 	"""Get all sponsorship inquiries for the current user."""
+	# Event titles and tier titles are joined in
 	inquiries = frappe.db.get_all(
 		"Sponsorship Enquiry",
 		filters={"owner": frappe.session.user},
-		fields=["name", "company_name", "event", "tier", "status", "creation"],
+		fields=[
+			"name",
+			"company_name",
+			"event",
+			"event.title as event_title",
+			"tier",
+			"tier.title as tier_title",
+			"status",
+			"creation",
+		],
 		order_by="creation desc",
 	)
 
-	# Get event titles and tier titles
-	for inquiry in inquiries:
-		if inquiry.event:
-			event_title = frappe.db.get_value("Buzz Event", inquiry.event, "title")
-			inquiry["event_title"] = event_title
-
-		if inquiry.tier:
-			tier_title = frappe.db.get_value("Sponsorship Tier", inquiry.tier, "title")
-			inquiry["tier_title"] = tier_title or inquiry.tier
-		else:
-			inquiry["tier_title"] = ""
-
 	# Check which inquiries have corresponding sponsors
-	inquiry_names = [inquiry.name for inquiry in inquiries]
-	if inquiry_names:
-		sponsors = frappe.db.get_all(
-			"Event Sponsor",
-			filters={"enquiry": ["in", inquiry_names]},
-			fields=["enquiry"],
+	sponsored_inquiries = set()
+	if inquiries:
+		sponsored_inquiries = set(
+			frappe.db.get_all(
+				"Event Sponsor",
+				filters={"enquiry": ["in", [inquiry.name for inquiry in inquiries]]},
+				pluck="enquiry",
+			)
 		)
-		sponsored_inquiries = {sponsor.enquiry for sponsor in sponsors}
 
-		for inquiry in inquiries:
-			inquiry["has_sponsor"] = inquiry.name in sponsored_inquiries
-	else:
-		for inquiry in inquiries:
-			inquiry["has_sponsor"] = False
+	for inquiry in inquiries:
+		inquiry["tier_title"] = (inquiry.tier_title or inquiry.tier) if inquiry.tier else ""
+		inquiry["has_sponsor"] = inquiry.name in sponsored_inquiries
 
 	return inquiries
 
@@ -676,15 +657,7 @@ def get_ticket_details(ticket_id: str) -> dict:
 		details.booking = None
 
 	details.ticket_type = frappe.get_cached_doc("Event Ticket Type", ticket_doc.ticket_type)
-	details.can_transfer_ticket = (
-		can_transfer_ticket(details.event.name) if details.event else {"can_transfer": False}
-	)
-	details.can_change_add_ons = (
-		can_change_add_ons(details.event.name) if details.event else {"can_change_add_ons": False}
-	)
-	details.can_request_cancellation = (
-		can_request_cancellation(details.event.name) if details.event else {"can_request_cancellation": False}
-	)
+	details.policy = get_event_policy(details.event.name)
 
 	return details
 
@@ -728,6 +701,67 @@ def create_cancellation_request(booking_id: str, ticket_ids: list | None = None)
 	cancellation_request.insert(ignore_permissions=True)
 
 
+@frappe.whitelist()
+def get_my_tickets(
+	page_length: int = 20, after_creation: str | None = None, after_name: str | None = None
+) -> list[dict]:
+	"""A page of the current user's tickets, newest first, with what the tickets list shows."""
+	ticket = frappe.qb.DocType("Event Ticket")
+	event = frappe.qb.DocType("Buzz Event")
+	ticket_type = frappe.qb.DocType("Event Ticket Type")
+	query = (
+		frappe.qb.from_(ticket)
+		.left_join(event)
+		.on(event.name == ticket.event)
+		.left_join(ticket_type)
+		.on(ticket_type.name == ticket.ticket_type)
+		.select(
+			ticket.name,
+			ticket.attendee_name,
+			ticket.ticket_type,
+			ticket_type.title.as_("ticket_type_title"),
+			event.title.as_("event_title"),
+			event.start_date,
+			ticket.creation,
+		)
+		.where((ticket.attendee_email == frappe.session.user) & (ticket.docstatus != 0))
+	)
+	return paginate_by_keyset(query, ticket, page_length, after_creation, after_name)
+
+
+@frappe.whitelist()
+def get_my_bookings(
+	page_length: int = 20, after_creation: str | None = None, after_name: str | None = None
+) -> list[dict]:
+	"""A page of the current user's bookings, newest first, with what the bookings list shows."""
+	booking = frappe.qb.DocType("Event Booking")
+	event = frappe.qb.DocType("Buzz Event")
+	attendee = frappe.qb.DocType("Event Booking Attendee")
+	ticket_count = (
+		frappe.qb.from_(attendee)
+		.select(Count("*"))
+		.where((attendee.parent == booking.name) & (attendee.parenttype == "Event Booking"))
+	)
+	query = (
+		frappe.qb.from_(booking)
+		.left_join(event)
+		.on(event.name == booking.event)
+		.select(
+			booking.name,
+			event.title.as_("event_title"),
+			event.start_date,
+			event.venue,
+			booking.docstatus,
+			booking.total_amount,
+			booking.currency,
+			booking.creation,
+			ticket_count.as_("ticket_count"),
+		)
+		.where((booking.user == frappe.session.user) & (booking.docstatus != 0))
+	)
+	return paginate_by_keyset(query, booking, page_length, after_creation, after_name)
+
+
 @frappe.whitelist()
 def get_user_info() -> dict:
 	"""Get basic information about the logged-in user."""
@@ -750,118 +784,100 @@ def get_user_info() -> dict:
 	}
 
 
-@frappe.whitelist()
-def validate_ticket_for_checkin(ticket_id: str) -> dict:
-	frappe.only_for("Frontdesk Manager", True)
-	if not frappe.db.exists("Event Ticket", ticket_id):
-		frappe.throw(_("Ticket not found"))
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+def get_ticket_qr_code(token: str) -> Response:
+	"""QR code image of a ticket, rendered on request from the signed token it encodes.
 
-	ticket_doc = frappe.get_cached_doc("Event Ticket", ticket_id)
+	The token is the capability, so the image also loads in emails and PDFs.
+	"""
+	if not get_ticket_from_token(token):
+		raise frappe.PermissionError
 
-	if ticket_doc.docstatus == 2:
-		frappe.throw(_("This ticket has been cancelled and cannot be checked in"))
+	response = Response(render_qr_code(token), mimetype="image/png")
+	# the image of a token never changes
+	response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+	response.add_etag()
+	return response.make_conditional(frappe.request)
 
-	event_doc = frappe.get_cached_doc("Buzz Event", ticket_doc.event)
-	ticket_type_doc = (
-		frappe.get_cached_doc("Event Ticket Type", ticket_doc.ticket_type) if ticket_doc.ticket_type else None
-	)
 
-	# Check if ticket is already checked in today
-	checkin_date = frappe.utils.today()
-	existing_checkin = frappe.db.exists("Event Check In", {"ticket": ticket_id, "date": checkin_date})
+def get_ticket_from_scan(scanned_data: str) -> str:
+	"""QR codes hold a signed check-in token, older tickets and manually entered IDs are the plain ticket ID."""
+	return get_ticket_from_check_in_token(scanned_data) or get_ticket_from_token(scanned_data) or scanned_data
 
-	if existing_checkin:
-		checkin_doc = frappe.get_doc("Event Check In", existing_checkin)
-		# Format the check-in time for display
-		formatted_checkin_time = (
-			format_date(checkin_doc.creation) + " at " + format_time(checkin_doc.creation)
-		)
 
-		frappe.throw(_("This ticket was already checked in today ({0}).").format(formatted_checkin_time))
+@frappe.whitelist()
+def get_offline_check_in_data(event: str) -> dict:
+	"""Public key and revoked tickets of an event, for scanners to verify tickets without a network."""
+	frappe.only_for("Frontdesk Manager", True)
+	# scanners load this when they open the event, ahead of the first scan
+	prepare_check_in_index(event)
+	return get_verification_data(event)
 
-	# Get add-ons
-	add_ons = frappe.db.get_all(
-		"Ticket Add-on Value",
-		filters={"parent": ticket_id},
-		fields=[
-			"add_on",
-			"add_on.title as add_on_title",
-			"add_on.user_selects_option as add_on_selects_option",
-			"value",
-			"price",
-			"currency",
-		],
-	)
 
-	return {
-		"message": _("Valid ticket ready for check-in"),
-		"ticket": {
-			"id": ticket_doc.name,
-			"attendee_name": ticket_doc.attendee_name,
-			"attendee_email": ticket_doc.attendee_email,
-			"event_title": event_doc.title,
-			"ticket_type": (ticket_type_doc.title if ticket_type_doc else ticket_doc.ticket_type),
-			"venue": event_doc.venue,
-			"start_date": event_doc.start_date,
-			"start_time": event_doc.start_time,
-			"end_date": event_doc.end_date,
-			"end_time": event_doc.end_time,
-			"is_checked_in": False,
-			"check_in_time": None,
-			"booking_id": ticket_doc.booking,
-			"add_ons": add_ons,
-		},
-		"payment_details": get_payment_details_for_ticket(ticket_id),
-	}
+@frappe.whitelist()
+def validate_ticket_for_checkin(ticket_id: str, event: str | None = None) -> dict:
+	frappe.only_for("Frontdesk Manager", True)
+	return get_check_in_details(get_ticket_from_scan(ticket_id), event)
 
 
-def get_payment_details_for_ticket(ticket_id: str) -> dict | None:
-	booking = frappe.get_cached_doc(
-		"Event Booking", frappe.get_cached_value("Event Ticket", ticket_id, "booking")
-	)
-	payments = frappe.db.get_all(
-		"Event Payment",
-		filters={
-			"reference_doctype": "Event Booking",
-			"reference_docname": booking.name,
-			"payment_received": 1,
-		},
-		fields=["name", "amount", "currency"],
-		limit=1,
-	)
+@frappe.whitelist()
+def checkin_ticket(
+	ticket_id: str, event: str | None = None, gate: str | None = None, direction: str = "In"
+) -> dict:
+	"""Check in a ticket for today, or with `direction` "Out" let it out of the venue for re-entry later."""
+	frappe.only_for("Frontdesk Manager", True)
+	if direction not in ("In", "Out"):
+		frappe.throw(_("Scan direction must be In or Out"))
+
+	ticket_id = get_ticket_from_scan(ticket_id)
+	if direction == "Out":
+		return check_out(ticket_id, event)
+	return check_in(ticket_id, event, gate)
 
-	if payments:
-		return payments[0]
+
+@frappe.whitelist(methods=["POST"])
+def sync_check_ins(event: str, scans: list[dict]) -> list[dict]:
+	"""Check in scans queued on a door device, returns accepted, duplicate, cancelled or unknown per scan."""
+	frappe.only_for("Frontdesk Manager", True)
+	results = record_check_ins(event, scans)
+	mark_checked_in(event, results)
+	return results
 
 
 @frappe.whitelist()
-def checkin_ticket(ticket_id: str) -> dict:
-	"""Check in a ticket for today."""
+def search_attendees(event: str, query: str) -> list[dict]:
+	"""Find tickets of an event by the start of the attendee's name or email, or the booking or ticket ID."""
 	frappe.only_for("Frontdesk Manager", True)
+	return search_ticket_index(event, query)
 
-	# Validate the ticket for check-in
-	checkin_date = frappe.utils.today()
-	validation_result = validate_ticket_for_checkin(ticket_id)
 
-	# Create check-in record
-	checkin_doc = frappe.new_doc("Event Check In")
-	checkin_doc.ticket = ticket_id
-	checkin_doc.date = checkin_date
-	checkin_doc.insert(ignore_permissions=True)
-	checkin_doc.submit()
+@frappe.whitelist()
+def checkin_ticket_for_session(ticket_id: str, schedule_item: str) -> dict:
+	"""Check a ticket in to a session of today's schedule, if its room has a seat left."""
+	frappe.only_for("Frontdesk Manager", True)
+	return check_in_to_session(get_ticket_from_scan(ticket_id), schedule_item)
 
-	return {
-		"message": _("Successfully checked in {attendee_name} for {checkin_date}").format(
-			attendee_name=validation_result["ticket"]["attendee_name"],
-			checkin_date=frappe.format(checkin_date, {"fieldtype": "Date"}),
-		),
-		"ticket": {
-			**validation_result["ticket"],
-			"is_checked_in": True,
-			"check_in_time": checkin_doc.creation,
-			"check_in_date": checkin_date,
-		},
-	}
+
+@frappe.whitelist()
+def get_session_attendance(event: str) -> list[dict]:
+	"""Attendance and capacity of today's sessions, updates are pushed as `buzz_session_attendance`."""
+	frappe.only_for(["Frontdesk Manager", "Event Manager"], True)
+	return get_attendance_by_session(event)
+
+
+@frappe.whitelist()
+def get_live_check_in_stats(event: str) -> dict:
+	"""Today's check-ins of an event by ticket type and gate, and its occupancy, updates are pushed."""
+	frappe.only_for(["Frontdesk Manager", "Event Manager"], True)
+	stats = get_check_in_stats(event)
+	stats["occupancy"] = get_occupancy(event, frappe.db.get_value("Buzz Event", event, "venue"))
+	stats["ticket_types"] = frappe.db.get_all(
+		"Event Ticket Type",
+		filters={"event": event},
+		fields=["name", "title", "tickets_sold"],
+		order_by="creation asc",
+	)
+	return stats
 
 
 @frappe.whitelist()
@@ -0,0 +1,124 @@
+"""
+Cached payload of the booking page (`buzz.api.get_event_booking_data`).
+
+Everything on the page except ticket availability only changes when an organiser
+edits the event, so the assembled payload is kept in Redis per event route and
+dropped by doc events on the documents it is built from. Availability changes
+with every sale and is read separately from the maintained counters on
+Event Ticket Type, one query for all ticket types of the event.
+"""
+
+import frappe
+from frappe.utils import cint
+
+BOOKING_DATA_CACHE_KEY = "buzz:event_booking_data"
+TICKET_TYPE_FIELDS = ["name", "title", "price", "currency", "event", "auto_unpublish_after"]
+
+
+def get_booking_data(event_route: str) -> frappe._dict:
+	data = frappe._dict(get_cached_booking_data(event_route))
+	availability = get_ticket_availability([tt.name for tt in data.available_ticket_types])
+
+	data.available_ticket_types = [
+		{**tt, "remaining_tickets": availability[str(tt.name)]}
+		for tt in data.available_ticket_types
+		if availability.get(str(tt.name), 0) != 0
+	]
+	return data
+
+
+def get_cached_booking_data(event_route: str) -> dict:
+	return frappe.cache.hget(
+		BOOKING_DATA_CACHE_KEY, event_route, generator=lambda: build_booking_data(event_route)
+	)
+
+
+def build_booking_data(event_route: str) -> dict:
+	data = frappe._dict()
+	event_doc = frappe.get_cached_doc("Buzz Event", {"route": event_route})
+
+	# Ticket Types
+	data.available_ticket_types = frappe.db.get_all(
+		"Event Ticket Type",
+		filters={"is_published": True, "event": event_doc.name},
+		fields=TICKET_TYPE_FIELDS,
+	)
+
+	# Ticket Add-ons
+	add_ons = frappe.db.get_all(
+		"Ticket Add-on", filters={"event": event_doc.name, "enabled": 1}, fields=["*"], order_by="title"
+	)
+
+	for add_on in add_ons:
+		if add_on.user_selects_option:
+			add_on.options = add_on.options.split("\n")
+
+	data.available_add_ons = add_ons
+
+	# GST Settings
+	event_settings = frappe.get_cached_doc("Buzz Settings")
+	data.gst_settings = {
+		"apply_gst_on_bookings": event_settings.apply_gst_on_bookings,
+		"gst_percentage": event_settings.gst_percentage or 18,
+	}
+
+	data.event_details = event_doc.as_dict()
+
+	# Custom Fields
+	data.custom_fields = frappe.db.get_all(
+		"Buzz Custom Field",
+		filters={"event": event_doc.name, "enabled": 1},
+		fields=["*"],
+		order_by="order",
+	)
+
+	return data
+
+
+def get_ticket_availability(ticket_types: list) -> dict[str, int]:
+	"""Returns remaining tickets by ticket type (-1 if there is no limit) in one query."""
+	if not ticket_types:
+		return {}
+
+	return get_remaining_tickets_by_type({"name": ("in", ticket_types)})
+
+
+def get_event_ticket_availability(event: str | int) -> dict[str, int]:
+	"""Returns remaining tickets of every published ticket type of the event in one query."""
+	return get_remaining_tickets_by_type({"event": event, "is_published": 1})
+
+
+def get_remaining_tickets_by_type(filters: dict) -> dict[str, int]:
+	availability = {}
+	for tt in frappe.db.get_all(
+		"Event Ticket Type",
+		filters=filters,
+		fields=["name", "max_tickets_available", "tickets_sold", "tickets_reserved"],
+	):
+		if not tt.max_tickets_available:
+			availability[str(tt.name)] = -1
+			continue
+
+		availability[str(tt.name)] = max(
+			tt.max_tickets_available - cint(tt.tickets_sold) - cint(tt.tickets_reserved), 0
+		)
+
+	return availability
+
+
+def clear_booking_data_cache(doc=None, method=None):
+	"""Doc event handler, drops the cached booking page payload the document is part of."""
+	if not doc or doc.doctype == "Buzz Settings":
+		frappe.cache.delete_value(BOOKING_DATA_CACHE_KEY)
+		return
+
+	if doc.doctype == "Buzz Event":
+		routes = {doc.route}
+		if doc_before_save := doc.get_doc_before_save():
+			routes.add(doc_before_save.route)
+	else:
+		routes = {frappe.db.get_value("Buzz Event", doc.event, "route")}
+
+	for route in routes:
+		if route:
+			frappe.cache.hdel(BOOKING_DATA_CACHE_KEY, route)
@@ -30,3 +30,7 @@ class BuzzCustomField(Document):
 	def validate(self):
 		if not self.fieldname:
 			self.fieldname = frappe.scrub(self.label)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Buzz Custom Field", ["event", "enabled", "applied_to"])
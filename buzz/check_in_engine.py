@@ -0,0 +1,495 @@
+"""
+Check-in fast path, backed by a per-event ticket index in Redis.
+
+Before the doors open, and when a scanner opens the event, the index is warmed
+in the background with everything a scan needs to know about each ticket of the
+event (status, attendee, ticket type, add-ons, payment) and with the day's
+check-ins, and doc events keep it current as tickets change. Until it is warm,
+scans look their ticket up on its own.
+A scan is then a key lookup plus an atomic set-if-absent of the ticket in the
+day's check-ins, so two doors scanning the same ticket can never both admit it.
+The Event Check In rows are written asynchronously in batches by
+`persist_check_ins`, through `record_check_ins`.
+
+For guests without their QR code, the index also holds a sorted set of search
+terms (words of the attendee's name, email, booking and ticket ID) that the
+front desk looks tickets up in by prefix, with ZRANGEBYLEX.
+"""
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, format_date, format_time, get_datetime, getdate, now_datetime, today
+
+from buzz.events.doctype.event_check_in.event_check_in import record_check_ins
+from buzz.occupancy import enter_venue, get_occupancy, has_left_venue, leave_venue, remove_from_venue
+
+INDEX_EXPIRY_SECONDS = 3 * 24 * 60 * 60
+PERSIST_BATCH_SIZE = 1000
+PERSIST_LOCK_SECONDS = 5 * 60
+# list commands of `frappe.cache` namespace the key themselves
+PENDING_CHECK_INS_KEY = "buzz:check_in:pending"
+MIN_SEARCH_LENGTH = 2
+# terms read at a time per search, before every word of the query is matched against the tickets
+SEARCH_CANDIDATES = 200
+EVENT_FIELDS = ["title", "venue", "start_date", "start_time", "end_date", "end_time"]
+
+
+def get_check_in_details(ticket: str, event: str | int | None = None) -> dict:
+	"""Everything the door needs to know about a ticket, throws if it can not be checked in today."""
+	event = event or frappe.db.get_value("Event Ticket", ticket, "event")
+	entry = get_ticket_entry(event, ticket)
+	if not entry:
+		frappe.throw(_("Ticket not found"))
+
+	if entry["docstatus"] == 2:
+		frappe.throw(_("This ticket has been cancelled and cannot be checked in"))
+
+	response = make_check_in_response(event, entry, _("Valid ticket ready for check-in"))
+	if checked_in_at := frappe.cache.get(get_checked_in_key(event, today(), ticket)):
+		if not has_left_venue(event, get_event_info(event)["venue"], ticket):
+			throw_already_checked_in(checked_in_at)
+		response["message"] = _("Valid ticket ready for re-entry")
+
+	return response
+
+
+def check_in(ticket: str, event: str | int | None = None, gate: str | None = None) -> dict:
+	"""Check a ticket in for today, the Event Check In row is written in the background."""
+	event = event or frappe.db.get_value("Event Ticket", ticket, "event")
+	response = get_check_in_details(ticket, event)
+
+	venue = get_event_info(event)["venue"]
+	checkin_date = today()
+	scanned_at = str(now_datetime())
+	checked_in_key = get_checked_in_key(event, checkin_date, ticket)
+	if not frappe.cache.set(checked_in_key, scanned_at, nx=True, ex=INDEX_EXPIRY_SECONDS):
+		# checked in earlier today, the ticket is only let back in after it scanned out
+		if not (occupancy := enter_venue(event, venue, ticket, re_entry=True)):
+			throw_already_checked_in(frappe.cache.get(checked_in_key))
+
+		response["message"] = _("Welcome back, {0}").format(response["ticket"]["attendee_name"])
+		response["ticket"].update(
+			{
+				"is_checked_in": True,
+				"check_in_time": frappe.safe_decode(frappe.cache.get(checked_in_key)),
+				"check_in_date": checkin_date,
+			}
+		)
+		response["occupancy"] = occupancy
+		return response
+
+	frappe.cache.rpush(
+		PENDING_CHECK_INS_KEY,
+		json.dumps(
+			{
+				"event": str(event),
+				"token": ticket,
+				"scanned_at": scanned_at,
+				"gate": gate,
+				"user": frappe.session.user,
+			}
+		),
+	)
+	frappe.enqueue(
+		"buzz.check_in_engine.persist_check_ins",
+		queue="short",
+		job_id="persist_check_ins",
+		deduplicate=True,
+	)
+
+	response["message"] = _("Successfully checked in {attendee_name} for {checkin_date}").format(
+		attendee_name=response["ticket"]["attendee_name"],
+		checkin_date=frappe.format(checkin_date, {"fieldtype": "Date"}),
+	)
+	response["ticket"].update(
+		{"is_checked_in": True, "check_in_time": scanned_at, "check_in_date": checkin_date}
+	)
+	response["occupancy"] = enter_venue(event, venue, ticket) or get_occupancy(event, venue)
+	return response
+
+
+def check_out(ticket: str, event: str | int | None = None) -> dict:
+	"""Let a checked in ticket out of the venue, it can check in again later the same day."""
+	event = event or frappe.db.get_value("Event Ticket", ticket, "event")
+	entry = get_ticket_entry(event, ticket)
+	if not entry:
+		frappe.throw(_("Ticket not found"))
+
+	if not (occupancy := leave_venue(event, get_event_info(event)["venue"], ticket)):
+		frappe.throw(_("This ticket is not checked in at the venue"))
+
+	response = make_check_in_response(event, entry, _("Checked out {0}").format(entry["attendee_name"]))
+	response["occupancy"] = occupancy
+	return response
+
+
+def throw_already_checked_in(checked_in_at: str | bytes):
+	checked_in_at = get_datetime(frappe.safe_decode(checked_in_at))
+	frappe.throw(
+		_("This ticket was already checked in today ({0}).").format(
+			format_date(checked_in_at) + " at " + format_time(checked_in_at)
+		)
+	)
+
+
+def make_check_in_response(event: str | int, entry: dict, message: str) -> dict:
+	event_info = get_event_info(event)
+	return {
+		"message": message,
+		"ticket": {
+			"id": entry["id"],
+			"attendee_name": entry["attendee_name"],
+			"attendee_email": entry["attendee_email"],
+			"event_title": event_info["title"],
+			"ticket_type": entry["ticket_type"],
+			"venue": event_info["venue"],
+			"start_date": event_info["start_date"],
+			"start_time": event_info["start_time"],
+			"end_date": event_info["end_date"],
+			"end_time": event_info["end_time"],
+			"is_checked_in": False,
+			"check_in_time": None,
+			"booking_id": entry["booking_id"],
+			"add_ons": entry["add_ons"],
+		},
+		"payment_details": entry["payment_details"],
+	}
+
+
+def get_event_info(event: str | int) -> dict:
+	if event_info := frappe.cache.get(get_index_key(event, "event")):
+		return json.loads(event_info)
+	return frappe.db.get_value("Buzz Event", event, EVENT_FIELDS, as_dict=True)
+
+
+def get_ticket_entry(event: str | int, ticket: str) -> dict | None:
+	if entry := frappe.cache.get(get_index_key(event, f"ticket:{ticket}")):
+		return json.loads(entry)
+
+	if not frappe.cache.get(get_index_key(event, "event")):
+		return load_ticket_entry(event, ticket)
+
+
+def load_ticket_entry(event: str | int, ticket: str) -> dict | None:
+	"""Add a ticket and its check-in of today to the index on their own, while the index is cold."""
+	entry = build_ticket_entries({"name": ticket, "event": event, "docstatus": ("!=", 0)}).get(ticket)
+	if not entry:
+		return None
+
+	check_in = frappe.db.get_value(
+		"Event Check In",
+		{"ticket": ticket, "date": today(), "docstatus": 1},
+		["scanned_at", "creation"],
+		as_dict=True,
+	)
+	pipeline = frappe.cache.pipeline()
+	pipeline.set(get_index_key(event, f"ticket:{ticket}"), json.dumps(entry), ex=INDEX_EXPIRY_SECONDS)
+	if check_in:
+		pipeline.set(
+			get_checked_in_key(event, today(), ticket),
+			str(check_in.scanned_at or check_in.creation),
+			nx=True,
+			ex=INDEX_EXPIRY_SECONDS,
+		)
+	pipeline.execute()
+	return entry
+
+
+def prepare_check_in_index(event: str | int):
+	"""Warm the event's index in the background when a scanner opens it, unless it is warm."""
+	if frappe.cache.get(get_index_key(event, "event")):
+		return
+
+	frappe.enqueue(
+		"buzz.check_in_engine.warm_check_in_index",
+		queue="short",
+		job_id=f"warm_check_in_index:{event}",
+		deduplicate=True,
+		event=event,
+	)
+
+
+def warm_check_in_index(event: str | int):
+	"""(Re)build the event's ticket index and today's check-ins with a handful of set-based queries."""
+	event_info = frappe.db.get_value("Buzz Event", event, EVENT_FIELDS, as_dict=True)
+	if not event_info:
+		return
+
+	entries = build_ticket_entries({"event": event, "docstatus": ("!=", 0)})
+	check_ins = frappe.db.get_all(
+		"Event Check In",
+		filters={"event": event, "date": today(), "docstatus": 1},
+		fields=["ticket", "scanned_at", "creation"],
+	)
+
+	search_key = get_index_key(event, "search")
+	pipeline = frappe.cache.pipeline()
+	pipeline.delete(search_key)
+	for name, entry in entries.items():
+		pipeline.set(get_index_key(event, f"ticket:{name}"), json.dumps(entry), ex=INDEX_EXPIRY_SECONDS)
+		pipeline.zadd(search_key, get_search_members(entry))
+	pipeline.expire(search_key, INDEX_EXPIRY_SECONDS)
+
+	for check_in in check_ins:
+		pipeline.set(
+			get_checked_in_key(event, today(), check_in.ticket),
+			str(check_in.scanned_at or check_in.creation),
+			ex=INDEX_EXPIRY_SECONDS,
+		)
+
+	# written last, its presence marks the index as warm
+	pipeline.set(get_index_key(event, "event"), json.dumps(event_info, default=str), ex=INDEX_EXPIRY_SECONDS)
+	pipeline.execute()
+
+
+def build_ticket_entries(filters: dict) -> dict[str, dict]:
+	tickets = frappe.db.get_all(
+		"Event Ticket",
+		filters=filters,
+		fields=[
+			"name",
+			"attendee_name",
+			"attendee_email",
+			"ticket_type.title as ticket_type",
+			"booking",
+			"docstatus",
+		],
+	)
+	if not tickets:
+		return {}
+
+	add_ons_by_ticket = {}
+	for add_on in frappe.db.get_all(
+		"Ticket Add-on Value",
+		filters={"parenttype": "Event Ticket", "parent": ("in", [ticket.name for ticket in tickets])},
+		fields=[
+			"parent",
+			"add_on",
+			"add_on.title as add_on_title",
+			"add_on.user_selects_option as add_on_selects_option",
+			"value",
+			"price",
+			"currency",
+		],
+	):
+		add_ons_by_ticket.setdefault(add_on.pop("parent"), []).append(add_on)
+
+	payments_by_booking = {}
+	bookings = list({ticket.booking for ticket in tickets if ticket.booking})
+	if bookings:
+		for payment in frappe.db.get_all(
+			"Event Payment",
+			filters={
+				"reference_doctype": "Event Booking",
+				"reference_docname": ("in", bookings),
+				"payment_received": 1,
+			},
+			fields=["name", "amount", "currency", "reference_docname"],
+		):
+			payments_by_booking.setdefault(payment.pop("reference_docname"), payment)
+
+	return {
+		ticket.name: {
+			"id": ticket.name,
+			"attendee_name": ticket.attendee_name,
+			"attendee_email": ticket.attendee_email,
+			"ticket_type": ticket.ticket_type,
+			"booking_id": ticket.booking,
+			"docstatus": ticket.docstatus,
+			"add_ons": add_ons_by_ticket.get(ticket.name, []),
+			"payment_details": payments_by_booking.get(ticket.booking),
+		}
+		for ticket in tickets
+	}
+
+
+def update_ticket_in_index(doc, method=None):
+	"""Doc event handler, refreshes a changed ticket in its event's index."""
+	refresh_ticket_in_index(doc.name, doc.event)
+
+
+def refresh_ticket_in_index(ticket: str, event: str | int | None = None):
+	event = event or frappe.db.get_value("Event Ticket", ticket, "event")
+	if not event:
+		return
+
+	if not frappe.cache.get(get_index_key(event, "event")):
+		# a ticket scanned while the index was cold is looked up again on its next scan
+		frappe.cache.delete(get_index_key(event, f"ticket:{ticket}"))
+		return
+
+	if entry := build_ticket_entries({"name": ticket}).get(ticket):
+		pipeline = frappe.cache.pipeline()
+		pipeline.set(get_index_key(event, f"ticket:{ticket}"), json.dumps(entry), ex=INDEX_EXPIRY_SECONDS)
+		# terms of a previous name or email stay behind, searches check matches against the ticket itself
+		pipeline.zadd(get_index_key(event, "search"), get_search_members(entry))
+		pipeline.execute()
+
+
+def search_ticket_index(event: str | int, query: str, limit: int = 10) -> list[dict]:
+	"""Tickets of the event whose attendee name, email, booking or ticket ID start with each word of `query`."""
+	words = get_search_terms(query)
+	if not words or len(query.strip()) < MIN_SEARCH_LENGTH:
+		return []
+
+	if not frappe.cache.get(get_index_key(event, "event")):
+		warm_check_in_index(event)
+
+	# the longest word narrows the candidates down the most, they are read a page at a time
+	# until enough of them match every word of the query
+	prefix = max(words, key=len)
+	results, seen, offset = [], set(), 0
+	while len(results) < limit:
+		pipeline = frappe.cache.pipeline()
+		pipeline.zrangebylex(
+			get_index_key(event, "search"),
+			f"[{prefix}",
+			b"[" + prefix.encode() + b"\xff",
+			start=offset,
+			num=SEARCH_CANDIDATES,
+		)
+		members = pipeline.execute()[0]
+		tickets = [
+			ticket
+			for ticket in dict.fromkeys(frappe.safe_decode(member).rsplit("\0", 1)[1] for member in members)
+			if ticket not in seen
+		]
+		seen.update(tickets)
+		results.extend(get_search_matches(event, tickets, words))
+
+		if len(members) < SEARCH_CANDIDATES:
+			break
+		offset += SEARCH_CANDIDATES
+
+	return sorted(results, key=lambda result: (result["attendee_name"] or "").lower())[:limit]
+
+
+def get_search_matches(event: str | int, tickets: list[str], words: set[str]) -> list[dict]:
+	"""The candidate tickets that match every word of the query, with whether they checked in today."""
+	if not tickets:
+		return []
+
+	pipeline = frappe.cache.pipeline()
+	for ticket in tickets:
+		pipeline.get(get_index_key(event, f"ticket:{ticket}"))
+		pipeline.get(get_checked_in_key(event, today(), ticket))
+
+	matches = []
+	values = pipeline.execute()
+	for entry, checked_in_at in zip(values[::2], values[1::2], strict=True):
+		if not entry:
+			continue
+
+		entry = json.loads(entry)
+		terms = get_search_terms(entry)
+		if all(any(term.startswith(word) for term in terms) for word in words):
+			matches.append(
+				{
+					"id": entry["id"],
+					"attendee_name": entry["attendee_name"],
+					"attendee_email": entry["attendee_email"],
+					"ticket_type": entry["ticket_type"],
+					"booking_id": entry["booking_id"],
+					"is_cancelled": entry["docstatus"] == 2,
+					"is_checked_in": bool(checked_in_at),
+				}
+			)
+
+	return matches
+
+
+def get_search_terms(value: str | dict) -> set[str]:
+	"""Lower-cased words of a query, or of a ticket's attendee name, email, booking and ticket ID."""
+	if isinstance(value, dict):
+		value = " ".join(
+			filter(None, (value["attendee_name"], value["attendee_email"], value["booking_id"], value["id"]))
+		)
+
+	terms = set()
+	for word in value.lower().split():
+		terms.add(word)
+		# emails are found by the whole address, or by the part before the @
+		if "@" in word:
+			terms.add(word.split("@", 1)[0])
+	return terms
+
+
+def get_search_members(entry: dict) -> dict[str, int]:
+	# all scores are 0, so the sorted set orders its members by term, for ZRANGEBYLEX
+	return {f"{term}\0{entry['id']}": 0 for term in get_search_terms(entry)}
+
+
+def mark_checked_in(event: str | int, results: list[dict]):
+	"""Add check-ins recorded elsewhere (synced from door devices) to the day's check-ins and the occupancy.
+
+	Occupancy is counted whether or not the index is warm, it is not rebuilt from the check-ins.
+	"""
+	venue = frappe.db.get_value("Buzz Event", event, "venue")
+	checkin_date = getdate(today())
+	for result in results:
+		if result["status"] not in ("accepted", "duplicate") or getdate(result["scanned_at"]) != checkin_date:
+			continue
+
+		frappe.cache.set(
+			get_checked_in_key(event, today(), result["ticket"]),
+			str(result["scanned_at"]),
+			nx=True,
+			ex=INDEX_EXPIRY_SECONDS,
+		)
+		if result["status"] == "accepted":
+			enter_venue(event, venue, result["ticket"])
+		elif result.get("re_entry"):
+			# let back in offline after it scanned out, the day's check-in is already recorded
+			enter_venue(event, venue, result["ticket"], re_entry=True)
+
+
+def forget_check_in(event: str | int, date: str, ticket: str):
+	"""Undo a cancelled check-in at the doors, so the ticket can be checked in again that day."""
+	frappe.cache.delete(get_checked_in_key(event, str(getdate(date)), ticket))
+	# occupancy is only tracked for today
+	if getdate(date) == getdate(today()):
+		remove_from_venue(event, frappe.db.get_value("Buzz Event", event, "venue"), ticket)
+
+
+def persist_check_ins():
+	"""Write the check-ins admitted by the fast path to Event Check In, a batch at a time."""
+	lock_key = frappe.cache.make_key("buzz:check_in:persist_lock")
+	if not frappe.cache.set(lock_key, 1, nx=True, ex=PERSIST_LOCK_SECONDS):
+		return
+
+	try:
+		while pending := frappe.cache.lrange(PENDING_CHECK_INS_KEY, 0, PERSIST_BATCH_SIZE - 1):
+			scans_by_event = {}
+			for scan in map(json.loads, pending):
+				scans_by_event.setdefault((scan.pop("event"), scan.pop("user", None)), []).append(scan)
+
+			# the check-ins are recorded as the users who scanned them, not the job's user
+			for (event, user), scans in scans_by_event.items():
+				record_check_ins(event, scans, user=user)
+			frappe.db.commit()
+
+			# only dropped once written, a crash in between writes them again as duplicates
+			frappe.cache.ltrim(PENDING_CHECK_INS_KEY, len(pending), -1)
+	finally:
+		frappe.cache.delete(lock_key)
+
+
+def warm_check_in_indexes():
+	"""Warm the indexes of published events that are on today or tomorrow."""
+	for event in frappe.db.get_all(
+		"Buzz Event",
+		filters={"is_published": 1, "start_date": ("<=", add_days(today(), 1))},
+		or_filters={"end_date": (">=", today()), "start_date": (">=", today())},
+		pluck="name",
+	):
+		warm_check_in_index(event)
+
+
+def get_index_key(event: str | int, name: str) -> str:
+	return frappe.cache.make_key(f"buzz:check_in:{event}:{name}")
+
+
+def get_checked_in_key(event: str | int, date: str, ticket: str) -> str:
+	return get_index_key(event, f"checked_in:{date}:{ticket}")
@@ -0,0 +1,142 @@
+"""
+Live check-in counters for the arrivals view.
+
+Every check-in increments a Redis hash per event and day, with the total and a
+counter per ticket type and per gate, once its transaction commits. The new
+counters are pushed to the realtime room of Event Check In, which only the
+check-in managers can join, so any number of them can watch arrivals without
+querying Event Check In. A missing hash (first look
+at a day, or a flushed cache) is rebuilt from the database with one grouped
+query. Check-ins counted while a rebuild runs may or may not be in its query,
+so they are not applied to it: they mark it stale, and the next read rebuilds
+the counters again.
+"""
+
+from collections.abc import Iterable
+
+import frappe
+from frappe.query_builder.functions import Count
+from frappe.realtime import get_doctype_room
+from frappe.utils import getdate, today
+
+STATS_EXPIRY_SECONDS = 3 * 24 * 60 * 60
+REBUILD_LOCK_SECONDS = 30
+REALTIME_EVENT = "buzz_check_in_stats"
+
+
+def update_check_in_stats(event: str | int, check_ins: Iterable[dict], delta: int = 1):
+	"""Count check-ins (`{date, ticket_type, gate}`) in the live counters once the transaction commits."""
+	increments = {}
+	for check_in in check_ins:
+		fields = increments.setdefault(str(getdate(check_in["date"])), {})
+		for field in (
+			"total",
+			f"ticket_type:{check_in['ticket_type']}",
+			f"gate:{check_in.get('gate') or ''}",
+		):
+			fields[field] = fields.get(field, 0) + delta
+
+	if increments:
+		frappe.db.after_commit.add(lambda: apply_increments(event, increments))
+
+
+def apply_increments(event: str | int, increments: dict[str, dict[str, int]]):
+	for date, fields in increments.items():
+		key = get_stats_key(event, date)
+		# releasing a rebuild's lock tells it that its counters may miss these
+		if frappe.cache.delete(get_rebuild_lock_key(key)):
+			continue
+		# a day without counters is rebuilt from the database on its next read, which includes these
+		if not frappe.cache.expire(key, STATS_EXPIRY_SECONDS):
+			continue
+
+		pipeline = frappe.cache.pipeline()
+		for field, amount in fields.items():
+			pipeline.hincrby(key, field, amount)
+		pipeline.execute()
+
+		if date == today():
+			frappe.publish_realtime(
+				REALTIME_EVENT,
+				get_check_in_stats(event, date),
+				# not the Buzz Event's room, every user can read an event
+				room=get_doctype_room("Event Check In"),
+			)
+
+
+def get_check_in_stats(event: str | int, date: str | None = None) -> dict:
+	"""Check-ins of the event on `date` (today by default), in total, by ticket type and by gate."""
+	date = str(getdate(date or today()))
+	key = get_stats_key(event, date)
+	if not (counters := get_counters(key)):
+		counters = build_check_in_stats(event, date)
+
+	stats = {"event": event, "date": date, "total": 0, "by_ticket_type": {}, "by_gate": {}}
+	for field, count in counters.items():
+		field, count = frappe.safe_decode(field), int(count)
+		if field == "total":
+			stats["total"] = count
+		elif field.startswith("ticket_type:"):
+			stats["by_ticket_type"][field.removeprefix("ticket_type:")] = count
+		elif field.startswith("gate:"):
+			stats["by_gate"][field.removeprefix("gate:")] = count
+
+	return stats
+
+
+def build_check_in_stats(event: str | int, date: str) -> dict[str, int]:
+	"""Rebuild the counters of a day from the database, returns them."""
+	key = get_stats_key(event, date)
+	lock_key = get_rebuild_lock_key(key)
+	# another worker is rebuilding them, its counters are the ones kept
+	if not frappe.cache.set(lock_key, 1, nx=True, ex=REBUILD_LOCK_SECONDS):
+		return get_stats_fields(event, date)
+
+	fields = get_stats_fields(event, date)
+	pipeline = frappe.cache.pipeline()
+	pipeline.delete(key)
+	pipeline.hset(key, mapping=fields)
+	pipeline.expire(key, STATS_EXPIRY_SECONDS)
+	pipeline.execute()
+
+	# the lock was released by a check-in counted during the rebuild (or expired), start over on the next read
+	if not frappe.cache.delete(lock_key):
+		frappe.cache.delete(key)
+
+	return fields
+
+
+def get_stats_fields(event: str | int, date: str) -> dict[str, int]:
+	CheckIn = frappe.qb.DocType("Event Check In")
+	Ticket = frappe.qb.DocType("Event Ticket")
+	groups = (
+		frappe.qb.from_(CheckIn)
+		.join(Ticket)
+		.on(Ticket.name == CheckIn.ticket)
+		.select(Ticket.ticket_type, CheckIn.gate, Count("*").as_("count"))
+		.where((CheckIn.event == event) & (CheckIn.date == date) & (CheckIn.docstatus == 1))
+		.groupby(Ticket.ticket_type, CheckIn.gate)
+	).run(as_dict=True)
+
+	fields = {"total": 0}
+	for group in groups:
+		fields["total"] += group.count
+		for field in (f"ticket_type:{group.ticket_type}", f"gate:{group.gate or ''}"):
+			fields[field] = fields.get(field, 0) + group.count
+
+	return fields
+
+
+def get_counters(key: str) -> dict:
+	# through a pipeline, as `frappe.cache.hgetall` namespaces the key and unpickles the values itself
+	pipeline = frappe.cache.pipeline()
+	pipeline.hgetall(key)
+	return pipeline.execute()[0]
+
+
+def get_stats_key(event: str | int, date: str) -> str:
+	return frappe.cache.make_key(f"buzz:check_in_stats:{event}:{date}")
+
+
+def get_rebuild_lock_key(key: str) -> str:
+	return f"{key}:rebuild_lock"
@@ -0,0 +1,132 @@
+"""
+Check-in tokens that door scanners can verify without a network round trip.
+
+Ticket QR codes encode `<ticket>.<event>.<signature>`, signed with an ECDSA P-256
+key of the event. The event's public key and the list of cancelled tickets are
+downloaded by the scanner before the doors open (`buzz.api.get_offline_check_in_data`),
+after which it verifies every scan locally with WebCrypto and queues the
+check-ins for syncing. The signature is in the raw `r || s` form WebCrypto expects.
+
+The key pair is created when the event is published or its first ticket is
+submitted, in a request that commits it, never while a QR code is rendered.
+Signatures are deterministic (RFC 6979), so every worker renders the same
+image for a ticket.
+"""
+
+import base64
+
+import frappe
+from frappe import _
+from frappe.utils import now_datetime
+from frappe.utils.password import get_decrypted_password, set_encrypted_password
+
+from buzz.utils import urlsafe_b64decode, urlsafe_b64encode
+
+SIGNATURE_COMPONENT_BYTES = 32
+
+
+def make_check_in_token(ticket: str, event: str | int) -> str:
+	from cryptography.hazmat.primitives import hashes
+	from cryptography.hazmat.primitives.asymmetric import ec
+	from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+	message = f"{ticket}.{event}"
+	r, s = decode_dss_signature(
+		get_signing_key(event).sign(message.encode(), ec.ECDSA(hashes.SHA256(), deterministic_signing=True))
+	)
+	signature = r.to_bytes(SIGNATURE_COMPONENT_BYTES, "big") + s.to_bytes(SIGNATURE_COMPONENT_BYTES, "big")
+	return f"{message}.{urlsafe_b64encode(signature)}"
+
+
+def get_ticket_from_check_in_token(token: str | None) -> str | None:
+	"""Returns the ticket of a genuine check-in token, None for anything else."""
+	from cryptography.exceptions import InvalidSignature
+	from cryptography.hazmat.primitives import hashes
+	from cryptography.hazmat.primitives.asymmetric import ec
+	from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+	from cryptography.hazmat.primitives.serialization import load_der_public_key
+
+	if not token or token.count(".") != 2:
+		return None
+
+	ticket, event, signature = token.split(".")
+	public_key = frappe.get_cached_value("Buzz Event", event, "check_in_public_key")
+	if not public_key:
+		return None
+
+	try:
+		signature = urlsafe_b64decode(signature)
+		load_der_public_key(base64.b64decode(public_key)).verify(
+			encode_dss_signature(
+				int.from_bytes(signature[:SIGNATURE_COMPONENT_BYTES], "big"),
+				int.from_bytes(signature[SIGNATURE_COMPONENT_BYTES:], "big"),
+			),
+			f"{ticket}.{event}".encode(),
+			ec.ECDSA(hashes.SHA256()),
+		)
+	except (InvalidSignature, ValueError):
+		return None
+
+	return ticket
+
+
+def get_signing_key(event: str | int):
+	from cryptography.hazmat.primitives.asymmetric import ec
+
+	private_value = get_decrypted_password("Buzz Event", event, "check_in_private_key", raise_exception=False)
+	if not private_value:
+		frappe.throw(_("Event {0} has no check-in key yet").format(event))
+	return ec.derive_private_key(int(private_value, 16), ec.SECP256R1())
+
+
+def ensure_signing_key(event: str | int):
+	"""Create the event's key pair if it has none, from a request or job that commits it."""
+	if not frappe.db.get_value("Buzz Event", event, "check_in_public_key"):
+		create_signing_key(event)
+
+
+def create_signing_key(event: str | int) -> str:
+	"""Generate and store the event's key pair, returns the private value as hex."""
+	# whoever locks the event first creates the key, the others use theirs
+	frappe.db.get_value("Buzz Event", event, "name", for_update=True)
+	if private_value := get_decrypted_password(
+		"Buzz Event", event, "check_in_private_key", raise_exception=False
+	):
+		return private_value
+
+	private_value, public_key = generate_key_pair()
+	set_encrypted_password("Buzz Event", event, private_value, "check_in_private_key")
+	frappe.db.set_value(
+		"Buzz Event",
+		event,
+		{"check_in_public_key": public_key, "check_in_private_key": "*" * 10},
+		update_modified=False,
+	)
+	return private_value
+
+
+def generate_key_pair() -> tuple[str, str]:
+	"""A new P-256 key pair, the private value as hex and the public key as base64 SPKI."""
+	from cryptography.hazmat.primitives.asymmetric import ec
+	from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+	private_key = ec.generate_private_key(ec.SECP256R1())
+	public_key = private_key.public_key().public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+	return format(private_key.private_numbers().private_value, "064x"), base64.b64encode(public_key).decode()
+
+
+def get_verification_data(event: str | int) -> dict:
+	"""What a scanner needs to verify the event's tickets on its own."""
+	ensure_signing_key(event)
+
+	return {
+		"event": event,
+		# SPKI, base64, importable with `crypto.subtle.importKey("spki", ...)`
+		"public_key": frappe.db.get_value("Buzz Event", event, "check_in_public_key"),
+		"revoked_tickets": get_revoked_tickets(event),
+		"generated_at": now_datetime(),
+	}
+
+
+def get_revoked_tickets(event: str | int) -> list[str]:
+	return frappe.db.get_all("Event Ticket", filters={"event": event, "docstatus": 2}, pluck="name")
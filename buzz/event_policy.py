@@ -0,0 +1,54 @@
+"""
+Windows in which attendees may still change their bookings of an event.
+
+Ticket transfers, add-on changes and cancellation requests each close a number
+of days (set in Buzz Settings) before the event starts. The last day of every
+window only changes when the event or the settings do, so the dates are kept in
+Redis per event and dropped by doc events on either. Whether a window is still
+open is worked out from them against today's date on every read.
+"""
+
+import frappe
+from frappe.utils import add_days, getdate, today
+
+EVENT_POLICY_CACHE_KEY = "buzz:event_policy"
+# policy flag -> Buzz Settings field with the days before the event start it closes at
+POLICY_CUTOFFS = {
+	"can_transfer_ticket": "allow_transfer_ticket_before_event_start_days",
+	"can_change_add_ons": "allow_add_ons_change_before_event_start_days",
+	"can_request_cancellation": "allow_ticket_cancellation_request_before_event_start_days",
+}
+# Default to 7 days if no setting is found
+DEFAULT_CUTOFF_DAYS = 7
+
+
+def get_event_policy(event: str | int) -> dict:
+	"""What attendees of an event may still change today, with the last day each change is allowed."""
+	windows = frappe.cache.hget(EVENT_POLICY_CACHE_KEY, str(event), generator=lambda: build_windows(event))
+	policy = {"event": event}
+	for flag, last_day in windows.items():
+		policy[flag] = bool(last_day) and getdate(today()) <= getdate(last_day)
+		policy[f"{flag}_until"] = last_day
+	return policy
+
+
+def build_windows(event: str | int) -> dict:
+	start_date = frappe.db.get_value("Buzz Event", event, "start_date")
+	if not start_date:
+		# nothing can be changed for events without a start date
+		return dict.fromkeys(POLICY_CUTOFFS)
+
+	settings = frappe.get_cached_doc("Buzz Settings")
+	return {
+		flag: str(add_days(start_date, -settings.get(cutoff_field, DEFAULT_CUTOFF_DAYS)))
+		for flag, cutoff_field in POLICY_CUTOFFS.items()
+	}
+
+
+def clear_event_policy_cache(doc=None, method=None):
+	"""Doc event handler, drops the cached windows of the event, or of every event when settings change."""
+	if not doc or doc.doctype == "Buzz Settings":
+		frappe.cache.delete_value(EVENT_POLICY_CACHE_KEY)
+		return
+
+	frappe.cache.hdel(EVENT_POLICY_CACHE_KEY, str(doc.name))
@@ -39,6 +39,42 @@ frappe.ui.form.on("Buzz Event", {
 		});
 
 		frm.trigger("add_zoom_custom_actions");
+		frm.trigger("add_export_actions");
+	},
+
+	add_export_actions(frm) {
+		if (frm.is_new()) return;
+
+		const exports = {
+			tickets: __("Tickets"),
+			add_ons: __("Add-ons"),
+			custom_fields: __("Custom Fields"),
+			check_ins: __("Check-ins"),
+		};
+		for (const [export_type, label] of Object.entries(exports)) {
+			frm.add_custom_button(
+				label,
+				() => {
+					frappe.prompt(
+						{
+							fieldname: "file_format",
+							label: __("Format"),
+							fieldtype: "Select",
+							options: ["CSV", "XLSX"],
+							default: "CSV",
+						},
+						({ file_format }) =>
+							frm.call({
+								doc: frm.doc,
+								method: "export_data",
+								args: { export_type, file_format },
+							}),
+						__("Export {0}", [label])
+					);
+				},
+				__("Export")
+			);
+		}
 	},
 
 	add_zoom_custom_actions(frm) {
@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils.data import time_diff_in_seconds
 
+from buzz.check_in_tokens import generate_key_pair
+from buzz.exports import enqueue_event_export
 from buzz.utils import only_if_app_installed
 
 
@@ -25,7 +27,10 @@ class BuzzEvent(Document):
 		auto_send_pitch_deck: DF.Check
 		banner_image: DF.AttachImage | None
 		category: DF.Link
+		check_in_private_key: DF.Password | None
+		check_in_public_key: DF.SmallText | None
 		default_ticket_type: DF.Link | None
+		enable_waiting_room: DF.Check
 		end_date: DF.Date | None
 		end_time: DF.Time | None
 		external_registration_page: DF.Check
@@ -52,15 +57,22 @@ class BuzzEvent(Document):
 		time_zone: DF.Autocomplete | None
 		title: DF.Data
 		venue: DF.Link | None
+		waiting_room_admissions_per_minute: DF.Int
 	# end: auto-generated types
 
 	def validate(self):
 		self.validate_route()
+		self.set_check_in_key()
 
 	def validate_route(self):
 		if self.is_published and not self.route:
 			self.route = frappe.website.utils.cleanup_page_name(self.title).replace("_", "-")
 
+	def set_check_in_key(self):
+		"""Published events get the key pair their ticket QR codes are signed with, see `buzz.check_in_tokens`."""
+		if self.is_published and not self.check_in_public_key:
+			self.check_in_private_key, self.check_in_public_key = generate_key_pair()
+
 	@frappe.whitelist()
 	def after_insert(self):
 		self.create_default_records()
@@ -69,6 +81,7 @@ class BuzzEvent(Document):
 		records = [
 			{"doctype": "Sponsorship Tier", "title": "Normal"},
 			{"doctype": "Event Ticket Type", "title": "Normal"},
+			{"doctype": "Event Sales Summary"},
 		]
 		for record in records:
 			frappe.get_doc({**record, "event": self.name}).insert(ignore_permissions=True)
@@ -95,6 +108,12 @@ class BuzzEvent(Document):
 
 		return zoom_webinar
 
+	@frappe.whitelist()
+	def export_data(self, export_type: str, file_format: str = "CSV"):
+		frappe.only_for(["Event Manager", "System Manager"], True)
+		enqueue_event_export(self.name, export_type, file_format)
+		frappe.msgprint(frappe._("Your export is being prepared, you will be notified when it is ready"))
+
 	def on_update(self):
 		self.update_zoom_webinar()
 
@@ -1,8 +1,18 @@
 # Copyright (c) 2025, BWH Studios and Contributors
 # See license.txt
 
-# import frappe
+import csv
+import os
+import time
+from unittest.mock import patch
+
+import frappe
 from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, get_files_path, today
+
+from buzz import waiting_room
+from buzz.event_policy import clear_event_policy_cache, get_event_policy
+from buzz.exports import export_event_data, write_csv, write_xlsx
 
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
@@ -17,4 +27,165 @@ class IntegrationTestFEEvent(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def tearDown(self):
+		# the windows cached from rolled back event and settings changes must not outlive the test
+		clear_event_policy_cache()
+
+	def test_export_tickets(self):
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Export", "price": 0}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Export Guest",
+				"attendee_email": "export.guest@email.com",
+			}
+		).insert()
+		ticket.submit()
+
+		# the export job commits its File, the test's transaction is rolled back instead
+		with patch.object(frappe.db, "commit"), patch.object(frappe, "publish_realtime"):
+			export_event_data(test_event.name, "tickets", "CSV", "Administrator")
+		file_name = frappe.db.get_value(
+			"File",
+			{"attached_to_doctype": "Buzz Event", "attached_to_name": test_event.name},
+			"file_name",
+			order_by="creation desc",
+		)
+		path = get_files_path(file_name, is_private=1)
+		# the File is rolled back with the test, the file on disk is not
+		self.addCleanup(os.remove, path)
+		with open(path, newline="") as f:
+			rows = list(csv.reader(f))
+
+		self.assertEqual(rows[0][:3], ["Ticket", "Attendee Name", "Attendee Email"])
+		self.assertIn([str(ticket.name), "Export Guest", "export.guest@email.com"], [row[:3] for row in rows])
+
+	def test_export_cells_are_not_formulas(self):
+		from openpyxl import load_workbook
+
+		columns = ["Attendee Name", "Value", "Price"]
+		rows = [('=HYPERLINK("http://example.com")', "Ringing\x07 Bell", -5), ("@SUM(A1)", "-", 0)]
+		escaped = [['\'=HYPERLINK("http://example.com")', "Ringing Bell", -5], ["'@SUM(A1)", "'-", 0]]
+
+		path = get_files_path(f"export-{frappe.generate_hash(length=8)}", is_private=1)
+		write_csv(f"{path}.csv", columns, iter(rows))
+		self.addCleanup(os.remove, f"{path}.csv")
+		with open(f"{path}.csv", newline="") as f:
+			self.assertEqual(list(csv.reader(f))[1:], [[str(value) for value in row] for row in escaped])
+
+		write_xlsx(f"{path}.xlsx", columns, iter(rows))
+		self.addCleanup(os.remove, f"{path}.xlsx")
+		sheet = load_workbook(f"{path}.xlsx", read_only=True).worksheets[0]
+		self.assertEqual([list(row) for row in sheet.iter_rows(min_row=2, values_only=True)], escaped)
+
+	def test_event_policy_follows_event_and_settings(self):
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		settings = frappe.get_doc("Buzz Settings")
+		settings.allow_transfer_ticket_before_event_start_days = 7
+		settings.save()
+
+		test_event.start_date = add_days(today(), 10)
+		test_event.save()
+		self.assertTrue(get_event_policy(test_event.name)["can_transfer_ticket"])
+
+		# the cached windows are dropped when the event moves
+		test_event.start_date = add_days(today(), 3)
+		test_event.save()
+		policy = get_event_policy(test_event.name)
+		self.assertFalse(policy["can_transfer_ticket"])
+		self.assertEqual(policy["can_transfer_ticket_until"], str(add_days(today(), -4)))
+
+		# and when the cutoffs change
+		settings.allow_transfer_ticket_before_event_start_days = 2
+		settings.save()
+		self.assertTrue(get_event_policy(test_event.name)["can_transfer_ticket"])
+
+
+class IntegrationTestWaitingRoom(IntegrationTestCase):
+	def setUp(self):
+		self.test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		self.test_event.enable_waiting_room = 1
+		self.test_event.is_published = 1
+		self.test_event.waiting_room_admissions_per_minute = 2
+		self.test_event.save()
+
+	def tearDown(self):
+		frappe.cache.delete_keys(f"buzz:waiting_room:{self.test_event.name}:")
+
+	def test_queue_positions_and_admission(self):
+		event = self.test_event.name
+		first, second, third = (
+			waiting_room.get_waiting_room_status(event, user)
+			for user in ("first@email.com", "second@email.com", "third@email.com")
+		)
+
+		# the first round is let in right away, the rest wait their turn
+		self.assertEqual([first["position"], second["position"], third["position"]], [1, 2, 3])
+		self.assertTrue(first["admission_token"])
+		self.assertTrue(second["admission_token"])
+		self.assertIsNone(third["admission_token"])
+		self.assertEqual(third["people_ahead"], 1)
+
+		# joining again keeps the place taken
+		self.assertEqual(waiting_room.get_waiting_room_status(event, "third@email.com")["position"], 3)
+
+		with patch.object(frappe, "publish_realtime") as publish_realtime:
+			waiting_room.admit_waiting_buyers()
+		self.assertEqual(waiting_room.get_admitted_until(event), 4)
+		self.assertEqual(publish_realtime.call_args.args[1]["admitted_until"], 4)
+		self.assertTrue(waiting_room.get_waiting_room_status(event, "third@email.com")["admission_token"])
+
+		# a quiet queue does not bank admissions beyond one round past the last buyer
+		with patch.object(frappe, "publish_realtime"):
+			for _i in range(5):
+				waiting_room.admit_waiting_buyers()
+		self.assertEqual(waiting_room.get_admitted_until(event), 3 + 2)
+
+	def test_expired_admission_token(self):
+		event = self.test_event.name
+		token = waiting_room.make_admission_token(event, frappe.session.user)
+		waiting_room.validate_admission_token(event, token)
+
+		expired_at = time.time() + waiting_room.ADMISSION_TOKEN_MINUTES * 60 + 1
+		with patch.object(waiting_room.time, "time", return_value=expired_at):
+			self.assertRaises(frappe.PermissionError, waiting_room.validate_admission_token, event, token)
+
+	def test_admission_token_reuse_in_process_booking(self):
+		from buzz.api import process_booking
+
+		event = self.test_event.name
+		test_ticket_type = frappe.get_doc(
+			{
+				"doctype": "Event Ticket Type",
+				"event": event,
+				"title": "Queued",
+				"price": 0,
+				"is_published": True,
+			}
+		).insert()
+		attendees = [
+			{"full_name": "John Doe", "email": "john@email.com", "ticket_type": test_ticket_type.name}
+		]
+
+		self.assertRaises(frappe.PermissionError, process_booking, attendees, event)
+
+		# a token only admits the buyer it was issued to, for the event it was issued for
+		for token in (
+			waiting_room.make_admission_token(event, "someone.else@email.com"),
+			waiting_room.make_admission_token("another-event", frappe.session.user),
+		):
+			self.assertRaises(
+				frappe.PermissionError, process_booking, attendees, event, admission_token=token
+			)
+
+		token = waiting_room.get_waiting_room_status(event, frappe.session.user)["admission_token"]
+		bookings_before = frappe.db.count("Event Booking", {"event": event})
+		process_booking(attendees, event, admission_token=token)
+		# until it expires, e.g. to book again after a failed payment
+		process_booking(attendees, event, admission_token=token)
+		self.assertEqual(frappe.db.count("Event Booking", {"event": event}), bookings_before + 2)
@@ -21,6 +21,7 @@ class BuzzSettings(Document):
 		apply_gst_on_bookings: DF.Check
 		gst_percentage: DF.Percent
 		support_email: DF.Data | None
+		ticket_hold_minutes: DF.Int
 	# end: auto-generated types
 
 	def validate(self):
@@ -1,8 +1,15 @@
 # Copyright (c) 2025, BWH Studios and contributors
 # For license information, please see license.txt
 
+from datetime import datetime
+
 import frappe
 from frappe.model.document import Document
+from frappe.utils import get_datetime, getdate, now_datetime
+from frappe.utils.data import convert_utc_to_system_timezone
+
+from buzz.check_in_stats import update_check_in_stats
+from buzz.check_in_tokens import get_ticket_from_check_in_token
 
 
 class EventCheckIn(Document):
@@ -17,9 +24,224 @@ class EventCheckIn(Document):
 		amended_from: DF.Link | None
 		date: DF.Date | None
 		event: DF.Link
+		gate: DF.Data | None
+		scanned_at: DF.Datetime | None
 		ticket: DF.Link
 	# end: auto-generated types
 
 	def before_insert(self):
+		if not self.scanned_at:
+			self.scanned_at = now_datetime()
 		if not self.date:
-			self.date = frappe.utils.today()
+			self.date = getdate(self.scanned_at)
+
+	def on_submit(self):
+		update_check_in_stats(self.event, [self.get_stats_entry()])
+
+	def on_cancel(self):
+		update_check_in_stats(self.event, [self.get_stats_entry()], delta=-1)
+		frappe.db.after_commit.add(self.forget_check_in)
+
+	def forget_check_in(self):
+		# the check-in engine records its check-ins with this module
+		from buzz.check_in_engine import forget_check_in
+
+		forget_check_in(self.event, self.date, self.ticket)
+
+	def get_stats_entry(self) -> dict:
+		return {
+			"date": self.date,
+			"ticket_type": frappe.db.get_value("Event Ticket", self.ticket, "ticket_type"),
+			"gate": self.gate,
+		}
+
+
+def on_doctype_update():
+	add_unique_active_check_in()
+	# reports and live counters read an event's check-ins by day
+	frappe.db.add_index("Event Check In", ["event", "docstatus", "date"])
+
+
+def add_unique_active_check_in():
+	"""A ticket checks in once a day, however many doors scan it at the same time.
+
+	Only draft and submitted check-ins count, a day can have any number of cancelled ones.
+	"""
+	if frappe.db.db_type == "postgres":
+		frappe.db.sql_ddl(
+			"""create unique index if not exists unique_active_ticket_date
+			on "tabEvent Check In" (ticket, date) where docstatus < 2"""
+		)
+		return
+
+	# NULL for cancelled check-ins, which a unique key lets repeat
+	if not frappe.db.has_column("Event Check In", "_active"):
+		frappe.db.sql_ddl(
+			"""alter table `tabEvent Check In`
+			add column `_active` tinyint as (if(docstatus < 2, 1, null)) stored"""
+		)
+	frappe.db.add_unique(
+		"Event Check In", ["ticket", "date", "_active"], constraint_name="unique_active_ticket_date"
+	)
+
+
+def record_check_ins(event: str | int, scans: list[dict], user: str | None = None) -> list[dict]:
+	"""Check in a batch of scans collected by a door device, returning a result per scan.
+
+	Each scan is `{"token": <check-in token or ticket ID>, "scanned_at": <datetime>, "gate": <gate>}`,
+	flagged `re_entry` if the device let the ticket back in after it scanned out.
+	Tickets are read with one query and the new check-ins are written with one
+	insert, which skips the tickets already checked in that day (by another
+	device, or a concurrent batch) on the unique (ticket, date) index. A ticket
+	checks in once per day: the earliest scan wins, later scans of it are
+	reported as duplicates. The check-ins are owned by `user`, the session user by default.
+	"""
+	results = []
+	for scan in scans:
+		token = scan.get("token") or ""
+		scanned_at = get_scan_time(scan.get("scanned_at"))
+		results.append(
+			frappe._dict(
+				ticket=get_ticket_from_check_in_token(token) or token,
+				scanned_at=scanned_at,
+				date=getdate(scanned_at),
+				gate=scan.get("gate"),
+				re_entry=bool(scan.get("re_entry")),
+				status=None,
+			)
+		)
+
+	tickets = get_tickets_for_check_in(list({result.ticket for result in results if result.ticket}))
+
+	new_check_ins = {}
+	for result in sorted(results, key=lambda result: result.scanned_at):
+		ticket = tickets.get(result.ticket)
+		if not ticket or str(ticket.event) != str(event):
+			result.status = "unknown"
+		elif ticket.docstatus == 2:
+			result.status = "cancelled"
+		elif ticket.docstatus != 1:
+			result.status = "unknown"
+		elif (ticket.name, result.date) in new_check_ins:
+			result.status = "duplicate"
+		else:
+			result.status = "accepted"
+			result.ticket_type = ticket.ticket_type
+			new_check_ins[(ticket.name, result.date)] = result
+
+	inserted = insert_check_ins(event, new_check_ins.values(), user or frappe.session.user)
+	if conflicts := [result for result in new_check_ins.values() if result.name not in inserted]:
+		keep_earliest_scans(conflicts)
+
+	update_check_in_stats(event, [result for result in new_check_ins.values() if result.name in inserted])
+
+	return [
+		{
+			"ticket": result.ticket,
+			"status": result.status,
+			"scanned_at": result.scanned_at,
+			"re_entry": result.re_entry,
+		}
+		for result in results
+	]
+
+
+def keep_earliest_scans(conflicts: list[dict]):
+	"""Scans of tickets already checked in that day are duplicates, the earliest scan time is kept."""
+	existing_check_ins = get_existing_check_ins([result.ticket for result in conflicts])
+
+	for result in conflicts:
+		result.status = "duplicate"
+		existing = existing_check_ins.get((result.ticket, result.date))
+		if existing and existing.scanned_at and result.scanned_at < get_datetime(existing.scanned_at):
+			# scanned earlier at a door that was offline, the earliest scan is the one kept
+			frappe.db.set_value("Event Check In", existing.name, "scanned_at", result.scanned_at)
+
+
+def get_tickets_for_check_in(ticket_names: list[str]) -> dict:
+	if not ticket_names:
+		return {}
+
+	return {
+		ticket.name: ticket
+		for ticket in frappe.db.get_all(
+			"Event Ticket",
+			filters={"name": ("in", ticket_names)},
+			fields=["name", "event", "ticket_type", "docstatus"],
+		)
+	}
+
+
+def get_existing_check_ins(ticket_names: list[str]) -> dict:
+	if not ticket_names:
+		return {}
+
+	return {
+		(check_in.ticket, getdate(check_in.date)): check_in
+		for check_in in frappe.db.get_all(
+			"Event Check In",
+			filters={"ticket": ("in", ticket_names), "docstatus": 1},
+			fields=["name", "ticket", "date", "scanned_at"],
+		)
+	}
+
+
+def get_scan_time(value: str | None) -> datetime:
+	"""Scan times come from devices, in UTC (ISO 8601) or the system time zone."""
+	if not value:
+		return now_datetime()
+
+	scanned_at = get_datetime(value)
+	if scanned_at.tzinfo:
+		scanned_at = convert_utc_to_system_timezone(scanned_at).replace(tzinfo=None)
+	return min(scanned_at, now_datetime())
+
+
+def insert_check_ins(event: str | int, check_ins, user: str) -> set[str]:
+	"""Insert submitted check-ins, skipping those that conflict with an existing one, returns the inserted."""
+	now = now_datetime()
+	values = []
+	for check_in in check_ins:
+		check_in.name = frappe.generate_hash(length=10)
+		values.append(
+			(
+				check_in.name,
+				event,
+				check_in.ticket,
+				check_in.date,
+				check_in.scanned_at,
+				check_in.gate,
+				1,
+				user,
+				user,
+				now,
+				now,
+			)
+		)
+
+	if not values:
+		return set()
+
+	frappe.db.bulk_insert(
+		"Event Check In",
+		[
+			"name",
+			"event",
+			"ticket",
+			"date",
+			"scanned_at",
+			"gate",
+			"docstatus",
+			"owner",
+			"modified_by",
+			"creation",
+			"modified",
+		],
+		values,
+		ignore_duplicates=True,
+	)
+	return set(
+		frappe.db.get_all(
+			"Event Check In", filters={"name": ("in", [value[0] for value in values])}, pluck="name"
+		)
+	)
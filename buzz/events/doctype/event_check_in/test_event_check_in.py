@@ -1,7 +1,7 @@
 # Copyright (c) 2025, BWH Studios and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests import IntegrationTestCase
 
 # On IntegrationTestCase, the doctype test records and all
@@ -17,4 +17,379 @@ class IntegrationTestEventCheckIn(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def test_offline_check_in_token(self):
+		from buzz.check_in_tokens import (
+			ensure_signing_key,
+			get_ticket_from_check_in_token,
+			get_verification_data,
+			make_check_in_token,
+		)
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		ensure_signing_key(test_event.name)
+		token = make_check_in_token("T001", test_event.name)
+
+		self.assertEqual(get_ticket_from_check_in_token(token), "T001")
+		# every worker renders the same QR code for a ticket
+		self.assertEqual(make_check_in_token("T001", test_event.name), token)
+		self.assertTrue(get_verification_data(test_event.name)["public_key"])
+
+		# a token can not be moved to another ticket
+		_ticket, event, signature = token.split(".")
+		self.assertIsNone(get_ticket_from_check_in_token(f"T002.{event}.{signature}"))
+		self.assertIsNone(get_ticket_from_check_in_token("T001"))
+
+	def test_batch_check_in(self):
+		from buzz.check_in_tokens import make_check_in_token
+		from buzz.events.doctype.event_check_in.event_check_in import record_check_ins
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Door", "price": 0}
+		).insert()
+
+		tickets = []
+		for i in range(2):
+			ticket = frappe.get_doc(
+				{
+					"doctype": "Event Ticket",
+					"event": test_event.name,
+					"ticket_type": test_ticket_type.name,
+					"attendee_name": f"Guest {i}",
+					"attendee_email": f"guest{i}@email.com",
+				}
+			).insert()
+			ticket.submit()
+			tickets.append(ticket)
+		tickets[1].cancel()
+
+		token = make_check_in_token(tickets[0].name, test_event.name)
+		results = record_check_ins(
+			test_event.name,
+			[
+				{"token": token, "scanned_at": "2026-01-10 10:05:00"},
+				# scanned earlier on another device, uploaded in the same batch
+				{"token": token, "scanned_at": "2026-01-10 10:00:00"},
+				{"token": tickets[1].name, "scanned_at": "2026-01-10 10:01:00"},
+				{"token": "T-DOES-NOT-EXIST", "scanned_at": "2026-01-10 10:02:00"},
+			],
+		)
+
+		self.assertEqual([r["status"] for r in results], ["duplicate", "accepted", "cancelled", "unknown"])
+		self.assertEqual(
+			frappe.db.get_value("Event Check In", {"ticket": tickets[0].name}, "scanned_at"),
+			frappe.utils.get_datetime("2026-01-10 10:00:00"),
+		)
+
+		# a later batch from another door does not check the ticket in again
+		results = record_check_ins(test_event.name, [{"token": token, "scanned_at": "2026-01-10 11:00:00"}])
+		self.assertEqual(results[0]["status"], "duplicate")
+		self.assertEqual(frappe.db.count("Event Check In", {"ticket": tickets[0].name}), 1)
+
+	def test_fast_path_check_in(self):
+		from unittest.mock import patch
+
+		from buzz.check_in_engine import (
+			check_in,
+			get_check_in_details,
+			get_index_key,
+			persist_check_ins,
+		)
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Fast Lane", "price": 0}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Fast Guest",
+				"attendee_email": "fast.guest@email.com",
+			}
+		).insert()
+		ticket.submit()
+		# no scanner has opened the event yet, the ticket is looked up on its own
+		frappe.cache.delete(get_index_key(test_event.name, "event"))
+
+		details = get_check_in_details(ticket.name, test_event.name)
+		self.assertEqual(details["ticket"]["attendee_name"], "Fast Guest")
+		self.assertEqual(details["ticket"]["ticket_type"], "Fast Lane")
+
+		check_in(ticket.name, test_event.name)
+		# a second door scanning the same ticket is turned away before anything is written
+		self.assertRaises(frappe.ValidationError, check_in, ticket.name, test_event.name)
+		self.assertFalse(frappe.db.exists("Event Check In", {"ticket": ticket.name}))
+
+		# written by a background job, as the user who scanned the ticket
+		frappe.set_user("Guest")
+		try:
+			with patch.object(frappe.db, "commit"):
+				persist_check_ins()
+		finally:
+			frappe.set_user("Administrator")
+		self.assertEqual(frappe.db.count("Event Check In", {"ticket": ticket.name}), 1)
+		self.assertEqual(
+			frappe.db.get_value("Event Check In", {"ticket": ticket.name}, ["owner", "modified_by"]),
+			("Administrator", "Administrator"),
+		)
+
+	def test_check_in_is_unique_per_day(self):
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Once a Day", "price": 0}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Daily Guest",
+				"attendee_email": "daily.guest@email.com",
+			}
+		).insert()
+		ticket.submit()
+
+		check_in = {"doctype": "Event Check In", "ticket": ticket.name, "date": "2026-01-10"}
+		frappe.get_doc(check_in).insert()
+		self.assertRaises(frappe.UniqueValidationError, frappe.get_doc(check_in).insert)
+
+		# the next day is a new check-in
+		frappe.get_doc({**check_in, "date": "2026-01-11"}).insert()
+
+	def test_cancelled_check_ins_do_not_count(self):
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Cancelled In", "price": 0}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Undecided Guest",
+				"attendee_email": "undecided.guest@email.com",
+			}
+		).insert()
+		ticket.submit()
+
+		check_in = {"doctype": "Event Check In", "ticket": ticket.name, "date": "2026-01-10"}
+		for _i in range(2):
+			doc = frappe.get_doc(check_in).insert()
+			doc.submit()
+			# a draft alongside a submitted check-in is a second check-in too
+			self.assertRaises(frappe.UniqueValidationError, frappe.get_doc(check_in).insert)
+			doc.cancel()
+
+		frappe.get_doc(check_in).insert().submit()
+
+	def test_live_check_in_stats(self):
+		from buzz.check_in_stats import get_check_in_stats, get_stats_key
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Counted", "price": 0}
+		).insert()
+		for i, gate in enumerate(["North", "North", "South"]):
+			ticket = frappe.get_doc(
+				{
+					"doctype": "Event Ticket",
+					"event": test_event.name,
+					"ticket_type": test_ticket_type.name,
+					"attendee_name": f"Counted Guest {i}",
+					"attendee_email": f"counted{i}@email.com",
+				}
+			).insert()
+			ticket.submit()
+			frappe.get_doc(
+				{"doctype": "Event Check In", "ticket": ticket.name, "gate": gate}
+			).insert().submit()
+
+		# built from the database when there are no counters yet
+		frappe.cache.delete(get_stats_key(test_event.name, frappe.utils.today()))
+		stats = get_check_in_stats(test_event.name)
+
+		self.assertEqual(stats["by_ticket_type"][str(test_ticket_type.name)], 3)
+		self.assertEqual(stats["by_gate"]["North"], 2)
+		self.assertEqual(stats["by_gate"]["South"], 1)
+
+	def test_check_in_counted_during_stats_rebuild(self):
+		from unittest.mock import patch
+
+		from buzz import check_in_stats
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		today = frappe.utils.today()
+		key = check_in_stats.get_stats_key(test_event.name, today)
+		frappe.cache.delete(key)
+		get_stats_fields = check_in_stats.get_stats_fields
+
+		def count_check_in_during_rebuild(event, date):
+			fields = get_stats_fields(event, date)
+			# committed after the rebuild's query, which does not include it
+			check_in_stats.apply_increments(event, {date: {"total": 1}})
+			return fields
+
+		with patch.object(check_in_stats, "get_stats_fields", side_effect=count_check_in_during_rebuild):
+			check_in_stats.get_check_in_stats(test_event.name)
+
+		# the rebuilt counters may be missing it, they are rebuilt again on the next read
+		self.assertFalse(check_in_stats.get_counters(key))
+		check_in_stats.get_check_in_stats(test_event.name)
+		self.assertTrue(check_in_stats.get_counters(key))
+
+	def test_re_entry_and_occupancy(self):
+		from buzz.check_in_engine import check_in, check_out, warm_check_in_index
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "In and Out", "price": 0}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Wandering Guest",
+				"attendee_email": "wandering.guest@email.com",
+			}
+		).insert()
+		ticket.submit()
+		warm_check_in_index(test_event.name)
+
+		occupancy = check_in(ticket.name, test_event.name)["occupancy"]["current"]
+		self.assertEqual(check_out(ticket.name, test_event.name)["occupancy"]["current"], occupancy - 1)
+		# a ticket that is outside can not leave again
+		self.assertRaises(frappe.ValidationError, check_out, ticket.name, test_event.name)
+
+		# it is let back in once, and only after it left
+		self.assertEqual(check_in(ticket.name, test_event.name)["occupancy"]["current"], occupancy)
+		self.assertRaises(frappe.ValidationError, check_in, ticket.name, test_event.name)
+
+	def test_cancelled_check_in_is_forgotten_at_the_doors(self):
+		from unittest.mock import patch
+
+		from buzz.check_in_engine import check_in, persist_check_ins, warm_check_in_index
+		from buzz.occupancy import get_occupancy
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{
+				"doctype": "Event Ticket Type",
+				"event": test_event.name,
+				"title": "Let In By Mistake",
+				"price": 0,
+			}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Mistaken Guest",
+				"attendee_email": "mistaken.guest@email.com",
+			}
+		).insert()
+		ticket.submit()
+		warm_check_in_index(test_event.name)
+
+		occupancy = check_in(ticket.name, test_event.name)["occupancy"]["current"]
+		with patch.object(frappe.db, "commit"):
+			persist_check_ins()
+		frappe.get_doc("Event Check In", {"ticket": ticket.name, "docstatus": 1}).cancel()
+
+		# the doors only forget it once the cancellation is committed
+		self.assertRaises(frappe.ValidationError, check_in, ticket.name, test_event.name)
+		frappe.db.after_commit.run()
+		self.assertEqual(get_occupancy(test_event.name, test_event.venue)["current"], occupancy - 1)
+
+		self.assertEqual(check_in(ticket.name, test_event.name)["occupancy"]["current"], occupancy)
+
+	def test_synced_check_ins_count_toward_occupancy(self):
+		from buzz.check_in_engine import check_out, get_index_key, mark_checked_in
+		from buzz.events.doctype.event_check_in.event_check_in import record_check_ins
+		from buzz.occupancy import get_occupancy
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Synced", "price": 0}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Offline Guest",
+				"attendee_email": "offline.guest@email.com",
+			}
+		).insert()
+		ticket.submit()
+		# nothing has been scanned at this server yet
+		frappe.cache.delete(get_index_key(test_event.name, "event"))
+		occupancy = get_occupancy(test_event.name, test_event.venue)["current"]
+
+		mark_checked_in(test_event.name, record_check_ins(test_event.name, [{"token": ticket.name}]))
+		self.assertEqual(get_occupancy(test_event.name, test_event.venue)["current"], occupancy + 1)
+
+		# let back in by a door that was offline after it scanned out
+		check_out(ticket.name, test_event.name)
+		results = record_check_ins(test_event.name, [{"token": ticket.name, "re_entry": True}])
+		self.assertEqual(results[0]["status"], "duplicate")
+		mark_checked_in(test_event.name, results)
+		self.assertEqual(get_occupancy(test_event.name, test_event.venue)["current"], occupancy + 1)
+
+	def test_attendee_search(self):
+		from buzz.check_in_engine import search_ticket_index, warm_check_in_index
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Searchable", "price": 0}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Zebulon Quartermaine",
+				"attendee_email": "zq.forgetful@email.com",
+			}
+		).insert()
+		ticket.submit()
+		warm_check_in_index(test_event.name)
+
+		for query in ("zebu", "quarter zeb", "zq.forg", ticket.name):
+			self.assertIn(ticket.name, [r["id"] for r in search_ticket_index(test_event.name, query)], query)
+
+		self.assertEqual(search_ticket_index(test_event.name, "zebulon smith"), [])
+		self.assertEqual(search_ticket_index(test_event.name, "z"), [])
+
+	def test_attendee_search_reads_past_the_first_candidates(self):
+		from unittest.mock import patch
+
+		from buzz import check_in_engine
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Family", "price": 0}
+		).insert()
+		tickets = []
+		for first_name in ("Yusuf", "Yvonne"):
+			ticket = frappe.get_doc(
+				{
+					"doctype": "Event Ticket",
+					"event": test_event.name,
+					"ticket_type": test_ticket_type.name,
+					"attendee_name": f"{first_name} Barringtonshire",
+					"attendee_email": f"{first_name.lower()}.b@email.com",
+				}
+			).insert()
+			ticket.submit()
+			tickets.append(ticket.name)
+		check_in_engine.warm_check_in_index(test_event.name)
+
+		# the first candidate of the longest word does not match the other word
+		with patch.object(check_in_engine, "SEARCH_CANDIDATES", 1):
+			results = check_in_engine.search_ticket_index(test_event.name, "barringtonshire yvo")
+
+		self.assertEqual([result["id"] for result in results], [tickets[1]])
@@ -44,3 +44,47 @@ class IntegrationTestEventSponsor(IntegrationTestCase):
 		self.assertEqual(test_enquiry.status, "Paid")
 
 		self.assertTrue(frappe.db.exists("Event Sponsor", {"enquiry": test_enquiry.name}))
+
+	def test_sponsorship_inquiries_query_count(self):
+		from buzz.api import get_sponsorship_details, get_user_sponsorship_inquiries
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_sponsorship_tier = frappe.get_doc(
+			{
+				"doctype": "Sponsorship Tier",
+				"event": test_event.name,
+				"title": "Gold",
+				"price": 500,
+				"currency": "INR",
+			}
+		).insert()
+		enquiries = [
+			frappe.get_doc(
+				{
+					"doctype": "Sponsorship Enquiry",
+					"event": test_event.name,
+					"company_name": f"Test Studios {i}",
+					"tier": test_sponsorship_tier.name,
+				}
+			).insert()
+			for i in range(5)
+		]
+		enquiries[0].on_payment_authorized("Completed")
+
+		# titles are joined in, the sponsors are checked in one more query
+		with self.assertQueryCount(2):
+			inquiries = get_user_sponsorship_inquiries()
+
+		inquiries = {inquiry.name: inquiry for inquiry in inquiries}
+		for enquiry in enquiries:
+			self.assertEqual(inquiries[enquiry.name].event_title, test_event.title)
+			self.assertEqual(inquiries[enquiry.name].tier_title, "Gold")
+		self.assertTrue(inquiries[enquiries[0].name].has_sponsor)
+		self.assertFalse(inquiries[enquiries[1].name].has_sponsor)
+
+		with self.assertQueryCount(2):
+			details = get_sponsorship_details(enquiries[0].name)
+
+		self.assertEqual(details["enquiry"]["tier_title"], "Gold")
+		self.assertEqual(details["event_details"]["title"], test_event.title)
+		self.assertEqual(details["sponsor_details"]["tier_title"], "Gold")
@@ -14,6 +14,7 @@ class ScheduleItem(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		capacity: DF.Int
 		date: DF.Date
 		description: DF.Data | None
 		end_time: DF.Time
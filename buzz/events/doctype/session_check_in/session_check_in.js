@@ -0,0 +1,8 @@
+// Copyright (c) 2026, BWH Studios and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Session Check In", {
+// 	refresh(frm) {
+
+// 	},
+// });
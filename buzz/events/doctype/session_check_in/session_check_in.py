@@ -0,0 +1,38 @@
+# Copyright (c) 2026, BWH Studios and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import getdate, now_datetime
+
+
+class SessionCheckIn(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		date: DF.Date | None
+		event: DF.Link
+		scanned_at: DF.Datetime | None
+		schedule_item: DF.Data
+		talk: DF.Link | None
+		ticket: DF.Link
+		track: DF.Link | None
+	# end: auto-generated types
+
+	def before_insert(self):
+		if not self.scanned_at:
+			self.scanned_at = now_datetime()
+		if not self.date:
+			self.date = getdate(self.scanned_at)
+
+
+def on_doctype_update():
+	# a ticket takes one seat in a session, however often it is scanned at the door
+	frappe.db.add_unique(
+		"Session Check In", ["ticket", "schedule_item"], constraint_name="unique_ticket_schedule_item"
+	)
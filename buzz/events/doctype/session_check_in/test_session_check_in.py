@@ -0,0 +1,66 @@
+# Copyright (c) 2026, BWH Studios and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class IntegrationTestSessionCheckIn(IntegrationTestCase):
+	"""
+	Integration tests for SessionCheckIn.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def test_session_capacity(self):
+		from buzz.session_attendance import check_in_to_session, get_attendance_by_session
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		track = frappe.get_doc(
+			{"doctype": "Event Track", "__newname": "Small Room", "event": test_event.name, "capacity": 1}
+		).insert()
+		test_event.append(
+			"schedule",
+			{
+				"type": "Break",
+				"description": "Workshop",
+				"track": track.name,
+				"date": frappe.utils.today(),
+				"start_time": "10:00:00",
+				"end_time": "11:00:00",
+			},
+		)
+		test_event.save()
+		schedule_item = test_event.schedule[-1].name
+
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Workshop", "price": 0}
+		).insert()
+		tickets = []
+		for i in range(2):
+			ticket = frappe.get_doc(
+				{
+					"doctype": "Event Ticket",
+					"event": test_event.name,
+					"ticket_type": test_ticket_type.name,
+					"attendee_name": f"Workshop Guest {i}",
+					"attendee_email": f"workshop{i}@email.com",
+				}
+			).insert()
+			ticket.submit()
+			tickets.append(ticket)
+
+		attendance = check_in_to_session(tickets[0].name, schedule_item)["attendance"]
+		self.assertEqual(attendance["attendees"], 1)
+		self.assertTrue(attendance["is_full"])
+
+		self.assertRaises(frappe.ValidationError, check_in_to_session, tickets[0].name, schedule_item)
+		# the room is full, and the rejected scan does not take a seat
+		self.assertRaises(frappe.ValidationError, check_in_to_session, tickets[1].name, schedule_item)
+		attendance = {item["schedule_item"]: item for item in get_attendance_by_session(test_event.name)}
+		self.assertEqual(attendance[schedule_item]["attendees"], 1)
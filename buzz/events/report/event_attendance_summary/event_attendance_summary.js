@@ -10,5 +10,37 @@ frappe.query_reports["Event Attendance Summary"] = {
 			options: "Buzz Event",
 			reqd: 1,
 		},
+		{
+			fieldname: "sort_by",
+			label: __("Sort By"),
+			fieldtype: "Select",
+			options: [
+				{ value: "attendee_name", label: __("Attendee Name") },
+				{ value: "attendee_email", label: __("Attendee Email") },
+				{ value: "ticket_type", label: __("Ticket Type") },
+				{ value: "ticket", label: __("Ticket") },
+			],
+			default: "attendee_name",
+		},
+		{
+			fieldname: "sort_order",
+			label: __("Sort Order"),
+			fieldtype: "Select",
+			options: ["Ascending", "Descending"],
+			default: "Ascending",
+		},
+		{
+			fieldname: "page_length",
+			label: __("Rows per Page"),
+			fieldtype: "Select",
+			options: ["100", "500", "1000", "5000"],
+			default: "500",
+		},
+		{
+			fieldname: "page",
+			label: __("Page"),
+			fieldtype: "Int",
+			default: 1,
+		},
 	],
 };
@@ -3,7 +3,18 @@
 
 import frappe
 from frappe import _
-from frappe.utils import formatdate
+from frappe.query_builder import Case, Order
+from frappe.query_builder.functions import Count, Max
+from frappe.utils import cint, formatdate
+
+DEFAULT_PAGE_LENGTH = 500
+EXPORT_METHOD = "frappe.desk.query_report.export_query"
+SORT_FIELDS = {
+	"attendee_name": "attendee_name",
+	"attendee_email": "attendee_email",
+	"ticket_type": "ticket_type",
+	"ticket": "name",
+}
 
 
 def execute(filters: dict | None = None):
@@ -17,30 +28,39 @@ def execute(filters: dict | None = None):
 	if not event:
 		return [], []
 
-	# Get all unique check-in dates for this event (sorted)
-	check_in_dates = get_check_in_dates(event)
+	# Attendees per check-in date (sorted), the chart and summary are built from these counts
+	day_counts = get_day_counts(event)
+	check_in_dates = list(day_counts)
 
 	columns = get_columns(check_in_dates)
-	data = get_data(event, check_in_dates)
-	chart = get_chart(data, check_in_dates)
-	report_summary = get_report_summary(data, check_in_dates)
+	data = get_data(event, check_in_dates, filters)
+	chart = get_chart(day_counts)
+	report_summary = get_report_summary(day_counts, get_total_attendees(event))
 
 	return columns, data, None, chart, report_summary
 
 
-def get_check_in_dates(event: str) -> list:
-	"""Get all unique check-in dates for the event, sorted chronologically."""
-	dates = frappe.db.sql(
-		"""
-		SELECT DISTINCT date
-		FROM `tabEvent Check In`
-		WHERE event = %s AND docstatus = 1 AND date IS NOT NULL
-		ORDER BY date ASC
-		""",
-		(event,),
-		as_dict=True,
-	)
-	return [d.date for d in dates]
+def get_day_counts(event: str) -> dict:
+	"""Get the number of tickets checked in on each check-in date of the event, sorted chronologically."""
+	check_in = frappe.qb.DocType("Event Check In")
+	rows = (
+		frappe.qb.from_(check_in)
+		.select(check_in.date, Count(check_in.ticket).distinct().as_("attendees"))
+		.where((check_in.event == event) & (check_in.docstatus == 1) & check_in.date.isnotnull())
+		.groupby(check_in.date)
+		.orderby(check_in.date)
+	).run(as_dict=True)
+	return {row.date: row.attendees for row in rows}
+
+
+def get_total_attendees(event: str) -> int:
+	"""Get the number of tickets checked in on at least one day."""
+	check_in = frappe.qb.DocType("Event Check In")
+	return (
+		frappe.qb.from_(check_in)
+		.select(Count(check_in.ticket).distinct())
+		.where((check_in.event == event) & (check_in.docstatus == 1))
+	).run()[0][0]
 
 
 def get_columns(check_in_dates: list) -> list[dict]:
@@ -92,106 +112,82 @@ def get_columns(check_in_dates: list) -> list[dict]:
 	return columns
 
 
-def get_data(event: str, check_in_dates: list) -> list[dict]:
+def get_data(event: str, check_in_dates: list, filters: dict) -> list[dict]:
 	"""Return data for the report.
 
-	Shows each ticket with check-in status for each day.
+	Shows a page of tickets with check-in status for each day, pivoted in one
+	grouped query over the event's check-ins. Exporting the report gets every
+	ticket, not only the page on screen.
 	"""
-	# Get all check-ins for this event
-	check_ins = frappe.get_all(
-		"Event Check In",
-		filters={"event": event, "docstatus": 1},
-		fields=["ticket", "date"],
-	)
-
-	if not check_ins:
-		return []
+	check_in = frappe.qb.DocType("Event Check In")
+	ticket = frappe.qb.DocType("Event Ticket")
 
-	# Build a map of ticket -> set of dates checked in
-	ticket_dates = {}
-	for ci in check_ins:
-		if ci.ticket not in ticket_dates:
-			ticket_dates[ci.ticket] = set()
-		if ci.date:
-			ticket_dates[ci.ticket].add(ci.date)
-
-	# Get ticket details
-	tickets = frappe.get_all(
-		"Event Ticket",
-		filters={"name": ["in", list(ticket_dates.keys())]},
-		fields=["name", "attendee_name", "attendee_email", "ticket_type"],
+	# one 1/0 column per check-in date (1 or 0 for Check fieldtype)
+	days = [
+		Max(Case().when(check_in.date == date, 1).else_(0)).as_(f"day_{i}")
+		for i, date in enumerate(check_in_dates)
+	]
+	sort_field = SORT_FIELDS.get(filters.get("sort_by"), "attendee_name")
+	order = Order.desc if filters.get("sort_order") == "Descending" else Order.asc
+	page_length = cint(filters.get("page_length")) or DEFAULT_PAGE_LENGTH
+	page = max(cint(filters.get("page")), 1)
+
+	query = (
+		frappe.qb.from_(check_in)
+		.join(ticket)
+		.on(ticket.name == check_in.ticket)
+		.select(
+			ticket.name.as_("ticket"),
+			ticket.attendee_name,
+			ticket.attendee_email,
+			ticket.ticket_type,
+			*days,
+		)
+		.where((check_in.event == event) & (check_in.docstatus == 1))
+		.groupby(ticket.name)
+		.orderby(ticket[sort_field], order=order)
+		.orderby(ticket.name)
 	)
+	if frappe.form_dict.get("cmd") != EXPORT_METHOD:
+		query = query.limit(page_length).offset((page - 1) * page_length)
 
-	# Build the data rows
-	data = []
-	for ticket in tickets:
-		row = {
-			"ticket": ticket.name,
-			"attendee_name": ticket.attendee_name,
-			"attendee_email": ticket.attendee_email,
-			"ticket_type": ticket.ticket_type,
-		}
-
-		# Add check-in status for each date (1 or 0 for Check fieldtype)
-		checked_in_dates = ticket_dates.get(ticket.name, set())
-		for i, date in enumerate(check_in_dates):
-			row[f"day_{i}"] = 1 if date in checked_in_dates else 0
-
-		data.append(row)
-
-	# Sort by attendee name
-	data.sort(key=lambda x: (x.get("attendee_name") or "").lower())
+	return query.run(as_dict=True)
 
-	return data
 
-
-def get_chart(data: list[dict], check_in_dates: list) -> dict:
+def get_chart(day_counts: dict) -> dict:
 	"""Return chart data showing attendance per day."""
-	if not data or not check_in_dates:
+	if not day_counts:
 		return {}
 
-	labels = []
-	values = []
-
-	for i, date in enumerate(check_in_dates):
-		labels.append(formatdate(date, "d MMM"))
-		day_count = sum(1 for row in data if row.get(f"day_{i}") == 1)
-		values.append(day_count)
-
 	return {
 		"data": {
-			"labels": labels,
-			"datasets": [{"name": _("Attendees"), "values": values}],
+			"labels": [formatdate(date, "d MMM") for date in day_counts],
+			"datasets": [{"name": _("Attendees"), "values": list(day_counts.values())}],
 		},
 		"type": "bar",
 		"colors": ["#4F46E5"],
 	}
 
 
-def get_report_summary(data: list[dict], check_in_dates: list) -> list[dict]:
+def get_report_summary(day_counts: dict, total_attendees: int) -> list[dict]:
 	"""Return report summary with attendance counts per day and total unique attendees."""
-	if not data:
+	if not total_attendees:
 		return []
 
-	summary = []
-
-	# Count attendance for each day
-	for i, date in enumerate(check_in_dates):
-		day_count = sum(1 for row in data if row.get(f"day_{i}") == 1)
-		summary.append(
-			{
-				"value": day_count,
-				"label": formatdate(date, "d MMM YYYY"),
-				"datatype": "Int",
-				"indicator": "blue",
-			}
-		)
+	summary = [
+		{
+			"value": attendees,
+			"label": formatdate(date, "d MMM YYYY"),
+			"datatype": "Int",
+			"indicator": "blue",
+		}
+		for date, attendees in day_counts.items()
+	]
 
 	# Total unique attendees (anyone who attended at least one day)
-	total_unique = len(data)
 	summary.append(
 		{
-			"value": total_unique,
+			"value": total_attendees,
 			"label": _("Total Unique Attendees"),
 			"datatype": "Int",
 			"indicator": "green",
@@ -0,0 +1,70 @@
+# Copyright (c) 2026, BWH Studios and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from buzz.events.report.event_attendance_summary.event_attendance_summary import (
+	EXPORT_METHOD,
+	execute,
+	get_day_counts,
+)
+
+
+class IntegrationTestEventAttendanceSummary(IntegrationTestCase):
+	def setUp(self):
+		self.test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": self.test_event.name, "title": "Summary", "price": 0}
+		).insert()
+
+		self.tickets = {}
+		for name, dates in (
+			("First Day Guest", ["2026-01-10"]),
+			("Both Days Guest", ["2026-01-10", "2026-01-11"]),
+			("Second Day Guest", ["2026-01-11"]),
+		):
+			ticket = frappe.get_doc(
+				{
+					"doctype": "Event Ticket",
+					"event": self.test_event.name,
+					"ticket_type": test_ticket_type.name,
+					"attendee_name": name,
+					"attendee_email": f"{frappe.scrub(name)}@email.com",
+				}
+			).insert()
+			ticket.submit()
+			self.tickets[ticket.name] = dates
+			for date in dates:
+				frappe.get_doc(
+					{"doctype": "Event Check In", "ticket": ticket.name, "date": date}
+				).insert().submit()
+
+	def test_check_ins_pivoted_by_day(self):
+		data = execute({"event": self.test_event.name})[1]
+		# a day_<n> column per check-in date, in order
+		day_fields = {str(date): f"day_{i}" for i, date in enumerate(get_day_counts(self.test_event.name))}
+
+		for row in data:
+			if dates := self.tickets.get(row.ticket):
+				checked_in = {date for date, fieldname in day_fields.items() if row[fieldname]}
+				self.assertEqual(checked_in, set(dates), row.attendee_name)
+
+	def test_pages_and_export(self):
+		filters = {"event": self.test_event.name, "sort_by": "ticket", "page_length": 2}
+
+		pages = []
+		while page := execute({**filters, "page": len(pages) + 1})[1]:
+			self.assertLessEqual(len(page), 2)
+			pages.append(page)
+		paged = [row.ticket for page in pages for row in page]
+
+		# every ticket is on exactly one page
+		self.assertEqual(len(paged), len(set(paged)))
+		self.assertTrue(set(self.tickets) <= set(paged))
+
+		with patch.dict(frappe.form_dict, {"cmd": EXPORT_METHOD}):
+			exported = [row.ticket for row in execute({**filters, "page": 1})[1]]
+		self.assertEqual(exported, paged)
@@ -44,48 +44,19 @@ def get_columns() -> list[dict]:
 def get_data(filters: dict) -> list[dict]:
 	"""Return data for the report.
 
-	The report data is a list of rows, with each row being a list of cell values.
+	The report data is a list of rows, read in one query from the Event Sales
+	Summary kept up to date as tickets and bookings are submitted and cancelled.
 	"""
 	event = filters.get("event")
 
-	if event:
-		return [get_summary_for_event(event)]
-
-	data = []
-	events = frappe.db.get_all("Buzz Event", pluck="name")
-	for event in events:
-		summary = get_summary_for_event(event)
-		summary["event"] = event
-		data.append(summary)
-
-	return data
-
-
-def get_summary_for_event(event: str) -> dict:
-	"""Return summary data for the event.
-
-	This function is used to get a summary of the event, such as total tickets sold,
-	total add-ons sold, and total sales.
-	"""
-	event_tickets = frappe.db.get_all("Event Ticket", filters={"event": event, "docstatus": 1}, pluck="name")
-	num_tickets_sold = len(event_tickets)
-	sales = frappe.db.get_all(
-		"Event Booking",
-		filters={"docstatus": 1, "event": event},
-		fields=[{"SUM": "total_amount", "as": "sales"}],
-		pluck="sales",
-	)[0]
-
-	num_add_ons_sold = frappe.db.get_all(
-		"Ticket Add-on Value",
-		filters={"parenttype": "Event Ticket", "parentfield": "add_ons", "parent": ["in", event_tickets]},
-		fields=[{"COUNT": "*", "as": "num_add_ons_sold"}],
-		pluck="num_add_ons_sold",
-	)[0]
-
-	return {
-		"event": event,
-		"num_tickets_sold": num_tickets_sold,
-		"num_add_ons_sold": num_add_ons_sold,
-		"sales": sales,
-	}
+	return frappe.db.get_all(
+		"Event Sales Summary",
+		filters={"event": event} if event else {},
+		fields=[
+			"event",
+			"tickets_sold as num_tickets_sold",
+			"add_ons_sold as num_add_ons_sold",
+			"sales",
+		],
+		order_by="event asc",
+	)
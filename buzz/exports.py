@@ -0,0 +1,235 @@
+"""
+Exports of an event's attendee data, for events too large for report exports.
+
+Report exports build the whole result in memory before writing it. Here the
+rows are read through an unbuffered (server-side) cursor and written to the
+file one at a time, CSV with the csv module and XLSX with a write-only
+openpyxl workbook, so memory stays flat however large the event is. Attendees
+type most of these values, so a cell that a spreadsheet would read as a formula
+is escaped, and characters XLSX can not hold are dropped. Exports
+run in a background job that writes a private File attached to the event and
+tells the user where to download it.
+"""
+
+import csv
+
+import frappe
+from frappe import _
+from frappe.utils import get_files_path, get_url
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from pypika.queries import QueryBuilder
+
+FILE_FORMATS = ("CSV", "XLSX")
+# what spreadsheets start a formula with, see https://owasp.org/www-community/attacks/CSV_Injection
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def enqueue_event_export(event: str | int, export_type: str, file_format: str = "CSV"):
+	if export_type not in EXPORTS:
+		frappe.throw(_("Unknown export {0}").format(export_type))
+	if file_format not in FILE_FORMATS:
+		frappe.throw(_("Exports can only be downloaded as {0}").format(", ".join(FILE_FORMATS)))
+
+	frappe.enqueue(
+		"buzz.exports.export_event_data",
+		queue="long",
+		timeout=60 * 60,
+		job_id=f"export_event_data:{event}:{export_type}:{file_format}:{frappe.session.user}",
+		deduplicate=True,
+		event=event,
+		export_type=export_type,
+		file_format=file_format,
+		user=frappe.session.user,
+	)
+
+
+def export_event_data(event: str | int, export_type: str, file_format: str, user: str):
+	"""Write an export of the event to a private file and send its link to `user`."""
+	columns, query = EXPORTS[export_type](event)
+	file_name = f"{event}-{export_type}-{frappe.generate_hash(length=8)}.{file_format.lower()}"
+	path = get_files_path(file_name, is_private=1)
+
+	with frappe.db.unbuffered_cursor():
+		rows = query.run(as_iterator=True)
+		if file_format == "XLSX":
+			write_xlsx(path, columns, rows)
+		else:
+			write_csv(path, columns, rows)
+
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+			"attached_to_doctype": "Buzz Event",
+			"attached_to_name": event,
+		}
+	).insert(ignore_permissions=True)
+	frappe.db.commit()
+
+	frappe.publish_realtime(
+		"msgprint",
+		_("Your export is ready: {0}").format(
+			f'<a href="{get_url(file.file_url)}" target="_blank">{file_name}</a>'
+		),
+		user=user,
+	)
+
+
+def write_csv(path: str, columns: list[str], rows):
+	with open(path, "w", newline="", encoding="utf-8") as f:
+		writer = csv.writer(f)
+		writer.writerow(columns)
+		for row in rows:
+			writer.writerow(sanitize_row(row))
+
+
+def write_xlsx(path: str, columns: list[str], rows):
+	from openpyxl import Workbook
+
+	# write-only workbooks flush each row to disk instead of keeping the sheet in memory
+	workbook = Workbook(write_only=True)
+	sheet = workbook.create_sheet()
+	sheet.append(columns)
+	for row in rows:
+		sheet.append(sanitize_row(row))
+	workbook.save(path)
+
+
+def sanitize_row(row) -> list:
+	return [sanitize_cell(value) for value in row]
+
+
+def sanitize_cell(value):
+	if not isinstance(value, str):
+		return value
+
+	value = ILLEGAL_CHARACTERS_RE.sub("", value)
+	if value.startswith(FORMULA_PREFIXES):
+		# a leading quote shows the value as text instead of running it
+		value = "'" + value
+	return value
+
+
+def get_tickets_export(event: str | int) -> tuple[list[str], QueryBuilder]:
+	ticket = frappe.qb.DocType("Event Ticket")
+	ticket_type = frappe.qb.DocType("Event Ticket Type")
+	query = (
+		frappe.qb.from_(ticket)
+		.left_join(ticket_type)
+		.on(ticket_type.name == ticket.ticket_type)
+		.select(
+			ticket.name,
+			ticket.attendee_name,
+			ticket.attendee_email,
+			ticket_type.title,
+			ticket.booking,
+			ticket.coupon_used,
+			ticket.creation,
+		)
+		.where((ticket.event == event) & (ticket.docstatus == 1))
+		.orderby(ticket.creation)
+	)
+	columns = [
+		_("Ticket"),
+		_("Attendee Name"),
+		_("Attendee Email"),
+		_("Ticket Type"),
+		_("Booking"),
+		_("Coupon Used"),
+		_("Created On"),
+	]
+	return columns, query
+
+
+def get_add_ons_export(event: str | int) -> tuple[list[str], QueryBuilder]:
+	ticket = frappe.qb.DocType("Event Ticket")
+	add_on_value = frappe.qb.DocType("Ticket Add-on Value")
+	add_on = frappe.qb.DocType("Ticket Add-on")
+	query = (
+		frappe.qb.from_(add_on_value)
+		.join(ticket)
+		.on(ticket.name == add_on_value.parent)
+		.left_join(add_on)
+		.on(add_on.name == add_on_value.add_on)
+		.select(
+			ticket.name,
+			ticket.attendee_name,
+			ticket.attendee_email,
+			add_on.title,
+			add_on_value.value,
+			add_on_value.price,
+			add_on_value.currency,
+		)
+		.where(
+			(add_on_value.parenttype == "Event Ticket")
+			& (add_on_value.parentfield == "add_ons")
+			& (ticket.event == event)
+			& (ticket.docstatus == 1)
+		)
+		.orderby(ticket.creation)
+		.orderby(add_on_value.idx)
+	)
+	columns = [
+		_("Ticket"),
+		_("Attendee Name"),
+		_("Attendee Email"),
+		_("Add-on"),
+		_("Value"),
+		_("Price"),
+		_("Currency"),
+	]
+	return columns, query
+
+
+def get_custom_fields_export(event: str | int) -> tuple[list[str], QueryBuilder]:
+	ticket = frappe.qb.DocType("Event Ticket")
+	field = frappe.qb.DocType("Additional Field")
+	query = (
+		frappe.qb.from_(field)
+		.join(ticket)
+		.on(ticket.name == field.parent)
+		.select(ticket.name, ticket.attendee_name, ticket.attendee_email, field.label, field.value)
+		.where(
+			(field.parenttype == "Event Ticket")
+			& (field.parentfield == "additional_fields")
+			& (ticket.event == event)
+			& (ticket.docstatus == 1)
+		)
+		.orderby(ticket.creation)
+		.orderby(field.idx)
+	)
+	columns = [_("Ticket"), _("Attendee Name"), _("Attendee Email"), _("Field"), _("Value")]
+	return columns, query
+
+
+def get_check_ins_export(event: str | int) -> tuple[list[str], QueryBuilder]:
+	ticket = frappe.qb.DocType("Event Ticket")
+	check_in = frappe.qb.DocType("Event Check In")
+	query = (
+		frappe.qb.from_(check_in)
+		.join(ticket)
+		.on(ticket.name == check_in.ticket)
+		.select(
+			ticket.name,
+			ticket.attendee_name,
+			ticket.attendee_email,
+			check_in.date,
+			check_in.scanned_at,
+			check_in.gate,
+		)
+		.where((check_in.event == event) & (check_in.docstatus == 1))
+		.orderby(check_in.date)
+		.orderby(check_in.scanned_at)
+	)
+	columns = [_("Ticket"), _("Attendee Name"), _("Attendee Email"), _("Date"), _("Scanned At"), _("Gate")]
+	return columns, query
+
+
+EXPORTS = {
+	"tickets": get_tickets_export,
+	"add_ons": get_add_ons_export,
+	"custom_fields": get_custom_fields_export,
+	"check_ins": get_check_ins_export,
+}
@@ -24,7 +24,25 @@ website_route_rules = [
 # Scheduled Tasks
 # ---------------
 
-scheduler_events = {"daily": ["buzz.tasks.unpublish_ticket_types_after_last_date"]}
+scheduler_events = {
+	"daily": [
+		"buzz.tasks.unpublish_ticket_types_after_last_date",
+		"buzz.tasks.reconcile_sales_summaries",
+	],
+	"hourly": [
+		"buzz.tasks.reconcile_ticket_type_counters",
+		"buzz.ticketing.doctype.event_booking.event_booking.resume_ticket_generation",
+		"buzz.ticketing.doctype.event_ticket.event_ticket.retry_pending_ticket_side_effects",
+		"buzz.check_in_engine.warm_check_in_indexes",
+	],
+	"cron": {
+		"* * * * *": [
+			"buzz.ticketing.doctype.event_ticket_hold.event_ticket_hold.expire_ticket_holds",
+			"buzz.waiting_room.admit_waiting_buyers",
+			"buzz.check_in_engine.persist_check_ins",
+		],
+	},
+}
 
 # Testing
 # -------
@@ -37,6 +55,25 @@ doc_events = {
 		"after_insert": "buzz.utils.add_buzz_user_role",
 		"on_update": "buzz.events.doctype.speaker_profile.speaker_profile.update_speaker_display_name",
 	},
+	("Buzz Event", "Event Ticket Type", "Ticket Add-on", "Buzz Custom Field"): {
+		"on_update": "buzz.booking_data.clear_booking_data_cache",
+		"on_trash": "buzz.booking_data.clear_booking_data_cache",
+	},
+	"Buzz Event": {
+		"on_update": "buzz.event_policy.clear_event_policy_cache",
+		"on_trash": "buzz.event_policy.clear_event_policy_cache",
+	},
+	"Buzz Settings": {
+		"on_update": [
+			"buzz.booking_data.clear_booking_data_cache",
+			"buzz.event_policy.clear_event_policy_cache",
+		],
+	},
+	"Event Ticket": {
+		"on_submit": "buzz.check_in_engine.update_ticket_in_index",
+		"on_cancel": "buzz.check_in_engine.update_ticket_in_index",
+		"on_update_after_submit": "buzz.check_in_engine.update_ticket_in_index",
+	},
 }
 
 fixtures = [{"dt": "Role", "filters": {"name": ["Buzz User", "Frontdesk Manager"]}}]
@@ -44,7 +81,7 @@ fixtures = [{"dt": "Role", "filters": {"name": ["Buzz User", "Frontdesk Manager"
 user_invitation = {"allowed_roles": {"Event Manager": ["Buzz User"], "Buzz User": ["Buzz User"]}}
 
 
-ignore_links_on_delete = ["Ticket Cancellation Request", "Ticket Add-on Value"]
+ignore_links_on_delete = ["Ticket Cancellation Request", "Ticket Add-on Value", "Event Ticket Hold"]
 
 after_app_install = "buzz.install.after_app_install"
 
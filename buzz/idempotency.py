@@ -0,0 +1,66 @@
+"""
+Client-supplied idempotency keys for endpoints that create documents or gateway orders.
+
+The first call with a key claims it in Redis and runs; once its transaction
+commits, its response is kept for `IDEMPOTENCY_WINDOW_SECONDS`, and every repeat
+of the call with the same key gets that response back without running again.
+Keys are scoped per endpoint and per user, so a key can never return somebody
+else's booking.
+"""
+
+import json
+from collections.abc import Callable
+
+import frappe
+from frappe import _
+
+IDEMPOTENCY_WINDOW_SECONDS = 24 * 60 * 60
+# how long a claimed key blocks repeats while the first call is still running
+IN_PROGRESS_EXPIRY_SECONDS = 2 * 60
+MAX_KEY_LENGTH = 128
+
+
+def run_idempotent(scope: str, idempotency_key: str | None, fn: Callable):
+	"""Run `fn` once per key, returning the first response to every repeat within the window."""
+	if not idempotency_key:
+		return fn()
+
+	if len(idempotency_key) > MAX_KEY_LENGTH:
+		frappe.throw(_("Idempotency key can not be longer than {0} characters.").format(MAX_KEY_LENGTH))
+
+	cache_key = get_idempotency_cache_key(scope, idempotency_key)
+	if not frappe.cache.set(
+		cache_key, json.dumps({"status": "in_progress"}), ex=IN_PROGRESS_EXPIRY_SECONDS, nx=True
+	):
+		stored = json.loads(frappe.cache.get(cache_key) or "{}")
+		if stored.get("status") == "completed":
+			return stored["response"]
+
+		frappe.throw(
+			_("This request is already being processed, please wait a moment."),
+			frappe.DuplicateEntryError,
+		)
+
+	try:
+		response = fn()
+	except Exception:
+		# a failed call must not block the retry that fixes it
+		frappe.cache.delete(cache_key)
+		raise
+
+	# repeats get the response once what it points to is committed, a rollback frees the key again
+	frappe.db.after_commit.add(lambda: store_response(cache_key, response))
+	frappe.db.after_rollback.add(lambda: frappe.cache.delete(cache_key))
+	return response
+
+
+def store_response(cache_key: str, response):
+	frappe.cache.set(
+		cache_key,
+		json.dumps({"status": "completed", "response": response}, default=str),
+		ex=IDEMPOTENCY_WINDOW_SECONDS,
+	)
+
+
+def get_idempotency_cache_key(scope: str, idempotency_key: str) -> str:
+	return frappe.cache.make_key(f"buzz:idempotency:{scope}:{frappe.session.user}:{idempotency_key}")
@@ -0,0 +1,102 @@
+"""
+Live occupancy of venues, for in/out scanning at the doors.
+
+The tickets inside a venue today are a Redis set, and the tickets that have
+scanned out are another. An entry, an exit or a re-entry is then one atomic
+SADD or SMOVE, and the occupancy is the size of the set (SCARD, O(1)) instead
+of something derived from the scan history. Events without a venue are tracked
+on their own. Every change is pushed to the check-in managers through the
+realtime room of Event Check In, flagged once occupancy reaches `ALERT_RATIO`
+of the venue's Max Occupancy.
+"""
+
+import math
+
+import frappe
+from frappe.realtime import get_doctype_room
+from frappe.utils import today
+
+OCCUPANCY_EXPIRY_SECONDS = 2 * 24 * 60 * 60
+ALERT_RATIO = 0.9
+REALTIME_EVENT = "buzz_occupancy"
+
+
+def enter_venue(event: str | int, venue: str | None, ticket: str, re_entry: bool = False) -> dict | None:
+	"""Let a ticket in, returns the new occupancy or None if it is inside (or, on re-entry, never left)."""
+	inside, outside = get_occupancy_keys(event, venue)
+	pipeline = frappe.cache.pipeline()
+	if re_entry:
+		pipeline.smove(outside, inside, ticket)
+	else:
+		pipeline.sadd(inside, ticket)
+	pipeline.scard(inside)
+	pipeline.expire(inside, OCCUPANCY_EXPIRY_SECONDS)
+	changed, current, _expired = pipeline.execute()
+
+	if changed:
+		return publish_occupancy(event, venue, current)
+
+
+def leave_venue(event: str | int, venue: str | None, ticket: str) -> dict | None:
+	"""Let a ticket out, returns the new occupancy or None if it is not inside."""
+	inside, outside = get_occupancy_keys(event, venue)
+	pipeline = frappe.cache.pipeline()
+	pipeline.smove(inside, outside, ticket)
+	pipeline.scard(inside)
+	pipeline.expire(outside, OCCUPANCY_EXPIRY_SECONDS)
+	changed, current, _expired = pipeline.execute()
+
+	if changed:
+		return publish_occupancy(event, venue, current)
+
+
+def remove_from_venue(event: str | int, venue: str | None, ticket: str) -> dict | None:
+	"""Forget a ticket whose check-in was cancelled, returns the new occupancy or None if it was not inside."""
+	inside, outside = get_occupancy_keys(event, venue)
+	pipeline = frappe.cache.pipeline()
+	pipeline.srem(inside, ticket)
+	pipeline.srem(outside, ticket)
+	pipeline.scard(inside)
+	removed, _left, current = pipeline.execute()
+
+	if removed:
+		return publish_occupancy(event, venue, current)
+
+
+def has_left_venue(event: str | int, venue: str | None, ticket: str) -> bool:
+	_inside, outside = get_occupancy_keys(event, venue)
+	pipeline = frappe.cache.pipeline()
+	pipeline.sismember(outside, ticket)
+	return bool(pipeline.execute()[0])
+
+
+def get_occupancy(event: str | int, venue: str | None, current: int | None = None) -> dict:
+	if current is None:
+		pipeline = frappe.cache.pipeline()
+		pipeline.scard(get_occupancy_keys(event, venue)[0])
+		current = pipeline.execute()[0]
+
+	limit = frappe.get_cached_value("Event Venue", venue, "max_occupancy") if venue else 0
+	return {
+		"current": current,
+		"limit": limit or None,
+		"is_near_limit": bool(limit) and current >= math.ceil(limit * ALERT_RATIO),
+	}
+
+
+def publish_occupancy(event: str | int, venue: str | None, current: int) -> dict:
+	occupancy = get_occupancy(event, venue, current)
+	frappe.publish_realtime(
+		REALTIME_EVENT,
+		{"event": event, **occupancy},
+		# not the Buzz Event's room, every user can read an event
+		room=get_doctype_room("Event Check In"),
+	)
+	return occupancy
+
+
+def get_occupancy_keys(event: str | int, venue: str | None) -> tuple[str, str]:
+	# events at the same venue share its occupancy
+	scope = f"venue:{venue}" if venue else f"event:{event}"
+	prefix = f"buzz:occupancy:{scope}:{today()}"
+	return frappe.cache.make_key(f"{prefix}:inside"), frappe.cache.make_key(f"{prefix}:outside")
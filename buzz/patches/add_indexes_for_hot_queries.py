@@ -0,0 +1,16 @@
+from frappe.modules import load_doctype_module
+
+# doctypes whose `on_doctype_update` adds composite indexes for the queries run most often
+INDEXED_DOCTYPES = (
+	"Event Check In",
+	"Event Ticket",
+	"Event Booking",
+	"Event Payment",
+	"Sponsorship Enquiry",
+	"Buzz Custom Field",
+)
+
+
+def execute():
+	for doctype in INDEXED_DOCTYPES:
+		load_doctype_module(doctype).on_doctype_update()
@@ -0,0 +1,17 @@
+import frappe
+
+from buzz.check_in_tokens import create_signing_key
+
+
+def execute():
+	"""Create the key pair of published events and events with tickets, rendering QR codes no longer does."""
+	events = set(
+		frappe.db.get_all(
+			"Buzz Event", filters={"is_published": 1, "check_in_public_key": ("is", "not set")}, pluck="name"
+		)
+	)
+	events.update(frappe.db.get_all("Event Ticket", filters={"docstatus": 1}, distinct=True, pluck="event"))
+
+	for event in events:
+		if event and not frappe.db.get_value("Buzz Event", event, "check_in_public_key"):
+			create_signing_key(event)
@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+	# tickets submitted before emails moved to background jobs had theirs sent on submit
+	frappe.db.set_value("Event Ticket", {"docstatus": 1}, "ticket_email_sent", 1, update_modified=False)
@@ -0,0 +1,5 @@
+from buzz.ticketing.doctype.event_sales_summary.event_sales_summary import reconcile_event_sales_summaries
+
+
+def execute():
+	reconcile_event_sales_summaries()
@@ -0,0 +1,34 @@
+import frappe
+from frappe.query_builder.functions import Count
+
+
+def execute():
+	drop_unique_ticket_date_docstatus()
+
+	# the unique (ticket, date) index can only be added once every ticket has one active check-in a day
+	CheckIn = frappe.qb.DocType("Event Check In")
+	duplicated = (
+		frappe.qb.from_(CheckIn)
+		.select(CheckIn.ticket, CheckIn.date)
+		.where(CheckIn.docstatus < 2)
+		.groupby(CheckIn.ticket, CheckIn.date)
+		.having(Count("*") > 1)
+	).run(as_dict=True)
+
+	for group in duplicated:
+		check_ins = frappe.db.get_all(
+			"Event Check In",
+			filters={"ticket": group.ticket, "date": group.date, "docstatus": ("<", 2)},
+			order_by="docstatus desc, creation asc",
+			pluck="name",
+		)
+		# the first submitted check-in of the day is the one kept
+		frappe.db.delete("Event Check In", {"name": ("in", check_ins[1:])})
+
+
+def drop_unique_ticket_date_docstatus():
+	# the earlier (ticket, date, docstatus) key let a day have only one cancelled check-in
+	if frappe.db.db_type == "postgres":
+		frappe.db.sql_ddl('alter table "tabEvent Check In" drop constraint if exists unique_ticket_date')
+	elif frappe.db.has_index("tabEvent Check In", "unique_ticket_date"):
+		frappe.db.sql_ddl("alter table `tabEvent Check In` drop index unique_ticket_date")
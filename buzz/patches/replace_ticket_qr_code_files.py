@@ -0,0 +1,22 @@
+import frappe
+
+from buzz.ticketing.doctype.event_ticket.event_ticket import get_qr_code_url
+
+
+def execute():
+	"""QR codes are rendered on request now, drop the File (and file on disk) stored for every ticket."""
+	qr_code_files = frappe.db.get_all(
+		"File",
+		filters={"attached_to_doctype": "Event Ticket", "attached_to_field": "qr_code"},
+		fields=["name", "attached_to_name"],
+	)
+
+	for file in qr_code_files:
+		frappe.db.set_value(
+			"Event Ticket",
+			file.attached_to_name,
+			"qr_code",
+			get_qr_code_url(file.attached_to_name),
+			update_modified=False,
+		)
+		frappe.delete_doc("File", file.name, ignore_permissions=True, force=True)
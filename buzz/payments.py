@@ -1,6 +1,8 @@
 import frappe
 from payments.utils import get_payment_gateway_controller
 
+from buzz.idempotency import run_idempotent
+
 
 def get_payment_gateway_for_event(event: str):
 	return frappe.get_cached_value("Buzz Event", event, "payment_gateway")
@@ -11,7 +13,17 @@ def get_controller(payment_gateway):
 
 
 @frappe.whitelist()
-def get_payment_link_for_booking(booking_id: str, redirect_to: str = "/events") -> str:
+def get_payment_link_for_booking(
+	booking_id: str, redirect_to: str = "/events", idempotency_key: str | None = None
+) -> str:
+	return run_idempotent(
+		f"payment_link:{booking_id}",
+		idempotency_key,
+		lambda: make_payment_link_for_booking(booking_id, redirect_to),
+	)
+
+
+def make_payment_link_for_booking(booking_id: str, redirect_to: str = "/events") -> str:
 	booking_doc = frappe.get_cached_doc("Event Booking", booking_id)
 	event_title = frappe.get_cached_value("Buzz Event", booking_doc.event, "title")
 	payment_gateway = get_payment_gateway_for_event(booking_doc.event)
@@ -90,3 +90,8 @@ class SponsorshipEnquiry(Document):
 			now=now,
 			attachments=[{"file_url": attachment.file} for attachment in event.sponsor_deck_attachments],
 		)
+
+
+def on_doctype_update():
+	# sponsors list their own enquiries, newest first
+	frappe.db.add_index("Sponsorship Enquiry", ["owner", "creation"])
@@ -0,0 +1,187 @@
+"""
+Check-ins to the sessions of an event's schedule, with a seat limit per room.
+
+The tickets in a session are a Redis set, so taking a seat is one atomic SADD
+and the attendance of a session is the set's SCARD, cheap enough for hallway
+screens to read at any time. A session seats the capacity of its Schedule Item,
+or else of its track; a seat taken past it is given back straight away and the
+scan is turned away. Session Check In rows are the record, and a session's set
+is rebuilt from them when Redis no longer has it. Every change is pushed to
+the realtime room of Session Check In, which only the check-in managers can join.
+"""
+
+import frappe
+from frappe import _
+from frappe.realtime import get_doctype_room
+from frappe.utils import getdate, today
+
+ATTENDANCE_EXPIRY_SECONDS = 2 * 24 * 60 * 60
+REALTIME_EVENT = "buzz_session_attendance"
+SESSION_FIELDS = [
+	"name",
+	"parent as event",
+	"track",
+	"talk",
+	"talk.title as talk_title",
+	"description",
+	"date",
+	"start_time",
+	"end_time",
+	"capacity",
+]
+
+
+def check_in_to_session(ticket: str, schedule_item: str) -> dict:
+	"""Take a seat in a session of today's schedule for a ticket of its event."""
+	session = get_session(schedule_item)
+	if getdate(session.date) != getdate(today()):
+		frappe.throw(_("Check-in is only open for today's sessions"))
+
+	ticket_doc = frappe.db.get_value(
+		"Event Ticket", ticket, ["name", "event", "attendee_name", "docstatus"], as_dict=True
+	)
+	if not ticket_doc or str(ticket_doc.event) != str(session.event) or ticket_doc.docstatus == 0:
+		frappe.throw(_("Ticket not found"))
+	if ticket_doc.docstatus == 2:
+		frappe.throw(_("This ticket has been cancelled and cannot be checked in"))
+
+	build_attendees([session])
+	key = get_attendees_key(schedule_item)
+	pipeline = frappe.cache.pipeline()
+	pipeline.sadd(key, ticket)
+	pipeline.scard(key)
+	pipeline.expire(key, ATTENDANCE_EXPIRY_SECONDS)
+	added, attendees, _expired = pipeline.execute()
+
+	if not added:
+		frappe.throw(_("This ticket is already checked in to this session"))
+
+	if session.capacity and attendees > session.capacity:
+		give_seat_back(schedule_item, ticket)
+		frappe.throw(_("This session is full"))
+
+	try:
+		frappe.get_doc(
+			{
+				"doctype": "Session Check In",
+				"event": session.event,
+				"ticket": ticket,
+				"schedule_item": schedule_item,
+				"track": session.track,
+				"talk": session.talk,
+			}
+		).insert(ignore_permissions=True)
+	except Exception:
+		# the seat goes back if the check-in can not be recorded
+		give_seat_back(schedule_item, ticket)
+		raise
+
+	return {
+		"message": _("{0} checked in to the session").format(ticket_doc.attendee_name),
+		"attendance": publish_attendance(session, attendees),
+	}
+
+
+def give_seat_back(schedule_item: str, ticket: str):
+	# through a pipeline, as `frappe.cache.srem` namespaces the key itself
+	pipeline = frappe.cache.pipeline()
+	pipeline.srem(get_attendees_key(schedule_item), ticket)
+	pipeline.execute()
+
+
+def get_attendance_by_session(event: str | int, date: str | None = None) -> list[dict]:
+	"""Attendance of each session of the event on `date` (today by default), in order of start time."""
+	sessions = get_sessions({"parent": event, "date": getdate(date or today())})
+	if not sessions:
+		return []
+
+	build_attendees(sessions)
+	pipeline = frappe.cache.pipeline()
+	for session in sessions:
+		pipeline.scard(get_attendees_key(session.name))
+
+	return [
+		make_attendance(session, attendees)
+		for session, attendees in zip(sessions, pipeline.execute(), strict=True)
+	]
+
+
+def get_session(schedule_item: str) -> dict:
+	sessions = get_sessions({"name": schedule_item})
+	if not sessions:
+		frappe.throw(_("Session not found"))
+	return sessions[0]
+
+
+def get_sessions(filters: dict) -> list[dict]:
+	sessions = frappe.db.get_all(
+		"Schedule Item",
+		filters={"parenttype": "Buzz Event", **filters},
+		fields=SESSION_FIELDS,
+		order_by="start_time asc",
+	)
+	for session in sessions:
+		session.capacity = session.capacity or (
+			frappe.get_cached_value("Event Track", session.track, "capacity") if session.track else 0
+		)
+	return sessions
+
+
+def build_attendees(sessions: list[dict]):
+	"""Rebuild the attendee sets of sessions Redis no longer has from their Session Check In rows."""
+	pipeline = frappe.cache.pipeline()
+	for session in sessions:
+		pipeline.exists(get_built_key(session.name))
+	missing = [session.name for session, built in zip(sessions, pipeline.execute(), strict=True) if not built]
+	if not missing:
+		return
+
+	tickets_by_session = {}
+	for check_in in frappe.db.get_all(
+		"Session Check In", filters={"schedule_item": ("in", missing)}, fields=["schedule_item", "ticket"]
+	):
+		tickets_by_session.setdefault(check_in.schedule_item, []).append(check_in.ticket)
+
+	pipeline = frappe.cache.pipeline()
+	for schedule_item in missing:
+		key = get_attendees_key(schedule_item)
+		pipeline.delete(key)
+		if tickets := tickets_by_session.get(schedule_item):
+			pipeline.sadd(key, *tickets)
+			pipeline.expire(key, ATTENDANCE_EXPIRY_SECONDS)
+		pipeline.set(get_built_key(schedule_item), 1, ex=ATTENDANCE_EXPIRY_SECONDS)
+	pipeline.execute()
+
+
+def publish_attendance(session: dict, attendees: int) -> dict:
+	attendance = make_attendance(session, attendees)
+	frappe.publish_realtime(
+		REALTIME_EVENT,
+		{"event": session.event, **attendance},
+		# not the Buzz Event's room, every user can read an event
+		room=get_doctype_room("Session Check In"),
+		after_commit=True,
+	)
+	return attendance
+
+
+def make_attendance(session: dict, attendees: int) -> dict:
+	return {
+		"schedule_item": session.name,
+		"track": session.track,
+		"talk": session.talk,
+		"title": session.talk_title or session.description,
+		"start_time": str(session.start_time),
+		"end_time": str(session.end_time),
+		"attendees": attendees,
+		"capacity": session.capacity or None,
+		"is_full": bool(session.capacity) and attendees >= session.capacity,
+	}
+
+
+def get_attendees_key(schedule_item: str) -> str:
+	return frappe.cache.make_key(f"buzz:session_attendance:{schedule_item}:attendees")
+
+
+def get_built_key(schedule_item: str) -> str:
+	return frappe.cache.make_key(f"buzz:session_attendance:{schedule_item}:built")
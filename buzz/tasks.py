@@ -1,6 +1,10 @@
 import frappe
 from frappe.utils import today
 
+from buzz.booking_data import clear_booking_data_cache
+from buzz.ticketing.doctype.event_sales_summary.event_sales_summary import reconcile_event_sales_summaries
+from buzz.ticketing.doctype.event_ticket_type.event_ticket_type import reconcile_ticket_counters
+
 
 def unpublish_ticket_types_after_last_date():
 	frappe.db.set_value(
@@ -10,3 +14,14 @@ def unpublish_ticket_types_after_last_date():
 		False,
 	)
 	frappe.db.commit()
+	clear_booking_data_cache()
+
+
+def reconcile_ticket_type_counters():
+	reconcile_ticket_counters()
+	frappe.db.commit()
+
+
+def reconcile_sales_summaries():
+	reconcile_event_sales_summaries()
+	frappe.db.commit()
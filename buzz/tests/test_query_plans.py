@@ -0,0 +1,49 @@
+# Copyright (c) 2026, BWH Studios and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+# the queries run most often, as (doctype, filters, the indexes that may serve them)
+HOT_QUERIES = [
+	("Event Ticket", {"event": "E", "docstatus": 1}, {"event"}),
+	("Event Ticket", {"booking": "B"}, {"booking"}),
+	("Event Ticket", {"ticket_type": "T", "docstatus": 1}, {"ticket_type"}),
+	# my tickets are paged on (attendee_email, creation), which serves lookups by email as well
+	("Event Ticket", {"attendee_email": "guest@email.com"}, {"attendee_email_creation_index"}),
+	("Event Ticket", {"coupon_used": "C", "docstatus": 1}, {"coupon_used"}),
+	(
+		"Event Check In",
+		{"event": "E", "docstatus": 1, "date": "2026-01-01"},
+		{"event_docstatus_date_index"},
+	),
+	("Event Check In", {"ticket": "T", "date": "2026-01-01"}, {"unique_active_ticket_date"}),
+	("Event Booking", {"event": "E", "docstatus": 1}, {"event_docstatus_index"}),
+	("Event Booking", {"user": "guest@email.com"}, {"user_creation_index"}),
+	(
+		"Event Payment",
+		{"reference_doctype": "Event Booking", "reference_docname": "B"},
+		{"reference_doctype_reference_docname_index"},
+	),
+	("Sponsorship Enquiry", {"owner": "sponsor@email.com"}, {"owner_creation_index"}),
+	("Event Sponsor", {"enquiry": "S"}, {"enquiry"}),
+	(
+		"Buzz Custom Field",
+		{"event": "E", "enabled": 1, "applied_to": "Booking"},
+		{"event_enabled_applied_to_index"},
+	),
+]
+
+
+class IntegrationTestQueryPlans(IntegrationTestCase):
+	def test_hot_queries_use_an_index(self):
+		if frappe.db.db_type != "mariadb":
+			self.skipTest("query plans are checked on MariaDB")
+
+		for doctype, filters, indexes in HOT_QUERIES:
+			with self.subTest(doctype=doctype, filters=filters):
+				query = frappe.db.get_all(doctype, filters=filters, fields=["name"], run=False)
+				plan = frappe.db.sql(f"EXPLAIN {query}", as_dict=True)
+				# "ALL" is a full table scan
+				self.assertNotIn("ALL", [step.type for step in plan], plan)
+				self.assertIn(plan[0].key, indexes, plan)
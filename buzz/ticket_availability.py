@@ -0,0 +1,74 @@
+"""
+Realtime remaining-ticket broadcasts for the booking page.
+
+Every change to the inventory counters of an event (tickets submitted or
+cancelled, holds taken or released) marks the event dirty once the transaction
+commits. A single background job per event drains the dirty flag and publishes
+the remaining tickets of all its ticket types to the event's realtime room, at
+most once every `BROADCAST_INTERVAL_SECONDS`, so a launch rush results in a
+steady few updates per second instead of one per sale. Whether the job is
+running is a flag of its own, released before the job checks the dirty flag a
+last time, so a change marked while it stops is never left unbroadcast.
+"""
+
+import time
+
+import frappe
+
+from buzz.booking_data import get_event_ticket_availability
+
+BROADCAST_INTERVAL_SECONDS = 0.5
+DIRTY_FLAG_EXPIRY_SECONDS = 60
+# frees the event for a new job if a running one dies without releasing it
+RUNNING_FLAG_EXPIRY_SECONDS = 60
+REALTIME_EVENT = "buzz_ticket_availability"
+
+
+def notify_ticket_availability_change(event: str | int):
+	"""Schedule a broadcast of the event's ticket availability after the current transaction commits."""
+	frappe.db.after_commit.add(lambda: mark_availability_changed(event))
+
+
+def mark_availability_changed(event: str | int):
+	frappe.cache.set(get_dirty_key(event), 1, ex=DIRTY_FLAG_EXPIRY_SECONDS)
+
+	# while a broadcast job for the event is running, it picks the flag up itself
+	if frappe.cache.set(get_running_key(event), 1, nx=True, ex=RUNNING_FLAG_EXPIRY_SECONDS):
+		frappe.enqueue(
+			"buzz.ticket_availability.broadcast_ticket_availability",
+			queue="short",
+			event=event,
+		)
+
+
+def broadcast_ticket_availability(event: str | int):
+	running_key = get_running_key(event)
+	try:
+		while True:
+			while frappe.cache.delete(get_dirty_key(event)):
+				frappe.publish_realtime(
+					REALTIME_EVENT,
+					{"event": event, "remaining_tickets": get_event_ticket_availability(event)},
+					doctype="Buzz Event",
+					docname=event,
+				)
+				frappe.cache.expire(running_key, RUNNING_FLAG_EXPIRY_SECONDS)
+				time.sleep(BROADCAST_INTERVAL_SECONDS)
+
+			frappe.cache.delete(running_key)
+			# a change marked since the last broadcast found the job running and did not enqueue another
+			if not frappe.cache.get(get_dirty_key(event)) or not frappe.cache.set(
+				running_key, 1, nx=True, ex=RUNNING_FLAG_EXPIRY_SECONDS
+			):
+				return
+	except Exception:
+		frappe.cache.delete(running_key)
+		raise
+
+
+def get_dirty_key(event: str | int) -> str:
+	return frappe.cache.make_key(f"buzz:ticket_availability:{event}:dirty")
+
+
+def get_running_key(event: str | int) -> str:
+	return frappe.cache.make_key(f"buzz:ticket_availability:{event}:running")
@@ -1,12 +1,26 @@
 # Copyright (c) 2025, BWH Studios and contributors
 # For license information, please see license.txt
 import json
+from collections import Counter
 
 import frappe
 from frappe import _
 from frappe.model.document import Document
 
 from buzz.payments import mark_payment_as_received
+from buzz.ticketing.doctype.event_sales_summary.event_sales_summary import update_event_sales_summary
+from buzz.ticketing.doctype.event_ticket_hold.event_ticket_hold import (
+	get_held_quantity_by_ticket_type,
+	hold_tickets_for_booking,
+	release_holds_for_booking,
+)
+from buzz.ticketing.doctype.event_ticket_type.event_ticket_type import (
+	get_quantity_by_ticket_type,
+	update_tickets_sold,
+)
+
+# bookings with more attendees than this get their tickets generated in background jobs, a chunk each
+TICKET_GENERATION_CHUNK_SIZE = 50
 
 
 class EventBooking(Document):
@@ -30,6 +44,8 @@ class EventBooking(Document):
 		net_amount: DF.Currency
 		tax_amount: DF.Currency
 		tax_percentage: DF.Percent
+		ticket_generation_status: DF.Literal["", "Queued", "In Progress", "Completed", "Failed"]
+		tickets_generated: DF.Int
 		total_amount: DF.Currency
 		user: DF.Link
 	# end: auto-generated types
@@ -45,12 +61,17 @@ class EventBooking(Document):
 		self.currency = self.attendees[0].currency
 
 	def set_total(self):
+		add_on_totals = get_add_on_totals(
+			[attendee.add_ons for attendee in self.attendees if attendee.add_ons]
+		)
+
 		self.net_amount = 0
 		for attendee in self.attendees:
 			self.net_amount += attendee.amount
 			if attendee.add_ons:
-				attendee.add_on_total = attendee.get_add_on_total()
-				attendee.number_of_add_ons = attendee.get_number_of_add_ons()
+				attendee.add_on_total, attendee.number_of_add_ons = add_on_totals.get(
+					attendee.add_ons, (0, 0)
+				)
 				self.net_amount += attendee.add_on_total
 		self.total_amount = self.net_amount
 
@@ -72,12 +93,15 @@ class EventBooking(Document):
 				num_tickets_by_type[attendee.ticket_type] = 0
 			num_tickets_by_type[attendee.ticket_type] += 1
 
+		# tickets already held by this booking are not competing with it
+		held_by_type = {} if self.is_new() else get_held_quantity_by_ticket_type(self.name)
+
 		for ticket_type, num_tickets in num_tickets_by_type.items():
 			ticket_type_doc = frappe.get_cached_doc("Event Ticket Type", ticket_type)
 			if not ticket_type_doc.is_published:
 				frappe.throw(frappe._(f"{ticket_type} tickets no longer available!"))
 
-			if not ticket_type_doc.are_tickets_available(num_tickets):
+			if not ticket_type_doc.are_tickets_available(num_tickets - held_by_type.get(str(ticket_type), 0)):
 				frappe.throw(
 					frappe._(
 						f"Only {ticket_type_doc.remaining_tickets} tickets available for {ticket_type}, you are trying to book {num_tickets}!"
@@ -85,63 +109,129 @@ class EventBooking(Document):
 				)
 
 	def fetch_amounts_from_ticket_types(self):
-		for attendee in self.attendees:
-			price, currency = frappe.get_cached_value(
-				"Event Ticket Type", attendee.ticket_type, ["price", "currency"]
+		prices = {
+			str(tt.name): (tt.price, tt.currency)
+			for tt in frappe.db.get_all(
+				"Event Ticket Type",
+				filters={"name": ("in", list({attendee.ticket_type for attendee in self.attendees}))},
+				fields=["name", "price", "currency"],
 			)
+		}
+
+		for attendee in self.attendees:
+			price, currency = prices[str(attendee.ticket_type)]
 			if attendee.amount is None:
 				attendee.amount = price
 			if not attendee.currency:
 				attendee.currency = currency
 
+	def after_insert(self):
+		hold_tickets_for_booking(self)
+
+	def before_submit(self):
+		self.tickets_generated = 0
+		self.ticket_generation_status = "Queued" if self.is_group_booking() else "Completed"
+
 	def on_submit(self):
-		self.generate_tickets()
+		# the held tickets are sold now, move them from reserved to sold
+		release_holds_for_booking(self.name)
+		for ticket_type, num_tickets in self.get_num_tickets_by_type().items():
+			update_tickets_sold(ticket_type, num_tickets)
+		update_event_sales_summary(self.event, sales=self.total_amount)
+
+		if self.is_group_booking():
+			enqueue_ticket_generation(self.name)
+		else:
+			self.generate_tickets()
+
+	def is_group_booking(self) -> bool:
+		return len(self.attendees) > TICKET_GENERATION_CHUNK_SIZE
+
+	def get_num_tickets_by_type(self) -> Counter:
+		return Counter(attendee.ticket_type for attendee in self.attendees)
 
 	def generate_tickets(self):
-		for attendee in self.attendees:
-			ticket = frappe.new_doc("Event Ticket")
-			ticket.event = self.event
-			ticket.booking = self.name
-			ticket.ticket_type = attendee.ticket_type
-			ticket.attendee_name = attendee.full_name
-			ticket.attendee_email = attendee.email
+		custom_field_map = self.get_ticket_custom_field_map()
+		for attendee in self.attendees[self.tickets_generated :]:
+			self.make_ticket(attendee, custom_field_map)
+		self.db_set("tickets_generated", len(self.attendees))
 
-			if attendee.add_ons:
-				add_ons_list = frappe.get_cached_doc("Attendee Ticket Add-on", attendee.add_ons).add_ons
-				ticket.add_ons = add_ons_list
-
-			# Add custom fields from attendee to ticket
-			if attendee.custom_fields:
-				custom_fields_data = attendee.custom_fields
-				if isinstance(custom_fields_data, str):
-					try:
-						custom_fields_data = json.loads(custom_fields_data)
-					except (json.JSONDecodeError, TypeError):
-						custom_fields_data = {}
-
-				# Get custom field definitions for this event to get proper labels and types
-				custom_field_defs = frappe.db.get_all(
-					"Buzz Custom Field",
-					filters={"event": self.event, "enabled": 1, "applied_to": "Ticket"},
-					fields=["fieldname", "label", "fieldtype"],
-				)
-				custom_field_map = {cf["fieldname"]: cf for cf in custom_field_defs}
-
-				for field_name, field_value in custom_fields_data.items():
-					if field_value and field_name in custom_field_map:
-						field_def = custom_field_map[field_name]
-						ticket.append(
-							"additional_fields",
-							{
-								"fieldname": field_name,
-								"value": str(field_value),
-								"label": field_def["label"],
-								"fieldtype": field_def["fieldtype"],
-							},
-						)
-
-			ticket.flags.ignore_permissions = 1
-			ticket.insert().submit()
+	def generate_ticket_chunk(self):
+		"""Generate the next chunk of tickets of a group booking and report progress on the booking."""
+		custom_field_map = self.get_ticket_custom_field_map()
+		chunk = self.attendees[self.tickets_generated : self.tickets_generated + TICKET_GENERATION_CHUNK_SIZE]
+		for attendee in chunk:
+			self.make_ticket(attendee, custom_field_map)
+
+		tickets_generated = self.tickets_generated + len(chunk)
+		self.db_set(
+			{
+				"tickets_generated": tickets_generated,
+				"ticket_generation_status": "Completed"
+				if tickets_generated >= len(self.attendees)
+				else "In Progress",
+			}
+		)
+		frappe.publish_realtime(
+			"buzz_ticket_generation",
+			{
+				"booking": self.name,
+				"status": self.ticket_generation_status,
+				"tickets_generated": tickets_generated,
+				"total_tickets": len(self.attendees),
+			},
+			doctype=self.doctype,
+			docname=self.name,
+			after_commit=True,
+		)
+
+	def get_ticket_custom_field_map(self) -> dict:
+		# Get custom field definitions for this event to get proper labels and types
+		custom_field_defs = frappe.db.get_all(
+			"Buzz Custom Field",
+			filters={"event": self.event, "enabled": 1, "applied_to": "Ticket"},
+			fields=["fieldname", "label", "fieldtype"],
+		)
+		return {cf["fieldname"]: cf for cf in custom_field_defs}
+
+	def make_ticket(self, attendee, custom_field_map: dict):
+		ticket = frappe.new_doc("Event Ticket")
+		ticket.event = self.event
+		ticket.booking = self.name
+		ticket.ticket_type = attendee.ticket_type
+		ticket.attendee_name = attendee.full_name
+		ticket.attendee_email = attendee.email
+
+		if attendee.add_ons:
+			add_ons_list = frappe.get_cached_doc("Attendee Ticket Add-on", attendee.add_ons).add_ons
+			ticket.add_ons = add_ons_list
+
+		# Add custom fields from attendee to ticket
+		if attendee.custom_fields:
+			custom_fields_data = attendee.custom_fields
+			if isinstance(custom_fields_data, str):
+				try:
+					custom_fields_data = json.loads(custom_fields_data)
+				except (json.JSONDecodeError, TypeError):
+					custom_fields_data = {}
+
+			for field_name, field_value in custom_fields_data.items():
+				if field_value and field_name in custom_field_map:
+					field_def = custom_field_map[field_name]
+					ticket.append(
+						"additional_fields",
+						{
+							"fieldname": field_name,
+							"value": str(field_value),
+							"label": field_def["label"],
+							"fieldtype": field_def["fieldtype"],
+						},
+					)
+
+		# counted for the whole booking on submit
+		ticket.flags.tickets_sold_counted = True
+		ticket.flags.ignore_permissions = 1
+		ticket.insert().submit()
 
 	def on_payment_authorized(self, payment_status: str):
 		if payment_status in ("Authorized", "Completed"):
@@ -157,11 +247,108 @@ class EventBooking(Document):
 			frappe.log_error(frappe.get_traceback(), _("Booking Failed"))
 			frappe.throw(frappe._("Booking Failed! Please contact support."))
 
+	def on_trash(self):
+		release_holds_for_booking(self.name)
+
 	def on_cancel(self):
 		self.ignore_linked_doctypes = ["Ticket Cancellation Request"]
+		update_event_sales_summary(self.event, sales=-self.total_amount)
+		self.release_ungenerated_tickets()
 		self.cancel_all_tickets()
 
+	def release_ungenerated_tickets(self):
+		"""Give back the seats sold on submit to attendees whose tickets were never generated.
+
+		Generated tickets give their seat back when they are cancelled (or already did),
+		so the ungenerated seats are the attendees less the tickets that exist, which also
+		holds for bookings from before `tickets_generated` was kept. Background generation
+		holds the booking's row lock for each chunk, so no ticket appears meanwhile.
+		"""
+		ungenerated = Counter(str(attendee.ticket_type) for attendee in self.attendees)
+		ungenerated.subtract(
+			get_quantity_by_ticket_type(
+				"Event Ticket",
+				{"booking": self.name, "docstatus": ("!=", 0)},
+				{"COUNT": "*", "as": "quantity"},
+			)
+		)
+		for ticket_type, num_tickets in ungenerated.items():
+			if num_tickets > 0:
+				update_tickets_sold(ticket_type, -num_tickets)
+
 	def cancel_all_tickets(self):
 		tickets = frappe.db.get_all("Event Ticket", filters={"booking": self.name}, pluck="name")
 		for ticket in tickets:
 			frappe.get_cached_doc("Event Ticket", ticket).cancel()
+
+
+def get_add_on_totals(attendee_add_ons: list[str]) -> dict[str, tuple[float, int]]:
+	"""Returns (total price, number of add-ons) of each Attendee Ticket Add-on, in one query."""
+	if not attendee_add_ons:
+		return {}
+
+	return {
+		row.parent: (row.add_on_total or 0, row.number_of_add_ons)
+		for row in frappe.db.get_all(
+			"Ticket Add-on Value",
+			filters={"parenttype": "Attendee Ticket Add-on", "parent": ("in", attendee_add_ons)},
+			fields=[
+				"parent",
+				{"SUM": "price", "as": "add_on_total"},
+				{"COUNT": "*", "as": "number_of_add_ons"},
+			],
+			group_by="parent",
+		)
+	}
+
+
+def enqueue_ticket_generation(booking: str):
+	frappe.enqueue(
+		"buzz.ticketing.doctype.event_booking.event_booking.generate_tickets_in_background",
+		queue="long",
+		job_id=f"generate_tickets:{booking}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		booking=booking,
+	)
+
+
+def generate_tickets_in_background(booking: str):
+	"""Generate the tickets of a group booking one committed chunk at a time.
+
+	Progress is kept on the booking, so a failed or interrupted run resumes from
+	the first attendee without a ticket when it is enqueued again.
+	"""
+	while True:
+		booking_doc = frappe.get_doc("Event Booking", booking, for_update=True)
+		# a cancelled booking gave back the seats of its remaining attendees, see `on_cancel`
+		if booking_doc.docstatus == 2 or booking_doc.ticket_generation_status == "Completed":
+			return
+
+		try:
+			booking_doc.generate_ticket_chunk()
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			frappe.db.set_value(
+				"Event Booking", booking, "ticket_generation_status", "Failed", update_modified=False
+			)
+			frappe.db.commit()
+			frappe.log_error(title=_("Ticket Generation Failed for Booking {0}").format(booking))
+			raise
+
+
+def resume_ticket_generation():
+	"""Re-enqueue group bookings whose ticket generation failed or was interrupted."""
+	for booking in frappe.db.get_all(
+		"Event Booking",
+		filters={"docstatus": 1, "ticket_generation_status": ("in", ("Queued", "In Progress", "Failed"))},
+		pluck="name",
+	):
+		enqueue_ticket_generation(booking)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Event Booking", ["event", "docstatus"])
+	# a user's bookings are listed newest first
+	frappe.db.add_index("Event Booking", ["user", "creation"])
@@ -208,3 +208,286 @@ class IntegrationTestEventBooking(IntegrationTestCase):
 					],
 				}
 			).insert()
+
+	def test_process_booking_is_idempotent(self):
+		from buzz.api import process_booking
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{
+				"doctype": "Event Ticket Type",
+				"event": test_event.name,
+				"title": "Free",
+				"price": 0,
+				"is_published": True,
+			}
+		).insert()
+
+		attendees = [
+			{"full_name": "John Doe", "email": "john@email.com", "ticket_type": test_ticket_type.name}
+		]
+		idempotency_key = frappe.generate_hash()
+		bookings_before = frappe.db.count("Event Booking", {"event": test_event.name})
+
+		first = process_booking(attendees, test_event.name, idempotency_key=idempotency_key)
+		# the first call is in progress until its booking is committed
+		self.assertRaises(
+			frappe.DuplicateEntryError,
+			process_booking,
+			attendees,
+			test_event.name,
+			idempotency_key=idempotency_key,
+		)
+		frappe.db.after_commit.run()
+		retried = process_booking(attendees, test_event.name, idempotency_key=idempotency_key)
+
+		self.assertEqual(first, retried)
+		self.assertEqual(frappe.db.count("Event Booking", {"event": test_event.name}), bookings_before + 1)
+
+		# a new key is a new booking
+		process_booking(attendees, test_event.name, idempotency_key=frappe.generate_hash())
+		self.assertEqual(frappe.db.count("Event Booking", {"event": test_event.name}), bookings_before + 2)
+
+	def test_group_booking_generates_tickets_in_chunks(self):
+		from unittest.mock import patch
+
+		from buzz.ticketing.doctype.event_booking import event_booking
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{
+				"doctype": "Event Ticket Type",
+				"event": test_event.name,
+				"title": "Group",
+				"price": 0,
+				"is_published": True,
+				"max_tickets_available": 5,
+			}
+		).insert()
+
+		with patch.object(event_booking, "TICKET_GENERATION_CHUNK_SIZE", 2):
+			test_booking = frappe.get_doc(
+				{
+					"doctype": "Event Booking",
+					"user": frappe.session.user,
+					"event": test_event.name,
+					"attendees": [
+						{
+							"full_name": f"Guest {i}",
+							"email": f"guest{i}@email.com",
+							"ticket_type": test_ticket_type.name,
+						}
+						for i in range(3)
+					],
+				}
+			).insert()
+			test_booking.submit()
+
+			# seats are sold on submit, before any ticket exists
+			self.assertEqual(test_booking.ticket_generation_status, "Queued")
+			self.assertEqual(frappe.db.count("Event Ticket", {"booking": test_booking.name}), 0)
+			self.assertEqual(
+				frappe.db.get_value("Event Ticket Type", test_ticket_type.name, "tickets_sold"), 3
+			)
+
+			# the job commits each chunk, the test's transaction is rolled back instead
+			with patch.object(frappe.db, "commit"):
+				event_booking.generate_tickets_in_background(test_booking.name)
+
+		test_booking.reload()
+		self.assertEqual(test_booking.ticket_generation_status, "Completed")
+		self.assertEqual(test_booking.tickets_generated, 3)
+		self.assertEqual(frappe.db.count("Event Ticket", {"booking": test_booking.name, "docstatus": 1}), 3)
+		self.assertEqual(frappe.db.get_value("Event Ticket Type", test_ticket_type.name, "tickets_sold"), 3)
+
+	def test_cancelling_group_booking_during_ticket_generation(self):
+		from unittest.mock import patch
+
+		from buzz.ticketing.doctype.event_booking import event_booking
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{
+				"doctype": "Event Ticket Type",
+				"event": test_event.name,
+				"title": "Called Off",
+				"price": 0,
+				"is_published": True,
+			}
+		).insert()
+
+		with patch.object(event_booking, "TICKET_GENERATION_CHUNK_SIZE", 2):
+			test_booking = frappe.get_doc(
+				{
+					"doctype": "Event Booking",
+					"user": frappe.session.user,
+					"event": test_event.name,
+					"attendees": [
+						{
+							"full_name": f"Guest {i}",
+							"email": f"guest{i}@email.com",
+							"ticket_type": test_ticket_type.name,
+						}
+						for i in range(3)
+					],
+				}
+			).insert()
+			test_booking.submit()
+			test_booking.generate_ticket_chunk()
+
+			test_booking.reload()
+			test_booking.cancel()
+			# the two generated tickets and the seat of the third attendee are all given back
+			self.assertEqual(
+				frappe.db.get_value("Event Ticket Type", test_ticket_type.name, "tickets_sold"), 0
+			)
+
+			with patch.object(frappe.db, "commit"):
+				event_booking.generate_tickets_in_background(test_booking.name)
+
+		self.assertEqual(frappe.db.count("Event Ticket", {"booking": test_booking.name}), 2)
+
+	def test_cancelling_booking_from_before_tickets_generated_was_kept(self):
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{
+				"doctype": "Event Ticket Type",
+				"event": test_event.name,
+				"title": "Legacy",
+				"price": 0,
+				"is_published": True,
+			}
+		).insert()
+		frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "Walk In",
+				"attendee_email": "walk.in@email.com",
+			}
+		).insert().submit()
+
+		test_booking = frappe.get_doc(
+			{
+				"doctype": "Event Booking",
+				"user": frappe.session.user,
+				"event": test_event.name,
+				"attendees": [
+					{
+						"full_name": f"Guest {i}",
+						"email": f"guest{i}@email.com",
+						"ticket_type": test_ticket_type.name,
+					}
+					for i in range(2)
+				],
+			}
+		).insert()
+		test_booking.submit()
+		self.assertEqual(frappe.db.get_value("Event Ticket Type", test_ticket_type.name, "tickets_sold"), 3)
+
+		# submitted before the booking counted its generated tickets
+		frappe.db.set_value(
+			"Event Booking",
+			test_booking.name,
+			{"tickets_generated": 0, "ticket_generation_status": ""},
+			update_modified=False,
+		)
+		test_booking.reload()
+		test_booking.cancel()
+
+		# each ticket gives its seat back once, the walk-in keeps theirs
+		self.assertEqual(frappe.db.get_value("Event Ticket Type", test_ticket_type.name, "tickets_sold"), 1)
+
+	def test_booking_details_query_count(self):
+		from buzz.api import get_booking_details
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Details", "price": 0}
+		).insert()
+		test_ticket_add_on = frappe.get_doc(
+			{
+				"doctype": "Ticket Add-on",
+				"event": test_event.name,
+				"title": "Meal",
+				"price": 0,
+				"user_selects_option": True,
+				"options": "Veg\nNon-Veg",
+			}
+		).insert()
+
+		attendees = []
+		for i in range(10):
+			add_ons = frappe.get_doc(
+				{
+					"doctype": "Attendee Ticket Add-on",
+					"add_ons": [{"add_on": test_ticket_add_on.name, "value": "Veg"}],
+				}
+			).insert()
+			attendees.append(
+				{
+					"ticket_type": test_ticket_type.name,
+					"full_name": f"Guest {i}",
+					"email": f"guest{i}@email.com",
+					"add_ons": add_ons.name,
+				}
+			)
+		test_booking = frappe.get_doc(
+			{
+				"doctype": "Event Booking",
+				"event": test_event.name,
+				"user": "Administrator",
+				"attendees": attendees,
+			}
+		).insert()
+		test_booking.submit()
+
+		# warm the document caches, the budget is for the queries made on every call
+		get_booking_details(test_booking.name)
+		with self.assertQueryCount(5):
+			details = get_booking_details(test_booking.name)
+
+		self.assertEqual(len(details.tickets), 10)
+		for ticket in details.tickets:
+			self.assertEqual([add_on["value"] for add_on in ticket.add_ons], ["Veg"])
+			self.assertEqual(ticket.add_ons[0]["options"], ["Veg", "Non-Veg"])
+
+	def test_my_bookings_are_paginated_by_keyset(self):
+		from buzz.api import get_my_bookings
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Keyset", "price": 0}
+		).insert()
+		for i in range(3):
+			frappe.get_doc(
+				{
+					"doctype": "Event Booking",
+					"event": test_event.name,
+					"user": frappe.session.user,
+					"attendees": [
+						{
+							"ticket_type": test_ticket_type.name,
+							"full_name": f"Guest {i}",
+							"email": f"guest{i}@email.com",
+						}
+					],
+				}
+			).insert().submit()
+
+		expected = frappe.db.get_all(
+			"Event Booking",
+			filters={"user": frappe.session.user, "docstatus": ("!=", 0)},
+			order_by="creation desc, name desc",
+			pluck="name",
+		)
+
+		pages, after = [], {}
+		while page := get_my_bookings(page_length=2, **after):
+			pages.append(page)
+			after = {"after_creation": page[-1].creation, "after_name": page[-1].name}
+
+		self.assertEqual([booking.name for page in pages for booking in page], expected)
+		self.assertTrue(all(len(page) <= 2 for page in pages))
+		self.assertEqual(pages[0][0].ticket_count, 1)
@@ -0,0 +1,130 @@
+# Copyright (c) 2026, BWH Studios and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Count
+from frappe.utils import flt
+
+SUMMARY_COUNTERS = ("tickets_sold", "add_ons_sold", "sales")
+
+
+class EventSalesSummary(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		add_ons_sold: DF.Int
+		event: DF.Link
+		sales: DF.Currency
+		tickets_sold: DF.Int
+	# end: auto-generated types
+
+	pass
+
+
+def update_event_sales_summary(
+	event: str | int, tickets_sold: int = 0, add_ons_sold: int = 0, sales: float = 0
+):
+	"""Atomically move the counters of an event's summary, the row stays locked until the transaction ends."""
+	if not (tickets_sold or add_ons_sold or sales):
+		return
+
+	ess = frappe.qb.DocType("Event Sales Summary")
+	(
+		frappe.qb.update(ess)
+		.set(ess.tickets_sold, ess.tickets_sold + tickets_sold)
+		.set(ess.add_ons_sold, ess.add_ons_sold + add_ons_sold)
+		.set(ess.sales, ess.sales + sales)
+		.where(ess.event == event)
+	).run()
+
+	if not frappe.db._cursor.rowcount:
+		# counted from the documents, which include the change being recorded
+		reconcile_event_sales_summaries(event)
+
+
+def get_event_sales_totals(events: list | None = None) -> dict[str, dict]:
+	"""Tickets, add-ons and sales of events counted from their documents, in three grouped queries."""
+	totals = {}
+
+	def add(rows, counter):
+		for row in rows:
+			totals.setdefault(str(row.event), dict.fromkeys(SUMMARY_COUNTERS, 0))[counter] = row.value or 0
+
+	filters = {"docstatus": 1, **({"event": ("in", events)} if events else {})}
+	add(
+		frappe.db.get_all(
+			"Event Ticket", filters=filters, fields=["event", {"COUNT": "*", "as": "value"}], group_by="event"
+		),
+		"tickets_sold",
+	)
+	add(
+		frappe.db.get_all(
+			"Event Booking",
+			filters=filters,
+			fields=["event", {"SUM": "total_amount", "as": "value"}],
+			group_by="event",
+		),
+		"sales",
+	)
+
+	ticket = frappe.qb.DocType("Event Ticket")
+	add_on = frappe.qb.DocType("Ticket Add-on Value")
+	query = (
+		frappe.qb.from_(add_on)
+		.join(ticket)
+		.on(ticket.name == add_on.parent)
+		.select(ticket.event, Count("*").as_("value"))
+		.where(
+			(add_on.parenttype == "Event Ticket")
+			& (add_on.parentfield == "add_ons")
+			& (ticket.docstatus == 1)
+		)
+		.groupby(ticket.event)
+	)
+	if events:
+		query = query.where(ticket.event.isin(events))
+	add(query.run(as_dict=True), "add_ons_sold")
+
+	return totals
+
+
+def reconcile_event_sales_summaries(event: str | int | None = None):
+	"""Create missing event summaries and rebuild drifted ones from the events' documents.
+
+	Grouped queries find the drifted summaries, which are then locked and
+	recounted one by one so that concurrent sales are not overwritten.
+	"""
+	events = [event] if event else frappe.db.get_all("Buzz Event", pluck="name")
+	totals = get_event_sales_totals([event] if event else None)
+	summaries = {
+		str(summary.event): summary
+		for summary in frappe.db.get_all(
+			"Event Sales Summary",
+			filters={"event": event} if event else {},
+			fields=["name", "event", *SUMMARY_COUNTERS],
+		)
+	}
+
+	for event_name in events:
+		counted = totals.get(str(event_name), dict.fromkeys(SUMMARY_COUNTERS, 0))
+		summary = summaries.get(str(event_name))
+		if not summary:
+			frappe.get_doc({"doctype": "Event Sales Summary", "event": event_name, **counted}).insert(
+				ignore_permissions=True, ignore_if_duplicate=True
+			)
+			continue
+
+		if all(flt(summary[counter]) == flt(counted[counter]) for counter in SUMMARY_COUNTERS):
+			continue
+
+		frappe.db.get_value("Event Sales Summary", summary.name, "name", for_update=True)
+		counted = get_event_sales_totals([event_name]).get(
+			str(event_name), dict.fromkeys(SUMMARY_COUNTERS, 0)
+		)
+		frappe.db.set_value("Event Sales Summary", summary.name, counted, update_modified=False)
@@ -0,0 +1,58 @@
+# Copyright (c) 2026, BWH Studios and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from buzz.ticketing.doctype.event_sales_summary.event_sales_summary import (
+	get_event_sales_totals,
+	reconcile_event_sales_summaries,
+)
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class IntegrationTestEventSalesSummary(IntegrationTestCase):
+	"""
+	Integration tests for EventSalesSummary.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def test_summary_follows_ticket_sales(self):
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		reconcile_event_sales_summaries(test_event.name)
+		before = frappe.db.get_value("Event Sales Summary", test_event.name, "tickets_sold")
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Summary", "price": 0}
+		).insert()
+
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "John Doe",
+				"attendee_email": "john@email.com",
+			}
+		).insert()
+		ticket.submit()
+		self.assertEqual(
+			frappe.db.get_value("Event Sales Summary", test_event.name, "tickets_sold"), before + 1
+		)
+
+		ticket.cancel()
+		self.assertEqual(frappe.db.get_value("Event Sales Summary", test_event.name, "tickets_sold"), before)
+
+		# a drifted summary is rebuilt from the documents
+		frappe.db.set_value("Event Sales Summary", test_event.name, "tickets_sold", 1000)
+		reconcile_event_sales_summaries(test_event.name)
+		summary = frappe.db.get_value(
+			"Event Sales Summary", test_event.name, ["tickets_sold", "add_ons_sold", "sales"], as_dict=True
+		)
+		totals = get_event_sales_totals([test_event.name]).get(str(test_event.name), {})
+		self.assertEqual(summary.tickets_sold, totals.get("tickets_sold", 0))
+		self.assertEqual(summary.add_ons_sold, totals.get("add_ons_sold", 0))
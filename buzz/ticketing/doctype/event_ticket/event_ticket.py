@@ -1,11 +1,27 @@
 # Copyright (c) 2025, BWH Studios and contributors
 # For license information, please see license.txt
 
+import functools
+from urllib.parse import urlencode
+
 import frappe
 from frappe.core.api.user_invitation import invite_by_email
 from frappe.model.document import Document
+from frappe.utils import add_days, add_to_date, now_datetime
+
+from buzz.check_in_tokens import ensure_signing_key, make_check_in_token
+from buzz.ticketing.doctype.event_sales_summary.event_sales_summary import update_event_sales_summary
+from buzz.ticketing.doctype.event_ticket_type.event_ticket_type import update_tickets_sold
+from buzz.utils import get_signed_value, only_if_app_installed, sign_value
 
-from buzz.utils import only_if_app_installed
+MAX_SIDE_EFFECT_ATTEMPTS = 3
+QR_CODE_CACHE_SIZE = 1024
+TICKET_TOKEN_PURPOSE = "ticket-qr"
+SIDE_EFFECT_RETRY_DAYS = 2
+TICKET_SIDE_EFFECT_QUEUES = {
+	"send_ticket_email": "default",
+	"create_zoom_registration_if_applicable": "long",
+}
 
 
 class EventTicket(Document):
@@ -30,25 +46,49 @@ class EventTicket(Document):
 		event: DF.Link | None
 		naming_series: DF.Literal["T.###"]
 		qr_code: DF.AttachImage | None
+		ticket_email_sent: DF.Check
 		ticket_type: DF.Link
 	# end: auto-generated types
 
 	def before_submit(self):
 		self.validate_coupon_usage()
-		self.generate_qr_code()
+		if not self.flags.tickets_sold_counted:
+			update_tickets_sold(self.ticket_type, 1)
+		self.set_qr_code()
 
 	def on_submit(self):
-		try:
-			self.send_ticket_email()
-		except Exception as e:
-			frappe.log_error("Error sending ticket email: " + str(e))
+		update_event_sales_summary(self.event, tickets_sold=1, add_ons_sold=len(self.add_ons))
+		# email and Zoom registration are slow and talk to other services,
+		# they run in background jobs once the ticket is committed
+		self.enqueue_side_effects(enqueue_after_commit=True)
 
 		# TODO: bring back after we have templates
 		# try:
 		# 	self.send_user_invitation()
 		# except Exception as e:
 		# 	frappe.log_error("Error sending user invitation: " + str(e))
-		self.create_zoom_registration_if_applicable()
+
+	def get_pending_side_effects(self) -> list[str]:
+		"""Side effects of submitting the ticket that have not happened yet, ready to run now."""
+		pending = []
+		if not self.ticket_email_sent:
+			pending.append("send_ticket_email")
+		if self.needs_zoom_registration():
+			pending.append("create_zoom_registration_if_applicable")
+		return pending
+
+	def enqueue_side_effects(self, enqueue_after_commit: bool = False):
+		for side_effect in self.get_pending_side_effects():
+			enqueue_ticket_side_effect(self.name, side_effect, enqueue_after_commit=enqueue_after_commit)
+
+	def needs_zoom_registration(self) -> bool:
+		if "zoom_integration" not in frappe.get_installed_apps():
+			return False
+
+		zoom_webinar = frappe.get_cached_value("Buzz Event", self.event, "zoom_webinar")
+		return bool(zoom_webinar) and not frappe.db.exists(
+			"Zoom Webinar Registration", {"webinar": zoom_webinar, "email": self.attendee_email}
+		)
 
 	@only_if_app_installed("zoom_integration")
 	def create_zoom_registration_if_applicable(self):
@@ -114,6 +154,7 @@ class EventTicket(Document):
 				}
 			],
 		)
+		self.db_set("ticket_email_sent", 1)
 
 	def validate_coupon_usage(self):
 		if not self.coupon_used:
@@ -123,22 +164,16 @@ class EventTicket(Document):
 		if coupon.is_used_up():
 			frappe.throw(frappe._("Coupon has been already used up maximum number of times!"))
 
-	def generate_qr_code(self):
-		qr_data = make_qr_image_with_data(f"{self.name}")
-		qr_code_file = frappe.get_doc(
-			{
-				"doctype": "File",
-				"content": qr_data,
-				"attached_to_doctype": "Event Ticket",
-				"attached_to_name": self.name,
-				"attached_to_field": "qr_code",
-				"file_name": f"ticket-qr-code-{self.name}.png",
-			}
-		).save(ignore_permissions=True)
-		self.qr_code = qr_code_file.file_url
+	def set_qr_code(self):
+		"""The QR code is rendered on request from a signed token, see `get_qr_code_url`."""
+		# rendering happens in a GET, whose writes are rolled back, so the key is created now
+		ensure_signing_key(self.event)
+		self.qr_code = get_qr_code_url(self.name)
 
 	def on_cancel(self):
 		self.ignore_linked_doctypes = ["Event Booking", "Ticket Cancellation Request"]
+		update_tickets_sold(self.ticket_type, -1)
+		update_event_sales_summary(self.event, tickets_sold=-1, add_ons_sold=-len(self.add_ons))
 		self.send_cancellation_email()
 
 	def send_cancellation_email(self):
@@ -153,6 +188,101 @@ class EventTicket(Document):
 		)
 
 
+def on_doctype_update():
+	# an attendee's tickets are listed newest first
+	frappe.db.add_index("Event Ticket", ["attendee_email", "creation"])
+
+
+def enqueue_ticket_side_effect(
+	ticket: str, side_effect: str, attempt: int = 1, enqueue_after_commit: bool = False
+):
+	frappe.enqueue(
+		"buzz.ticketing.doctype.event_ticket.event_ticket.run_ticket_side_effect",
+		queue=TICKET_SIDE_EFFECT_QUEUES[side_effect],
+		# a retry is enqueued by the attempt still running, which would deduplicate it with the same id
+		job_id=f"{side_effect}:{ticket}:{attempt}",
+		deduplicate=True,
+		enqueue_after_commit=enqueue_after_commit,
+		ticket=ticket,
+		side_effect=side_effect,
+		attempt=attempt,
+	)
+
+
+def run_ticket_side_effect(ticket: str, side_effect: str, attempt: int = 1):
+	"""Run one side effect of a submitted ticket, then queue the ones that were waiting on it.
+
+	Each side effect records that it happened on the ticket, so running it again
+	(a retry, or `retry_pending_ticket_side_effects`) never sends a second email.
+	"""
+	ticket_doc = frappe.get_doc("Event Ticket", ticket)
+	if ticket_doc.docstatus != 1 or side_effect not in ticket_doc.get_pending_side_effects():
+		return
+
+	try:
+		getattr(ticket_doc, side_effect)()
+		frappe.db.commit()
+	except Exception:
+		frappe.db.rollback()
+		if attempt < MAX_SIDE_EFFECT_ATTEMPTS:
+			enqueue_ticket_side_effect(ticket, side_effect, attempt + 1)
+		else:
+			frappe.log_error(title=f"Event Ticket {ticket}: {side_effect} failed")
+		return
+
+	ticket_doc.enqueue_side_effects()
+
+
+def retry_pending_ticket_side_effects():
+	"""Queue the side effects of recent tickets that still have not happened, e.g. after a worker outage."""
+	# tickets of Zoom webinars may still need their registration after the email went out
+	or_filters = {"ticket_email_sent": 0}
+	if "zoom_integration" in frappe.get_installed_apps():
+		if webinar_events := frappe.db.get_all(
+			"Buzz Event", filters={"zoom_webinar": ("is", "set")}, pluck="name"
+		):
+			or_filters["event"] = ("in", webinar_events)
+
+	tickets = frappe.db.get_all(
+		"Event Ticket",
+		filters={
+			"docstatus": 1,
+			"creation": (">", add_days(now_datetime(), -SIDE_EFFECT_RETRY_DAYS)),
+			"modified": ("<", add_to_date(now_datetime(), minutes=-15)),
+		},
+		or_filters=or_filters,
+		pluck="name",
+	)
+
+	# each ticket works out which of its side effects are still pending
+	for ticket in tickets:
+		frappe.get_doc("Event Ticket", ticket).enqueue_side_effects()
+
+
+def make_ticket_token(ticket: str) -> str:
+	"""Compact signed token in the URL of the ticket's QR code image, verifiable without a database lookup."""
+	return sign_value(ticket, TICKET_TOKEN_PURPOSE)
+
+
+def get_ticket_from_token(token: str | None) -> str | None:
+	return get_signed_value(token, TICKET_TOKEN_PURPOSE)
+
+
+def get_qr_code_url(ticket: str) -> str:
+	return f"/api/method/buzz.api.get_ticket_qr_code?{urlencode({'token': make_ticket_token(ticket)})}"
+
+
+@functools.lru_cache(maxsize=QR_CODE_CACHE_SIZE)
+def render_qr_code(token: str) -> bytes:
+	"""PNG of the QR code of the ticket behind `token`, memoised per worker.
+
+	The code holds the ticket's offline-verifiable check-in token, see `buzz.check_in_tokens`.
+	"""
+	ticket = get_ticket_from_token(token)
+	event = frappe.db.get_value("Event Ticket", ticket, "event")
+	return make_qr_image_with_data(make_check_in_token(ticket, event))
+
+
 def make_qr_image_with_data(data: str) -> bytes:
 	import io
 
@@ -17,4 +17,82 @@ class IntegrationTestEventTicket(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def test_side_effects_run_after_submit(self):
+		from unittest.mock import patch
+
+		from buzz.ticketing.doctype.event_ticket.event_ticket import run_ticket_side_effect
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Normal", "price": 0}
+		).insert()
+
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "John Doe",
+				"attendee_email": "john@email.com",
+			}
+		).insert()
+		ticket.submit()
+
+		# nothing slow happens on submit
+		self.assertEqual(ticket.get_pending_side_effects(), ["send_ticket_email"])
+
+		# side effects commit once done, the test's transaction is rolled back instead
+		with patch.object(frappe.db, "commit"):
+			run_ticket_side_effect(ticket.name, "send_ticket_email")
+		ticket.reload()
+		self.assertTrue(ticket.ticket_email_sent)
+		self.assertEqual(ticket.get_pending_side_effects(), [])
+
+	def test_failed_side_effect_is_retried(self):
+		from unittest.mock import patch
+
+		from buzz.ticketing.doctype.event_ticket.event_ticket import run_ticket_side_effect
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{"doctype": "Event Ticket Type", "event": test_event.name, "title": "Retried", "price": 0}
+		).insert()
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"event": test_event.name,
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "John Doe",
+				"attendee_email": "john@email.com",
+			}
+		).insert()
+		ticket.submit()
+
+		with (
+			patch.object(frappe.db, "commit"),
+			patch.object(frappe.db, "rollback"),
+			patch.object(frappe, "sendmail", side_effect=[frappe.OutgoingEmailError, None]) as sendmail,
+			patch.object(frappe, "enqueue") as enqueue,
+		):
+			run_ticket_side_effect(ticket.name, "send_ticket_email")
+
+			# the retry must not share the job id of the attempt still running, or it is deduplicated away
+			retry = enqueue.call_args.kwargs
+			self.assertEqual(retry["attempt"], 2)
+			self.assertEqual(retry["job_id"], f"send_ticket_email:{ticket.name}:2")
+			self.assertFalse(frappe.db.get_value("Event Ticket", ticket.name, "ticket_email_sent"))
+
+			run_ticket_side_effect(ticket.name, "send_ticket_email", attempt=retry["attempt"])
+
+		self.assertEqual(sendmail.call_count, 2)
+		self.assertTrue(frappe.db.get_value("Event Ticket", ticket.name, "ticket_email_sent"))
+
+	def test_qr_code_token(self):
+		from buzz.ticketing.doctype.event_ticket.event_ticket import get_ticket_from_token, make_ticket_token
+
+		token = make_ticket_token("T001")
+		self.assertEqual(get_ticket_from_token(token), "T001")
+
+		# the signature does not verify for another ticket
+		self.assertIsNone(get_ticket_from_token(token.replace("T001", "T002")))
+		self.assertIsNone(get_ticket_from_token("T001"))
@@ -0,0 +1,124 @@
+# Copyright (c) 2026, BWH Studios and contributors
+# For license information, please see license.txt
+
+from collections import Counter
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_to_date, now_datetime
+
+from buzz.ticketing.doctype.event_ticket_type.event_ticket_type import update_tickets_reserved
+
+DEFAULT_HOLD_MINUTES = 15
+EXPIRY_BATCH_SIZE = 5000
+
+
+class EventTicketHold(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		booking: DF.Link
+		event: DF.Link | None
+		expires_at: DF.Datetime
+		quantity: DF.Int
+		ticket_type: DF.Link
+	# end: auto-generated types
+
+	pass
+
+
+def hold_tickets_for_booking(booking: Document) -> None:
+	"""Reserve inventory for a booking that is awaiting payment.
+
+	Each ticket type's reserved counter is moved conditionally, so this throws
+	(and the booking insert rolls back) if the tickets are no longer available.
+	"""
+	hold_minutes = frappe.get_cached_doc("Buzz Settings").ticket_hold_minutes or DEFAULT_HOLD_MINUTES
+	expires_at = add_to_date(now_datetime(), minutes=hold_minutes)
+
+	quantity_by_ticket_type = Counter(attendee.ticket_type for attendee in booking.attendees)
+	for ticket_type, quantity in quantity_by_ticket_type.items():
+		update_tickets_reserved(ticket_type, quantity)
+		frappe.get_doc(
+			{
+				"doctype": "Event Ticket Hold",
+				"booking": booking.name,
+				"event": booking.event,
+				"ticket_type": ticket_type,
+				"quantity": quantity,
+				"expires_at": expires_at,
+			}
+		).insert(ignore_permissions=True)
+
+
+def release_holds_for_booking(booking: str) -> Counter:
+	"""Give back a booking's held inventory, returns the released quantity by ticket type.
+
+	Called when the booking is paid (the tickets then count as sold instead),
+	cancelled or deleted. A hold that has already expired is simply not found.
+	"""
+	holds = frappe.db.get_all(
+		"Event Ticket Hold",
+		filters={"booking": booking},
+		fields=["name", "ticket_type", "quantity"],
+		for_update=True,
+	)
+	return release_holds(holds)
+
+
+def expire_ticket_holds() -> None:
+	"""Release every hold past its expiry, committing after each batch."""
+	while expire_ticket_holds_batch() == EXPIRY_BATCH_SIZE:
+		frappe.db.commit()
+	frappe.db.commit()
+
+
+def expire_ticket_holds_batch() -> int:
+	"""Release up to `EXPIRY_BATCH_SIZE` expired holds in one set-based pass.
+
+	Holds are locked, deleted in one statement and the reserved counters are moved
+	once per ticket type, so the cost depends on the number of ticket types
+	involved rather than on the number of holds.
+	"""
+	holds = frappe.db.get_all(
+		"Event Ticket Hold",
+		filters={"expires_at": ("<", now_datetime())},
+		fields=["name", "ticket_type", "quantity"],
+		order_by="expires_at asc",
+		limit=EXPIRY_BATCH_SIZE,
+		for_update=True,
+	)
+	release_holds(holds)
+	return len(holds)
+
+
+def release_holds(holds: list[dict]) -> Counter:
+	released = Counter()
+	if not holds:
+		return released
+
+	for hold in holds:
+		released[hold.ticket_type] += hold.quantity
+
+	frappe.db.delete("Event Ticket Hold", {"name": ("in", [hold.name for hold in holds])})
+	for ticket_type, quantity in released.items():
+		update_tickets_reserved(ticket_type, -quantity)
+
+	return released
+
+
+def get_held_quantity_by_ticket_type(booking: str) -> dict[str, int]:
+	return {
+		str(row.ticket_type): row.quantity
+		for row in frappe.db.get_all(
+			"Event Ticket Hold",
+			filters={"booking": booking},
+			fields=["ticket_type", {"SUM": "quantity", "as": "quantity"}],
+			group_by="ticket_type",
+		)
+	}
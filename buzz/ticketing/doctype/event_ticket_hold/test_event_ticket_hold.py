@@ -0,0 +1,71 @@
+# Copyright (c) 2026, BWH Studios and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from buzz.ticketing.doctype.event_ticket_hold.event_ticket_hold import expire_ticket_holds_batch
+from buzz.ticketing.doctype.event_ticket_type.event_ticket_type import INVENTORY_COUNTERS
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class IntegrationTestEventTicketHold(IntegrationTestCase):
+	"""
+	Integration tests for EventTicketHold.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def test_booking_holds_tickets_until_expiry(self):
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{
+				"doctype": "Event Ticket Type",
+				"event": test_event.name,
+				"title": "Last Seat",
+				"price": 500,
+				"is_published": True,
+				"max_tickets_available": 1,
+			}
+		).insert()
+
+		def make_booking():
+			return frappe.get_doc(
+				{
+					"doctype": "Event Booking",
+					"event": test_event.name,
+					"user": frappe.session.user,
+					"attendees": [
+						{"ticket_type": test_ticket_type.name, "full_name": "John", "email": "john@email.com"}
+					],
+				}
+			).insert()
+
+		held_booking = make_booking()
+		self.assertEqual(test_ticket_type.remaining_tickets, 0)
+
+		# the only ticket is held by an unpaid booking
+		with self.assertRaises(frappe.ValidationError):
+			make_booking()
+
+		frappe.db.set_value(
+			"Event Ticket Hold",
+			{"booking": held_booking.name},
+			"expires_at",
+			add_to_date(now_datetime(), minutes=-1),
+		)
+		expire_ticket_holds_batch()
+		self.assertEqual(test_ticket_type.remaining_tickets, 1)
+		self.assertFalse(frappe.db.exists("Event Ticket Hold", {"booking": held_booking.name}))
+
+		# paying for a held booking turns the hold into a sale
+		paid_booking = make_booking()
+		paid_booking.submit()
+		self.assertEqual(
+			frappe.db.get_value("Event Ticket Type", test_ticket_type.name, INVENTORY_COUNTERS), (1, 0)
+		)
@@ -1,8 +1,16 @@
 # Copyright (c) 2025, BWH Studios and contributors
 # For license information, please see license.txt
 
+from collections import Counter
+
 import frappe
+from frappe import _
 from frappe.model.document import Document
+from frappe.utils import cint
+
+from buzz.ticket_availability import notify_ticket_availability_change
+
+INVENTORY_COUNTERS = ("tickets_sold", "tickets_reserved")
 
 
 class EventTicketType(Document):
@@ -21,22 +29,156 @@ class EventTicketType(Document):
 		max_tickets_available: DF.Int
 		name: DF.Int | None
 		price: DF.Currency
+		tickets_reserved: DF.Int
+		tickets_sold: DF.Int
 		title: DF.Data
 	# end: auto-generated types
 
+	def before_save(self):
+		self.preserve_inventory_counters()
+
+	def preserve_inventory_counters(self):
+		"""The counters are owned by tickets and holds, a form save must never overwrite them."""
+		if self.is_new():
+			self.tickets_sold = self.tickets_reserved = 0
+			return
+
+		self.tickets_sold, self.tickets_reserved = frappe.db.get_value(
+			self.doctype, self.name, INVENTORY_COUNTERS, for_update=True
+		)
+
 	def are_tickets_available(self, num_tickets: int) -> bool:
-		if self.remaining_tickets != -1 and self.remaining_tickets < num_tickets:
+		remaining_tickets = self.remaining_tickets
+		if remaining_tickets != -1 and remaining_tickets < num_tickets:
 			return False
 		return True
 
-	@property
-	def tickets_sold(self) -> int:
-		"""Returns the number of tickets sold for this ticket type."""
-		return frappe.db.count("Event Ticket", {"ticket_type": self.name, "docstatus": 1})
-
 	@property
 	def remaining_tickets(self) -> int:
 		"""Returns -1 if no limit, otherwise the number of remaining tickets."""
-		if not self.max_tickets_available:
-			return -1
-		return self.max_tickets_available - self.tickets_sold
+		return get_remaining_tickets(self.name)
+
+
+def get_remaining_tickets(ticket_type: str | int) -> int:
+	"""Returns -1 if no limit, otherwise the number of tickets neither sold nor held.
+
+	Reads the maintained counters straight from the row (not the document cache),
+	so this is a single primary key lookup no matter how many tickets are sold.
+	"""
+	max_tickets_available, tickets_sold, tickets_reserved = frappe.db.get_value(
+		"Event Ticket Type", ticket_type, ["max_tickets_available", *INVENTORY_COUNTERS]
+	)
+	if not max_tickets_available:
+		return -1
+	return max(max_tickets_available - cint(tickets_sold) - cint(tickets_reserved), 0)
+
+
+def update_tickets_sold(ticket_type: str | int, delta: int):
+	"""Atomically move the sold counter of a ticket type by `delta`."""
+	update_inventory_counter(ticket_type, "tickets_sold", delta)
+
+
+def update_tickets_reserved(ticket_type: str | int, delta: int):
+	"""Atomically move the reserved (held, awaiting payment) counter of a ticket type by `delta`."""
+	update_inventory_counter(ticket_type, "tickets_reserved", delta)
+
+
+def update_inventory_counter(ticket_type: str | int, counter: str, delta: int):
+	"""Increments are conditional on the limit in the same statement, so two
+	concurrent bookings can never both take the last ticket. The row stays locked
+	until the surrounding transaction commits or rolls back.
+	"""
+	ett = frappe.qb.DocType("Event Ticket Type")
+	field = ett[counter]
+	query = frappe.qb.update(ett).set(field, field + delta).where(ett.name == ticket_type)
+
+	if delta > 0:
+		query = query.where(
+			(ett.max_tickets_available == 0)
+			| (ett.tickets_sold + ett.tickets_reserved + delta <= ett.max_tickets_available)
+		)
+	else:
+		query = query.where(field + delta >= 0)
+
+	query.run()
+
+	if not frappe.db._cursor.rowcount:
+		if delta > 0:
+			title = frappe.get_cached_value("Event Ticket Type", ticket_type, "title")
+			frappe.throw(_("{0} tickets are sold out!").format(title or ticket_type))
+		return
+
+	notify_ticket_availability_change(frappe.get_cached_value("Event Ticket Type", ticket_type, "event"))
+
+
+def reconcile_ticket_counters(ticket_type: str | int | None = None):
+	"""Rebuild the sold and reserved counters from submitted Event Tickets and live holds.
+
+	Grouped queries find the drifted ticket types, which are then locked and
+	recounted one by one so that concurrent bookings are not overwritten.
+	"""
+	filters = {"ticket_type": ticket_type} if ticket_type else {}
+
+	sold_by_type = get_tickets_sold_by_ticket_type(filters)
+	reserved_by_type = get_quantity_by_ticket_type(
+		"Event Ticket Hold", filters, {"SUM": "quantity", "as": "quantity"}
+	)
+
+	ticket_types = frappe.db.get_all(
+		"Event Ticket Type",
+		filters={"name": ticket_type} if ticket_type else {},
+		fields=["name", "event", *INVENTORY_COUNTERS],
+	)
+	for tt in ticket_types:
+		counted = (sold_by_type.get(str(tt.name), 0), reserved_by_type.get(str(tt.name), 0))
+		if (cint(tt.tickets_sold), cint(tt.tickets_reserved)) == counted:
+			continue
+
+		frappe.db.get_value("Event Ticket Type", tt.name, "name", for_update=True)
+		tickets_sold = get_tickets_sold_by_ticket_type({"ticket_type": tt.name}).get(str(tt.name), 0)
+		tickets_reserved = get_quantity_by_ticket_type(
+			"Event Ticket Hold", {"ticket_type": tt.name}, {"SUM": "quantity", "as": "quantity"}
+		).get(str(tt.name), 0)
+		frappe.db.set_value(
+			"Event Ticket Type",
+			tt.name,
+			{"tickets_sold": tickets_sold, "tickets_reserved": tickets_reserved},
+			update_modified=False,
+		)
+		notify_ticket_availability_change(tt.event)
+
+
+def get_tickets_sold_by_ticket_type(filters: dict) -> dict[str, int]:
+	"""Submitted tickets, plus the attendees of submitted group bookings whose tickets are yet to be generated."""
+	count = {"COUNT": "*", "as": "quantity"}
+	tickets_sold = Counter(get_quantity_by_ticket_type("Event Ticket", {**filters, "docstatus": 1}, count))
+
+	pending_bookings = frappe.db.get_all(
+		"Event Booking",
+		filters={"docstatus": 1, "ticket_generation_status": ("in", ("Queued", "In Progress", "Failed"))},
+		pluck="name",
+	)
+	if pending_bookings:
+		tickets_sold.update(
+			get_quantity_by_ticket_type(
+				"Event Booking Attendee",
+				{**filters, "parenttype": "Event Booking", "parent": ("in", pending_bookings)},
+				count,
+			)
+		)
+		tickets_sold.subtract(
+			get_quantity_by_ticket_type(
+				"Event Ticket", {**filters, "docstatus": 1, "booking": ("in", pending_bookings)}, count
+			)
+		)
+
+	return dict(tickets_sold)
+
+
+def get_quantity_by_ticket_type(doctype: str, filters: dict, aggregate: dict) -> dict[str, int]:
+	return {
+		str(row.ticket_type): cint(row.quantity)
+		for row in frappe.db.get_all(
+			doctype, filters=filters, fields=["ticket_type", aggregate], group_by="ticket_type"
+		)
+	}
@@ -1,9 +1,13 @@
 # Copyright (c) 2025, BWH Studios and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
+import frappe
 from frappe.tests import IntegrationTestCase
 
+from buzz.ticketing.doctype.event_ticket_type.event_ticket_type import reconcile_ticket_counters
+
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
 # Use these module variables to add/remove to/from that list
@@ -17,4 +21,87 @@ class IntegrationTestEventTicketType(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def test_tickets_sold_counter(self):
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		test_ticket_type = frappe.get_doc(
+			{
+				"doctype": "Event Ticket Type",
+				"event": test_event.name,
+				"title": "Limited",
+				"is_published": True,
+				"max_tickets_available": 1,
+			}
+		).insert()
+
+		ticket = frappe.get_doc(
+			{
+				"doctype": "Event Ticket",
+				"ticket_type": test_ticket_type.name,
+				"attendee_name": "John Doe",
+				"attendee_email": "john@email.com",
+			}
+		).insert()
+		ticket.submit()
+		self.assertEqual(frappe.db.get_value("Event Ticket Type", test_ticket_type.name, "tickets_sold"), 1)
+		self.assertEqual(test_ticket_type.remaining_tickets, 0)
+
+		# limit reached, the counter refuses to oversell
+		with self.assertRaises(frappe.ValidationError):
+			frappe.get_doc(
+				{
+					"doctype": "Event Ticket",
+					"ticket_type": test_ticket_type.name,
+					"attendee_name": "Jenny Doe",
+					"attendee_email": "jenny@email.com",
+				}
+			).insert().submit()
+
+		# saving the form does not clobber the counter
+		test_ticket_type.reload()
+		test_ticket_type.tickets_sold = 0
+		test_ticket_type.save()
+		self.assertEqual(test_ticket_type.tickets_sold, 1)
+
+		ticket.cancel()
+		self.assertEqual(frappe.db.get_value("Event Ticket Type", test_ticket_type.name, "tickets_sold"), 0)
+
+		# drifted counter is rebuilt from submitted tickets, and the event's booking page is told
+		frappe.db.set_value("Event Ticket Type", test_ticket_type.name, "tickets_sold", 5)
+		with patch(
+			"buzz.ticketing.doctype.event_ticket_type.event_ticket_type.notify_ticket_availability_change"
+		) as notify_ticket_availability_change:
+			reconcile_ticket_counters(test_ticket_type.name)
+		self.assertEqual(frappe.db.get_value("Event Ticket Type", test_ticket_type.name, "tickets_sold"), 0)
+		notify_ticket_availability_change.assert_called_once()
+		self.assertEqual(str(notify_ticket_availability_change.call_args.args[0]), str(test_event.name))
+
+	def test_availability_change_while_broadcast_stops(self):
+		from buzz import ticket_availability
+
+		test_event = frappe.get_doc("Buzz Event", {"route": "test-route"})
+		running_key = ticket_availability.get_running_key(test_event.name)
+		delete = frappe.cache.delete
+		marked = []
+
+		def mark_while_stopping(key, *args):
+			# a sale commits just as the job is about to stop, while it still counts as running
+			if key == running_key and not marked:
+				marked.append(key)
+				ticket_availability.mark_availability_changed(test_event.name)
+			return delete(key, *args)
+
+		with (
+			patch.object(frappe, "enqueue") as enqueue,
+			patch.object(frappe, "publish_realtime") as publish_realtime,
+			patch.object(ticket_availability.time, "sleep"),
+		):
+			ticket_availability.mark_availability_changed(test_event.name)
+			self.assertEqual(enqueue.call_count, 1)
+
+			with patch.object(frappe.cache, "delete", side_effect=mark_while_stopping):
+				ticket_availability.broadcast_ticket_availability(test_event.name)
+
+			# the change was broadcast by the running job instead of being lost
+			self.assertEqual(enqueue.call_count, 1)
+			self.assertEqual(publish_realtime.call_count, 2)
+			self.assertFalse(frappe.cache.get(running_key))
@@ -1,8 +1,16 @@
+import base64
 import functools
+import hashlib
+import hmac
+import json
 from collections.abc import Callable
 
 import frappe
 from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+from frappe.query_builder import Order
+from frappe.utils import cint
+
+MAX_PAGE_LENGTH = 100
 
 
 def only_if_app_installed(app_name: str, raise_exception: bool = False) -> Callable:
@@ -32,6 +40,96 @@ def only_if_app_installed(app_name: str, raise_exception: bool = False) -> Calla
 	return decorator
 
 
+def paginate_by_keyset(
+	query, table, page_length: int, after_creation: str | None = None, after_name: str | None = None
+) -> list[dict]:
+	"""
+	Page of `query` in newest first (creation, name) order, starting after the row the previous page ended at.
+
+	Seeking past the last row shown instead of skipping an offset keeps every page as fast as the first.
+
+	:param query: Query builder query selecting from `table`.
+	:param table: Table whose `creation` and `name` order the rows.
+	:param page_length: Rows per page, at most `MAX_PAGE_LENGTH`.
+	:param after_creation: `creation` of the last row of the previous page, empty for the first page.
+	:param after_name: `name` of the last row of the previous page.
+	"""
+	if after_creation:
+		query = query.where(
+			(table.creation < after_creation)
+			| ((table.creation == after_creation) & (table.name < after_name))
+		)
+
+	return (
+		query.orderby(table.creation, order=Order.desc)
+		.orderby(table.name, order=Order.desc)
+		.limit(min(cint(page_length) or MAX_PAGE_LENGTH, MAX_PAGE_LENGTH))
+	).run(as_dict=True)
+
+
+def sign_payload(payload: dict, purpose: str) -> str:
+	"""
+	Serialize `payload` into a compact, URL-safe token signed with the site's encryption key.
+
+	:param payload: JSON serializable data to sign.
+	:param purpose: What the token is for, a token signed for one purpose never verifies for another.
+	:return: `<base64 payload>.<base64 signature>`
+	"""
+	body = urlsafe_b64encode(json.dumps(payload, separators=(",", ":"), default=str).encode())
+	return f"{body}.{urlsafe_b64encode(_get_signature(body, purpose))}"
+
+
+def get_signed_payload(token: str | None, purpose: str) -> dict | None:
+	"""Returns the payload of a token created by `sign_payload`, or None if it was tampered with."""
+	if not token or "." not in token:
+		return None
+
+	body, signature = token.rsplit(".", 1)
+	if not hmac.compare_digest(urlsafe_b64encode(_get_signature(body, purpose)), signature):
+		return None
+
+	try:
+		return json.loads(urlsafe_b64decode(body))
+	except ValueError:
+		return None
+
+
+def sign_value(value: str, purpose: str) -> str:
+	"""
+	Compact variant of `sign_payload` for a single string, e.g. a document name to encode in a QR code.
+
+	The signature is truncated to 128 bits, which keeps the token short while
+	still being infeasible to forge.
+	"""
+	return f"{value}.{urlsafe_b64encode(_get_signature(value, purpose)[:16])}"
+
+
+def get_signed_value(token: str | None, purpose: str) -> str | None:
+	"""Returns the value of a token created by `sign_value`, or None if it was tampered with."""
+	if not token or "." not in token:
+		return None
+
+	value, signature = token.rsplit(".", 1)
+	if not hmac.compare_digest(urlsafe_b64encode(_get_signature(value, purpose)[:16]), signature):
+		return None
+
+	return value
+
+
+def _get_signature(body: str, purpose: str) -> bytes:
+	from frappe.utils.password import get_encryption_key
+
+	return hmac.new(get_encryption_key().encode(), f"{purpose}:{body}".encode(), hashlib.sha256).digest()
+
+
+def urlsafe_b64encode(data: bytes) -> str:
+	return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def urlsafe_b64decode(data: str) -> bytes:
+	return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
 def add_buzz_user_role(doc, event=None):
 	doc.add_roles("Buzz User")
 
@@ -0,0 +1,146 @@
+"""
+Admission-controlled waiting room in front of the booking flow of high-demand events.
+
+Buyers take a numbered place in a per-event queue kept in Redis. Every minute a
+scheduled job moves the admission front forward by the event's configured rate
+and broadcasts it to the event's realtime room, so each buyer can work out their
+own place in line without polling. Admitted buyers get a short-lived signed
+admission token, which `buzz.api.process_booking` requires.
+"""
+
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from buzz.utils import get_signed_payload, sign_payload
+
+ADMISSION_TOKEN_PURPOSE = "waiting-room-admission"
+ADMISSION_TOKEN_MINUTES = 20
+DEFAULT_ADMISSIONS_PER_MINUTE = 100
+QUEUE_EXPIRY_SECONDS = 6 * 60 * 60
+REALTIME_EVENT = "buzz_waiting_room"
+
+
+def is_waiting_room_enabled(event: str | int) -> bool:
+	return bool(frappe.get_cached_value("Buzz Event", event, "enable_waiting_room"))
+
+
+def get_admissions_per_minute(event: str | int) -> int:
+	return (
+		cint(frappe.get_cached_value("Buzz Event", event, "waiting_room_admissions_per_minute"))
+		or DEFAULT_ADMISSIONS_PER_MINUTE
+	)
+
+
+def get_waiting_room_status(event: str | int, user: str) -> dict:
+	"""Place `user` in the queue (once) and return where they stand.
+
+	`admission_token` is only present once the user has been admitted.
+	"""
+	position = join_queue(event, user)
+	admitted_until = get_admitted_until(event)
+
+	status = {
+		"event": event,
+		"position": position,
+		"admitted_until": admitted_until,
+		"people_ahead": max(position - admitted_until, 0),
+		"admissions_per_minute": get_admissions_per_minute(event),
+		"admission_token": None,
+	}
+
+	if position <= admitted_until:
+		status["admission_token"] = make_admission_token(event, user)
+
+	return status
+
+
+def join_queue(event: str | int, user: str) -> int:
+	"""Returns the user's place in line, taking the next one if they are not queued yet."""
+	user_key = get_queue_key(event, f"user:{user}")
+	position = frappe.cache.get(user_key)
+	if position is not None:
+		return cint(position)
+
+	# the first admission round is open right away, later ones are let in by `admit_waiting_buyers`
+	frappe.cache.set(
+		get_queue_key(event, "admitted_until"),
+		get_admissions_per_minute(event),
+		ex=QUEUE_EXPIRY_SECONDS,
+		nx=True,
+	)
+
+	position = frappe.cache.incr(get_queue_key(event, "last_position"))
+	frappe.cache.expire(get_queue_key(event, "last_position"), QUEUE_EXPIRY_SECONDS)
+	if not frappe.cache.set(user_key, position, ex=QUEUE_EXPIRY_SECONDS, nx=True):
+		# joined concurrently from another tab, keep the first place taken
+		position = frappe.cache.get(user_key)
+
+	return cint(position)
+
+
+def get_admitted_until(event: str | int) -> int:
+	return cint(frappe.cache.get(get_queue_key(event, "admitted_until")))
+
+
+def admit_waiting_buyers():
+	"""Move the admission front of every active waiting room by its per-minute rate.
+
+	The front never runs more than one round ahead of the last buyer in line, so
+	a quiet period does not bank admissions that a sudden rush could then use up.
+	"""
+	events = frappe.db.get_all(
+		"Buzz Event",
+		filters={"enable_waiting_room": 1, "is_published": 1},
+		fields=["name", "waiting_room_admissions_per_minute"],
+	)
+
+	for event in events:
+		last_position = frappe.cache.get(get_queue_key(event.name, "last_position"))
+		if last_position is None:
+			continue
+
+		admissions_per_minute = (
+			cint(event.waiting_room_admissions_per_minute) or DEFAULT_ADMISSIONS_PER_MINUTE
+		)
+		admitted_until = min(
+			get_admitted_until(event.name) + admissions_per_minute,
+			cint(last_position) + admissions_per_minute,
+		)
+		frappe.cache.set(get_queue_key(event.name, "admitted_until"), admitted_until, ex=QUEUE_EXPIRY_SECONDS)
+
+		frappe.publish_realtime(
+			REALTIME_EVENT,
+			{"event": event.name, "admitted_until": admitted_until, "last_position": cint(last_position)},
+			doctype="Buzz Event",
+			docname=event.name,
+		)
+
+
+def make_admission_token(event: str | int, user: str) -> str:
+	return sign_payload(
+		{"event": str(event), "user": user, "exp": int(time.time()) + ADMISSION_TOKEN_MINUTES * 60},
+		ADMISSION_TOKEN_PURPOSE,
+	)
+
+
+def validate_admission_token(event: str | int, token: str | None):
+	payload = get_signed_payload(token, ADMISSION_TOKEN_PURPOSE)
+
+	if (
+		not payload
+		or payload.get("event") != str(event)
+		or payload.get("user") != frappe.session.user
+		or cint(payload.get("exp")) < time.time()
+	):
+		frappe.throw(
+			_("Your turn in the waiting room has expired or is missing, please rejoin the queue."),
+			frappe.PermissionError,
+			title=_("Waiting Room"),
+		)
+
+
+def get_queue_key(event: str | int, name: str) -> str:
+	return frappe.cache.make_key(f"buzz:waiting_room:{event}:{name}")
@@ -0,0 +1,46 @@
+import { createResource } from "frappe-ui";
+import { ref } from "vue";
+
+const PAGE_LENGTH = 20;
+
+/**
+ * Composable for lists loaded a page at a time from a keyset paginated endpoint
+ * Each page starts after the (creation, name) of the last row loaded,
+ * so deep pages load as fast as the first
+ * @param {string} url - Whitelisted method returning a page of rows, newest first
+ * @param {Function} transform - Maps each row for display
+ */
+export function useKeysetList(url, transform = (row) => row) {
+	const rows = ref([]);
+	const hasMore = ref(false);
+
+	const page = createResource({
+		url,
+		makeParams: ({ after } = {}) => ({
+			page_length: PAGE_LENGTH,
+			after_creation: after?.creation,
+			after_name: after?.name,
+		}),
+		auto: true,
+		onSuccess(data) {
+			rows.value = [...rows.value, ...data.map(transform)];
+			hasMore.value = data.length === PAGE_LENGTH;
+		},
+		onError: console.error,
+	});
+
+	/**
+	 * Load the page after the last row loaded
+	 */
+	const loadMore = () => {
+		const last = rows.value[rows.value.length - 1];
+		page.submit({ after: { creation: last.creation, name: last.name } });
+	};
+
+	return {
+		rows,
+		hasMore,
+		page,
+		loadMore,
+	};
+}
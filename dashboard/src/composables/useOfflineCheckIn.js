@@ -0,0 +1,274 @@
+import { call } from "frappe-ui";
+import { computed, ref } from "vue";
+
+const SYNC_INTERVAL_MS = 30 * 1000;
+
+const eventName = ref(null);
+const publicKey = ref(null);
+const revokedTickets = ref(new Set());
+const checkedInTickets = ref(new Set());
+// tickets scanned out today, they check in again as a re-entry
+const leftTickets = ref(new Set());
+const queue = ref([]);
+const isSyncing = ref(false);
+// the entrance this device scans at, counted per gate in the live arrivals view
+const gate = ref(localStorage.getItem("buzz:check-in:gate") || "");
+
+let syncTimer = null;
+
+// tickets check in once a day
+const checkedInKey = () => `checked-in:${new Date().toLocaleDateString("en-CA")}`;
+const leftKey = () => `left:${new Date().toLocaleDateString("en-CA")}`;
+
+const storageKey = (name) => `buzz:check-in:${name}:${eventName.value}`;
+
+const loadStored = (name, fallback) => {
+	try {
+		return JSON.parse(localStorage.getItem(storageKey(name))) ?? fallback;
+	} catch {
+		return fallback;
+	}
+};
+
+const store = (name, value) => {
+	localStorage.setItem(storageKey(name), JSON.stringify(value));
+};
+
+/**
+ * Drop the checked-in and left tickets of earlier days, only today's decide who may enter
+ */
+const clearEarlierDays = () => {
+	const current = [storageKey(checkedInKey()), storageKey(leftKey())];
+	for (const key of Object.keys(localStorage)) {
+		const isDaily = ["checked-in:", "left:"].some((name) =>
+			key.startsWith(`buzz:check-in:${name}`)
+		);
+		if (isDaily && key.endsWith(`:${eventName.value}`) && !current.includes(key)) {
+			localStorage.removeItem(key);
+		}
+	}
+};
+
+const base64ToBytes = (base64) => {
+	const normalized = base64.replace(/-/g, "+").replace(/_/g, "/");
+	const padded = normalized + "=".repeat((4 - (normalized.length % 4)) % 4);
+	return Uint8Array.from(atob(padded), (c) => c.charCodeAt(0));
+};
+
+const importPublicKey = (spkiBase64) =>
+	crypto.subtle.importKey(
+		"spki",
+		base64ToBytes(spkiBase64),
+		{ name: "ECDSA", namedCurve: "P-256" },
+		false,
+		["verify"]
+	);
+
+/**
+ * Check-in tokens are `<ticket>.<event>.<signature>`, see `buzz.check_in_tokens`
+ */
+export const isCheckInToken = (data) => typeof data === "string" && data.split(".").length === 3;
+
+/**
+ * Download (or, without a network, restore) the event's public key and revoked tickets
+ */
+const prepare = async (name) => {
+	eventName.value = String(name);
+	queue.value = loadStored("queue", []);
+	clearEarlierDays();
+	checkedInTickets.value = new Set(loadStored(checkedInKey(), []));
+	leftTickets.value = new Set(loadStored(leftKey(), []));
+
+	let data = null;
+	try {
+		data = await call("buzz.api.get_offline_check_in_data", { event: name });
+		store("verification-data", data);
+	} catch {
+		data = loadStored("verification-data", null);
+	}
+
+	if (!data?.public_key) {
+		publicKey.value = null;
+		return;
+	}
+
+	publicKey.value = await importPublicKey(data.public_key);
+	revokedTickets.value = new Set(data.revoked_tickets);
+
+	window.addEventListener("online", syncWithServer);
+	clearInterval(syncTimer);
+	syncTimer = setInterval(syncWithServer, SYNC_INTERVAL_MS);
+	sync();
+};
+
+/**
+ * Download the revoked tickets again, so that tickets cancelled after `prepare` are turned away too
+ */
+const refreshRevokedTickets = async () => {
+	const event = eventName.value;
+	if (!event || !navigator.onLine) return;
+
+	try {
+		const data = await call("buzz.api.get_offline_check_in_data", { event });
+		// the device moved to another event while downloading
+		if (event !== eventName.value) return;
+
+		store("verification-data", data);
+		revokedTickets.value = new Set(data.revoked_tickets);
+	} catch {
+		// the revoked tickets downloaded earlier are kept
+	}
+};
+
+const syncWithServer = () => {
+	refreshRevokedTickets();
+	sync();
+};
+
+const setGate = (value) => {
+	gate.value = value.trim();
+	localStorage.setItem("buzz:check-in:gate", gate.value);
+};
+
+const stop = () => {
+	window.removeEventListener("online", syncWithServer);
+	clearInterval(syncTimer);
+	syncTimer = null;
+	publicKey.value = null;
+	eventName.value = null;
+};
+
+/**
+ * Verify a scanned check-in token on the device and queue the check-in
+ *
+ * @returns {Promise<{ok: boolean, ticket: string|null, reason: string|null}>}
+ */
+const checkIn = async (token) => {
+	const [ticket, event, signature] = token.split(".");
+
+	if (event !== eventName.value) {
+		return { ok: false, ticket, reason: __("This ticket is for another event") };
+	}
+
+	let isGenuine = false;
+	try {
+		isGenuine = await crypto.subtle.verify(
+			{ name: "ECDSA", hash: "SHA-256" },
+			publicKey.value,
+			base64ToBytes(signature),
+			new TextEncoder().encode(`${ticket}.${event}`)
+		);
+	} catch {
+		isGenuine = false;
+	}
+
+	if (!isGenuine) {
+		return { ok: false, ticket: null, reason: __("Invalid QR code") };
+	}
+	if (revokedTickets.value.has(ticket)) {
+		return {
+			ok: false,
+			ticket,
+			reason: __("This ticket has been cancelled and cannot be checked in"),
+		};
+	}
+	if (checkedInTickets.value.has(ticket)) {
+		return { ok: false, ticket, reason: __("This ticket was already checked in today.") };
+	}
+
+	const reEntry = leftTickets.value.delete(ticket);
+	store(leftKey(), [...leftTickets.value]);
+	checkedInTickets.value.add(ticket);
+	store(checkedInKey(), [...checkedInTickets.value]);
+
+	queue.value.push({
+		ticket,
+		token,
+		scanned_at: new Date().toISOString(),
+		gate: gate.value,
+		re_entry: reEntry,
+	});
+	store("queue", queue.value);
+	sync();
+
+	return { ok: true, ticket, reEntry, reason: null };
+};
+
+/**
+ * Record a ticket checked in by the server, so that the device does not let it in twice
+ */
+const markCheckedIn = (ticket) => {
+	if (!eventName.value) return;
+
+	leftTickets.value.delete(ticket);
+	store(leftKey(), [...leftTickets.value]);
+	checkedInTickets.value.add(ticket);
+	store(checkedInKey(), [...checkedInTickets.value]);
+};
+
+/**
+ * Record a ticket scanned out of the venue, so that it can check in again today
+ */
+const markCheckedOut = (ticket) => {
+	if (!eventName.value) return;
+
+	checkedInTickets.value.delete(ticket);
+	store(checkedInKey(), [...checkedInTickets.value]);
+	leftTickets.value.add(ticket);
+	store(leftKey(), [...leftTickets.value]);
+};
+
+const hasLeft = (token) => leftTickets.value.has(token.split(".")[0]);
+
+/**
+ * Send queued check-ins to the server in one batch, keeping them if it can not be reached
+ */
+const sync = async () => {
+	if (isSyncing.value || !queue.value.length || !navigator.onLine) return;
+
+	isSyncing.value = true;
+	const pending = [...queue.value];
+
+	try {
+		// every scan gets a final result (accepted, duplicate, cancelled or unknown), none is retried
+		await call("buzz.api.sync_check_ins", {
+			event: eventName.value,
+			scans: pending.map(({ token, scanned_at, gate, re_entry }) => ({
+				token,
+				scanned_at,
+				gate,
+				re_entry,
+			})),
+		});
+
+		// scans queued while syncing stay in the queue
+		queue.value = queue.value.slice(pending.length);
+		store("queue", queue.value);
+	} catch (error) {
+		console.error("Failed to sync check-ins:", error);
+	} finally {
+		isSyncing.value = false;
+	}
+};
+
+/**
+ * Composable for scanning tickets without depending on the network
+ * Tickets are verified on the device against the event's public key and revoked tickets,
+ * check-ins are queued in local storage and synced in the background
+ */
+export function useOfflineCheckIn() {
+	return {
+		isReady: computed(() => Boolean(publicKey.value)),
+		pendingSyncCount: computed(() => queue.value.length),
+		isSyncing,
+		gate,
+		setGate,
+		prepare,
+		stop,
+		checkIn,
+		markCheckedIn,
+		markCheckedOut,
+		hasLeft,
+		sync,
+	};
+}
@@ -2,6 +2,7 @@ import { createResource, toast } from "frappe-ui";
 import { ref } from "vue";
 import beepFailSound from "../assets/audio/beep-fail.wav";
 import beepSound from "../assets/audio/beep.wav";
+import { isCheckInToken, useOfflineCheckIn } from "./useOfflineCheckIn.js";
 
 let ticketValidationState = null;
 
@@ -9,6 +10,11 @@ const isProcessingTicket = ref(false);
 const isCheckingIn = ref(false);
 const validationResult = ref(null);
 const showTicketModal = ref(false);
+// doors that scan people out as well keep a live occupancy, see `buzz.occupancy`
+const direction = ref("In");
+const occupancy = ref(null);
+// the schedule item being checked in to, instead of the event itself
+const session = ref(null);
 
 let lastToastMessage = null;
 let lastToastTime = 0;
@@ -39,6 +45,20 @@ const showDebouncedToast = (message, type = "error") => {
 	}
 };
 
+const updateOccupancy = (data) => {
+	if (!data?.occupancy) return;
+
+	occupancy.value = data.occupancy;
+	if (data.occupancy.is_near_limit) {
+		showDebouncedToast(
+			__("The venue is nearly full: {0} of {1} inside", [
+				data.occupancy.current,
+				data.occupancy.limit,
+			])
+		);
+	}
+};
+
 // Ticket validation resource
 const validateTicketResource = createResource({
 	url: "buzz.api.validate_ticket_for_checkin",
@@ -77,28 +97,112 @@ const checkInResource = createResource({
 		validationResult.value = data;
 		showTicketModal.value = false;
 		isCheckingIn.value = false;
+		useOfflineCheckIn().markCheckedIn(data.ticket.id);
+		updateOccupancy(data);
 	},
 	onError: (error) => {
 		isCheckingIn.value = false;
 	},
 });
 
+// Scans on the way out are recorded right away, there is nothing to confirm
+const checkOutResource = createResource({
+	url: "buzz.api.checkin_ticket",
+	onSuccess: (data) => {
+		validationResult.value = data;
+		isProcessingTicket.value = false;
+		occupancy.value = data.occupancy;
+		// the ticket may now check in again, on this device too
+		useOfflineCheckIn().markCheckedOut(data.ticket.id);
+		playSuccessSound();
+	},
+	onError: (error) => {
+		validationResult.value = null;
+		isProcessingTicket.value = false;
+		showDebouncedToast(error.messages?.[0] || __("Error checking out ticket"));
+		playErrorSound();
+	},
+});
+
+// Session check-ins take a seat right away, there is nothing to confirm
+const sessionCheckInResource = createResource({
+	url: "buzz.api.checkin_ticket_for_session",
+	onSuccess: (data) => {
+		validationResult.value = data;
+		isProcessingTicket.value = false;
+		playSuccessSound();
+	},
+	onError: (error) => {
+		validationResult.value = null;
+		isProcessingTicket.value = false;
+		showDebouncedToast(error.messages?.[0] || __("Error checking in to the session"));
+		playErrorSound();
+	},
+});
+
 export function useTicketValidation() {
 	if (ticketValidationState) {
 		return ticketValidationState;
 	}
 
+	const offlineCheckIn = useOfflineCheckIn();
+
 	// Methods
 	const validateTicket = (ticketId) => {
 		isProcessingTicket.value = true;
+
+		if (session.value) {
+			sessionCheckInResource.submit({ ticket_id: ticketId, schedule_item: session.value });
+			return;
+		}
+
+		if (direction.value === "Out") {
+			checkOutResource.submit({ ticket_id: ticketId, direction: "Out" });
+			return;
+		}
+
+		// signed QR codes are verified and checked in on the device, synced later,
+		// except re-entries while online, which the server lets in right away
+		if (
+			offlineCheckIn.isReady.value &&
+			isCheckInToken(ticketId) &&
+			!(navigator.onLine && offlineCheckIn.hasLeft(ticketId))
+		) {
+			checkInOffline(ticketId);
+			return;
+		}
+
 		validateTicketResource.submit({ ticket_id: ticketId });
 	};
 
+	const checkInOffline = async (token) => {
+		const result = await offlineCheckIn.checkIn(token);
+		isProcessingTicket.value = false;
+
+		if (!result.ok) {
+			validationResult.value = null;
+			showDebouncedToast(result.reason);
+			playErrorSound();
+			return;
+		}
+
+		validationResult.value = {
+			message: result.reEntry
+				? __("Re-entry recorded, will be synced")
+				: __("Checked in, will be synced"),
+			ticket: { id: result.ticket },
+		};
+		playSuccessSound();
+	};
+
 	const checkInTicket = () => {
 		if (!validationResult.value?.ticket?.id) return;
 
 		isCheckingIn.value = true;
-		checkInResource.submit({ ticket_id: validationResult.value.ticket.id });
+		checkInResource.submit({
+			ticket_id: validationResult.value.ticket.id,
+			gate: offlineCheckIn.gate.value,
+		});
 	};
 
 	const clearResults = () => {
@@ -118,6 +222,9 @@ export function useTicketValidation() {
 		isCheckingIn,
 		validationResult,
 		showTicketModal,
+		direction,
+		occupancy,
+		session,
 
 		// Methods
 		validateTicket,
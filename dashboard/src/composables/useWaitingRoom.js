@@ -0,0 +1,43 @@
+import { createResource } from "frappe-ui";
+import { computed, onUnmounted, ref } from "vue";
+import { subscribeToDoc } from "../socket";
+
+/**
+ * Composable for an event's booking waiting room
+ * Joins the queue, follows the admission front over socket.io and fetches the
+ * admission token once the user's turn comes up
+ *
+ * @param {string|number} eventName - Buzz Event name
+ * @returns {Object} - Returns reactive queue state and the admission token
+ */
+export function useWaitingRoom(eventName) {
+	const status = ref(null);
+	const admissionToken = ref(null);
+
+	const waitingRoom = createResource({
+		url: "buzz.api.join_waiting_room",
+		params: { event: eventName },
+		auto: true,
+		onSuccess: (data) => {
+			status.value = data;
+			admissionToken.value = data.admission_token || null;
+		},
+	});
+
+	const onAdmissionUpdate = (data) => {
+		if (!status.value || String(data.event) !== String(eventName)) return;
+
+		status.value.people_ahead = Math.max(status.value.position - data.admitted_until, 0);
+		if (!admissionToken.value && status.value.people_ahead === 0) {
+			waitingRoom.fetch();
+		}
+	};
+
+	const unsubscribe = subscribeToDoc("Buzz Event", eventName, "buzz_waiting_room", onAdmissionUpdate);
+	onUnmounted(unsubscribe);
+
+	const isAdmitted = computed(() => Boolean(admissionToken.value));
+	const peopleAhead = computed(() => status.value?.people_ahead ?? null);
+
+	return { status, admissionToken, isAdmitted, peopleAhead };
+}
@@ -13,6 +13,16 @@ const routes = [
 		name: "check-in",
 		component: () => import("@/pages/CheckInScanner.vue"),
 	},
+	{
+		path: "/check-in/live",
+		name: "check-in-live",
+		component: () => import("@/pages/CheckInLive.vue"),
+	},
+	{
+		path: "/check-in/sessions",
+		name: "check-in-sessions",
+		component: () => import("@/pages/SessionBoard.vue"),
+	},
 	{
 		path: "/book-tickets/:eventRoute",
 		props: true,
@@ -19,3 +19,38 @@ export function initSocket() {
 export function useSocket() {
 	return socket;
 }
+
+/**
+ * Listen to realtime events published for a document (`frappe.publish_realtime(..., doctype, docname)`)
+ *
+ * @returns {Function} - Call it to stop listening and leave the document's room
+ */
+export function subscribeToDoc(doctype, name, event, handler) {
+	if (!socket) return () => {};
+
+	socket.emit("doc_subscribe", doctype, name);
+	socket.on(event, handler);
+
+	return () => {
+		socket.off(event, handler);
+		socket.emit("doc_unsubscribe", doctype, name);
+	};
+}
+
+/**
+ * Listen to realtime events published for a doctype (`frappe.publish_realtime(..., room=get_doctype_room(doctype))`),
+ * the room is only joined by users who can read the doctype
+ *
+ * @returns {Function} - Call it to stop listening and leave the doctype's room
+ */
+export function subscribeToDoctype(doctype, event, handler) {
+	if (!socket) return () => {};
+
+	socket.emit("doctype_subscribe", doctype);
+	socket.on(event, handler);
+
+	return () => {
+		socket.off(event, handler);
+		socket.emit("doctype_unsubscribe", doctype);
+	};
+}